@@ -0,0 +1,138 @@
+"""Check with tracemalloc that a steady-state `Roboclaw.forward_backward_m1` retains nothing
+and allocates no more than a few short-lived ints, both with the frame cache and with packets
+built in the preallocated buffer (``frame_cache=0``).
+
+The port is an in-memory stand-in that acks every frame without allocating, so only the driver's
+own allocations are counted. Exits with status 1 if the check fails; ``test_steady_state_allocations``
+runs the same check under a test runner.
+
+Usage: ``python benchmarks/alloc_check.py`` or ``python -m pytest benchmarks/alloc_check.py``"""
+import functools
+import gc
+import itertools
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from roboclaw import Roboclaw  # pylint: disable=wrong-import-position
+
+
+class AckingPort:
+    """A serial port that acknowledges every write with ``0xFF``"""
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, buf):
+        return len(buf)
+
+    def readinto(self, buf):
+        buf[0] = 0xff
+        return 1
+
+
+DRIVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'roboclaw')
+
+
+def _nothing():
+    pass
+
+
+def _peak(func, count):
+    """the most bytes that were allocated at once over ``count`` calls of ``func``, above what
+    was allocated before"""
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in itertools.repeat(None, count):
+        func()
+    return tracemalloc.get_traced_memory()[1] - base
+
+
+def allocations(rclaw, count):
+    """Measure ``count`` steady-state ``forward_backward_m1(64)`` calls with the garbage collector
+    disabled. A snapshot only shows what is still allocated afterwards, so the temporaries of each
+    call are caught by tracemalloc's peak instead, less the peak of as many empty calls.
+
+    :Returns: ``(transient, retained)``: the most bytes that temporaries took at once and the
+        blocks allocated by the driver that are still alive after the last call.
+    """
+    command = functools.partial(rclaw.forward_backward_m1, 64)
+    enabled = gc.isenabled()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        _peak(command, 1000) # warm up caches (and count past the small ints)
+        before = tracemalloc.take_snapshot()
+        overhead = _peak(_nothing, count) # right before the command, after the snapshot's own allocations
+        peak = _peak(command, count)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        if enabled:
+            gc.enable()
+    driver = tracemalloc.Filter(True, os.path.join(os.path.abspath(DRIVER), '*'))
+    stats = after.filter_traces((driver,)).compare_to(before.filter_traces((driver,)), 'lineno')
+    return max(peak - overhead, 0), sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+
+
+#: The bytes of one temporary int: 28 for those above 256 (smaller ones are cached), rounded up to
+#: the 16 byte blocks of Python's small object allocator.
+INT_BYTES = 32
+
+#: The transient bytes allowed per command, keyed on ``frame_cache``. A steady-state command only
+#: allocates ints: the one that replaces a `Roboclaw.stats` counter as it counts up and, for a packet
+#: built in place, four more while it is packed and its CRC16 computed. Each budget is that plus one
+#: int of headroom, so an interpreter that boxes one more temporary still passes, while a copy of a
+#: cached frame on every command (40 bytes more) doesn't.
+BUDGETS = {64: (1 + 1) * INT_BYTES, 0: (5 + 1) * INT_BYTES}
+
+
+def check(frame_cache, count):
+    """Measure ``count`` and then ``4 * count`` commands. Neither may retain a block, and the
+    transient peak of the longer run may not be higher: the temporaries of one command must be
+    freed before the next.
+
+    :Returns: ``(report, failures)``: a line of the measurements and a `list` of what failed.
+    """
+    with Roboclaw(AckingPort(), frame_cache=frame_cache) as rclaw:
+        (transient, retained), (longer, retained_longer) = (
+            allocations(rclaw, count), allocations(rclaw, 4 * count))
+    budget = BUDGETS[frame_cache]
+    failures = []
+    if retained or retained_longer:
+        failures.append(f'{retained} and {retained_longer} blocks retained over {count} and {4 * count} commands')
+    if longer > transient:
+        failures.append(f'the transient peak grew from {transient} to {longer} bytes with {4 * count} commands')
+    if transient > budget:
+        failures.append(f'{transient} transient bytes (budget {budget})')
+    report = (f'frame_cache={frame_cache:<3} {transient}/{longer} transient bytes over {count}/{4 * count} '
+              f'commands (budget {budget}), {retained + retained_longer} blocks retained')
+    return report, failures
+
+
+def test_steady_state_allocations(count=2500):
+    """nothing is retained per command and temporaries neither add up nor exceed `BUDGETS`"""
+    for frame_cache in BUDGETS:
+        failures = check(frame_cache, count)[1]
+        assert not failures, f'frame_cache={frame_cache}: ' + '; '.join(failures)
+
+
+def main(count=2500):
+    failed = False
+    for frame_cache in BUDGETS:
+        report, failures = check(frame_cache, count)
+        print(report)
+        for failure in failures:
+            print('  FAILED:', failure)
+        failed |= bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Compare the bit-at-a-time `crc_bits` against the table driven `crc16` on Roboclaw sized frames.
+
+Usage: ``python benchmarks/crc_bench.py [count]``"""
+import os
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from roboclaw.data_manip import Crc, crc16, crc_bits  # pylint: disable=wrong-import-position
+
+FRAMES = {
+    'forward_backward_m1 (3 bytes)': bytes((0x80, 6, 64)),
+    'set_m1_position_pid (30 bytes)': bytes(range(30)),
+    'read_version reply (48 bytes)': bytes(range(48)),
+}
+
+
+def main(count=20000):
+    seed = Crc().update((0x80,))
+    for name, frame in FRAMES.items():
+        assert crc16(frame) == crc_bits(frame, 16, 0x1021, 0)
+        bits = timeit(lambda f=frame: crc_bits(f, 16, 0x1021, 0), number=count)
+        table = timeit(lambda f=frame: crc16(f), number=count)
+        seeded = timeit(lambda f=frame[1:]: seed.checksum(f), number=count)
+        print(f'{name:32} crc_bits {bits / count * 1e6:7.2f} us'
+              f'  crc16 {table / count * 1e6:6.2f} us ({bits / table:4.1f}x)'
+              f'  seeded {seeded / count * 1e6:6.2f} us')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
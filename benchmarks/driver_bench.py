@@ -0,0 +1,207 @@
+"""Time every public `Roboclaw` method against the software Roboclaw in `roboclaw.emulator` and
+compare it with the same command in the `roboclaw.roboclaw_3_bak` compatibility layer and in the
+original byte-at-a-time library it replaced (frozen in `legacy_roboclaw.py`).
+
+Each command is called ``count`` times with every argument set to 1. The report has ops/sec,
+p50/p99/p99.9 latency and the bytes written and read per call of each command and driver, plus a
+latency histogram (power of two microsecond buckets) in the JSON output.
+
+The emulator answers as soon as a frame is complete unless ``--baudrate``/``--latency`` are given,
+so by default the numbers show the cost of the driver (framing, CRC and parsing) and the
+pseudo-terminal rather than of the wire.
+
+Usage: ``python benchmarks/driver_bench.py [--count N] [--baudrate BAUD] [--latency SECONDS]
+[--only NAME ...] [--json FILE]`` (``--json -`` writes the JSON to stdout instead of the table)"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import sys
+from time import perf_counter, perf_counter_ns
+
+from serial import Serial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# pylint: disable=wrong-import-position
+from roboclaw import Roboclaw
+from roboclaw.emulator import RoboclawEmulator
+from roboclaw.roboclaw_3_bak import Roboclaw as CompatRoboclaw
+from legacy_roboclaw import Roboclaw as LegacyRoboclaw
+
+ADDRESS = 0x80
+DRIVERS = ('roboclaw', 'roboclaw_3_bak', 'legacy')
+TIMEOUT = 0.05
+SKIPPED = ('open', 'close', 'send_random_data')  # not commands, or not answered
+LEGACY_NAMES = {  # legacy methods whose name isn't the new one in CamelCase
+    'read_buffer_length': 'ReadBuffers',
+    'read_encoder_m1': 'ReadEncM1',
+    'read_encoder_m2': 'ReadEncM2',
+    'read_raw_speed_m1': 'ReadISpeedM1',
+    'read_raw_speed_m2': 'ReadISpeedM2',
+    'read_snapshot': None,  # no legacy equivalent
+    'write_eeprom': None,  # waits for an extra 0xAA byte after the ack that the emulator never sends
+}
+
+
+class CountingSerial(Serial):
+    """A `~serial.Serial` port that counts the bytes that cross it (`readinto()` and
+    `read_until()` go through `read()`)."""
+    bytes_out = 0
+    bytes_in = 0
+
+    def write(self, data):
+        self.bytes_out += len(data)
+        return super().write(data)
+
+    def read(self, size=1):
+        data = super().read(size)
+        self.bytes_in += len(data)
+        return data
+
+
+def _legacy_method(legacy, name):
+    if name in LEGACY_NAMES:
+        name = LEGACY_NAMES[name]
+        return None if name is None else getattr(legacy, name)
+    wanted = name.replace('_', '')
+    for legacy_name in dir(legacy):
+        if legacy_name.lower().replace('_', '') == wanted:
+            return getattr(legacy, legacy_name)
+    return None
+
+
+def cases(rclaw, *legacy):
+    """Get ``(name, new call, *legacy calls or None)`` for every public `Roboclaw` method, with
+    a legacy call for each of the ``legacy`` drivers"""
+    result = []
+    for name, method in inspect.getmembers(Roboclaw, inspect.isfunction):
+        if name.startswith('_') or name in SKIPPED:
+            continue
+        params = [p for p in inspect.signature(method).parameters if p not in ('self', 'address')]
+        args = () if name == 'read_snapshot' else (1,) * len(params)
+        legacy_calls = [_legacy_method(driver, name) for driver in legacy]
+        result.append((
+            name,
+            lambda f=getattr(rclaw, name), a=args: f(*a),
+            *(None if call is None else lambda f=call, a=args: f(ADDRESS, *a)
+              for call in legacy_calls),
+        ))
+    return result
+
+
+def _failed(result):
+    return result is False
+
+
+def _legacy_failed(result):  # legacy reads return a tuple that starts with a success flag
+    return result is False or (isinstance(result, tuple) and not result[0])
+
+
+def measure(call, port, count, failed=_failed):
+    """call ``call`` ``count`` times and summarize the latencies"""
+    call() # warm up caches, like the frame cache
+    out, into = port.bytes_out, port.bytes_in
+    latencies = []
+    failures = 0
+    start = perf_counter()
+    for _ in range(count):
+        began = perf_counter_ns()
+        result = call()
+        latencies.append(perf_counter_ns() - began)
+        failures += failed(result)
+    elapsed = perf_counter() - start
+    latencies.sort()
+    histogram = {}
+    for latency in latencies:
+        bucket = 1 << max(latency // 1000, 1).bit_length()
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return {
+        'ops_per_sec': count / elapsed,
+        'p50_us': _percentile(latencies, 0.5),
+        'p99_us': _percentile(latencies, 0.99),
+        'p999_us': _percentile(latencies, 0.999),
+        'bytes_out': (port.bytes_out - out) / count,
+        'bytes_in': (port.bytes_in - into) / count,
+        'failures': failures,
+        'histogram_us': sorted(histogram.items()),  # (bucket upper bound, calls)
+    }
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] / 1000
+
+
+def run(count=500, baudrate=None, latency=0.0, only=None):
+    """benchmark the drivers and return the JSON serializable results"""
+    results = []
+    with RoboclawEmulator(ADDRESS, baudrate, latency) as emulator:
+        port = CountingSerial(emulator.port, baudrate or 38400, timeout=TIMEOUT)
+        compat_port = CountingSerial(emulator.port, baudrate or 38400, timeout=TIMEOUT)
+        legacy_port = CountingSerial(emulator.port, baudrate or 38400, timeout=TIMEOUT)
+        rclaw = Roboclaw(port, address=ADDRESS).open()
+        compat = CompatRoboclaw(emulator.port, baudrate or 38400, timeout=TIMEOUT)
+        compat._bind(compat_port)  # pylint: disable=protected-access
+        legacy = LegacyRoboclaw(emulator.port, baudrate or 38400, timeout=TIMEOUT)
+        legacy._port = legacy_port  # pylint: disable=protected-access
+        for name, call, compat_call, legacy_call in cases(rclaw, compat, legacy):
+            if only and name not in only:
+                continue
+            entry = {'command': name, 'roboclaw': measure(call, port, count)}
+            if compat_call is not None:
+                entry['roboclaw_3_bak'] = measure(compat_call, compat_port, count, _legacy_failed)
+            if legacy_call is not None:
+                entry['legacy'] = measure(legacy_call, legacy_port, count, _legacy_failed)
+            results.append(entry)
+        rclaw.close()
+        compat_port.close()
+        legacy_port.close()
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'count': count,
+        'baudrate': baudrate,
+        'latency': latency,
+        'results': results,
+    }
+
+
+def report(data):
+    """print ``data`` (from `run()`) as a table"""
+    print(f'{"command":34} {"driver":14} {"ops/s":>9} {"p50 us":>8} {"p99 us":>8} {"p99.9 us":>9}'
+          f' {"out B":>6} {"in B":>6} {"fail":>5}')
+    for entry in data['results']:
+        for driver in DRIVERS:
+            if driver not in entry:
+                continue
+            stats = entry[driver]
+            print(f'{entry["command"] if driver == "roboclaw" else "":34} {driver:14}'
+                  f' {stats["ops_per_sec"]:9.1f} {stats["p50_us"]:8.1f} {stats["p99_us"]:8.1f}'
+                  f' {stats["p999_us"]:9.1f} {stats["bytes_out"]:6.1f} {stats["bytes_in"]:6.1f}'
+                  f' {stats["failures"]:5}')
+        if 'legacy' in entry:  # over the original library
+            for driver, label in zip(DRIVERS, ('speedup', 'speedup 3_bak')):
+                speedup = entry[driver]['ops_per_sec'] / entry['legacy']['ops_per_sec']
+                print(f'{"":34} {label:14} {speedup:8.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=500, help='calls per command and driver')
+    parser.add_argument('--baudrate', type=int, default=None, help='pace the emulator to this rate')
+    parser.add_argument('--latency', type=float, default=0.0, help='emulated turnaround seconds')
+    parser.add_argument('--only', nargs='*', help='the commands to run (defaults to all)')
+    parser.add_argument('--json', help='write the results as JSON to this file (- for stdout)')
+    args = parser.parse_args()
+    data = run(args.count, args.baudrate, args.latency, args.only)
+    if args.json == '-':
+        json.dump(data, sys.stdout, indent=2)
+        return
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(data, file, indent=2)
+    report(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Compare commands/sec of `Roboclaw.forward_backward_m1` with the serial port reopened on every
+command against a session that keeps the port open.
+
+The Roboclaw is stood in for by a pseudo-terminal whose master side acknowledges every frame with
+``0xFF``, so the numbers show the driver and port overhead rather than the board's turnaround.
+
+Usage: ``python benchmarks/session_bench.py [count]``"""
+import os
+import sys
+import threading
+from time import perf_counter
+
+from serial import Serial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from roboclaw import Roboclaw  # pylint: disable=wrong-import-position
+
+FRAME_LEN = 5  # [Address, 6, Value, CRC16(2 bytes)]
+
+
+def _ack_frames(master_fd, stop):
+    pending = 0
+    while not stop.is_set():
+        try:
+            pending += len(os.read(master_fd, 64))
+        except OSError:
+            return
+        while pending >= FRAME_LEN:
+            pending -= FRAME_LEN
+            os.write(master_fd, b'\xff')
+
+
+def run(rclaw, count):
+    """send ``count`` spinner commands and return the achieved commands/sec"""
+    start = perf_counter()
+    for i in range(count):
+        rclaw.forward_backward_m1(64 + (i & 63))
+    return count / (perf_counter() - start)
+
+
+def main(count=2000):
+    master_fd, slave_fd = os.openpty()
+    stop = threading.Event()
+    responder = threading.Thread(target=_ack_frames, args=(master_fd, stop), daemon=True)
+    responder.start()
+    rclaw = Roboclaw(Serial(os.ttyname(slave_fd), 38400, timeout=1))
+
+    reopening = run(rclaw, count)
+    with rclaw:
+        session = run(rclaw, count)
+
+    stop.set()
+    os.close(slave_fd)
+    os.close(master_fd)
+    print(f'reopen per command: {reopening:10.1f} cmd/s')
+    print(f'open session:       {session:10.1f} cmd/s ({session / reopening:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -5,7 +5,13 @@ import json
 import logging
 
 from typing import *
-from roboclaw import Roboclaw
+from roboclaw import RetryPolicy, RoboclawError
+from roboclaw.baud import connect
+from roboclaw.health import ERRORS, HealthMonitor
+from roboclaw.link import LinkState, SupervisedRoboclaw
+from roboclaw.simple import SimpleSerialRoboclaw
+from vesc import Packet, StatusReceiver, Vesc
+from vesc.scheduler import SendScheduler
 from math import copysign
 from time import perf_counter
 from threading import Lock
@@ -37,11 +43,68 @@ class Watchdog:
             return perf_counter() - self.prev_check < self.expires
 
 class Spinner:
-    def __init__(self, uart_address: str = "/dev/ttyS1", uart_baud: int = 38400):
-        self.roboclaw = Roboclaw(serial.Serial(uart_address, uart_baud))
+    def __init__(self, uart_address: str = "/dev/ttyS1", uart_baud: int = 38400, keepalive: float = 0.25,
+                 simple_serial: bool = False, negotiate_baud: bool = False):
+        # Keep the port open for the whole match instead of reopening it on every spin command.
+        if simple_serial:
+            # A Roboclaw set to Simple Serial mode takes each spin command as a single byte with no
+            # ack, 4-5x the command rate of packet serial, but can't report its health.
+            self.roboclaw = SimpleSerialRoboclaw(serial.Serial(uart_address, uart_baud)).open()
+            self.health = None
+            return
+        # The board's baud rate is probed (starting with the one that last worked, then `uart_baud`)
+        # and, with `negotiate_baud`, raised to the fastest rate the wire carries without errors.
+        # The control loop calls `spin` on every pass; only changed speeds (and a refresh every
+        # `keepalive` seconds, within the Roboclaw's serial timeout) go out on the UART.
+        # Spin commands get 5 ms (retries included) so a dead link never stalls the control loop.
+        # The board is found (and its settings loaded) in the background, so a spinner that is off
+        # doesn't stop the robot from starting. A lost link (brownout, loose connector) is reopened
+        # the same way, at the same baud rate and with the cached settings put back, while spin
+        # commands are skipped.
+        self.roboclaw = connect(
+            uart_address,
+            baudrate=uart_baud,
+            negotiate=negotiate_baud,
+            driver=SupervisedRoboclaw,
+            on_state=self.on_link_state,
+            keepalive=keepalive,
+            policy=RetryPolicy(drive=0.005),
+            config_cache=True,
+        )
+        # Polled from `spin` so it shares the UART with the spin commands; the status mask is read
+        # every 20 ms (5 ms while a bit is set), temperatures and voltages every 2 s when steady.
+        self.health = HealthMonitor(self.roboclaw, on_event=self.on_health_event)
+
+    def on_health_event(self, event):
+        if event.raised & ERRORS:
+            logger.error(f"Spinner Roboclaw fault: {event.raised!r}")
+        else:
+            logger.warning(f"Spinner Roboclaw health change: {event}")
+
+    def on_link_state(self, state):
+        if state is LinkState.DOWN:
+            logger.error(f"Spinner Roboclaw link lost ({self.roboclaw.error or 'no replies'}), reconnecting")
+        elif self.roboclaw.outages:
+            logger.warning(f"Spinner Roboclaw link back after {self.roboclaw.downtime:.3f} s")
+        else:
+            logger.info(f"Spinner Roboclaw link up at {self.roboclaw.serial_obj.baudrate} baud")
 
     def spin(self, vel: float):
-        self.roboclaw.forward_backward_m1(min(64 + int(64 * vel), 127))
+        # The drivetrain keeps running over CAN while the spinner's link is reconnecting.
+        if getattr(self.roboclaw, "state", LinkState.UP) is LinkState.DOWN:
+            return
+
+        try:
+            self.roboclaw.forward_backward_m1(min(64 + int(64 * vel), 127))
+        except RoboclawError as e:
+            logger.warning(f"Spinner command failed: {e}")
+
+        # The link may have gone down with the spin command.
+        if self.health is not None and getattr(self.roboclaw, "state", LinkState.UP) is LinkState.UP:
+            try:
+                self.health.poll()
+            except RoboclawError as e:
+                logger.warning(f"Spinner health poll failed: {e}")
 
 # Utility class to calculate wheel outputs for differential driving.
 class DifferentialDrive:
@@ -100,7 +163,9 @@ class Drivetrain(DifferentialDrive):
         controller_id_l: int,
         controller_id_r: int,
         can_channel: str = "can0",
-        can_bitrate: int = 125_000
+        can_bitrate: int = 125_000,
+        can_refresh: float = 0.01,
+        can_hold: float = 0.1
     ):
         super().__init__()
 
@@ -108,42 +173,53 @@ class Drivetrain(DifferentialDrive):
         self.controller_id_r = controller_id_r
 
         self.can = can.Bus(bustype="socketcan", channel=can_channel, bitrate=can_bitrate)
-
-        # Track the last time a CAN command was sent to avoid saturating the CAN bus queue.
-        self.can_command_prev = perf_counter()
-        self.can_bitrate = 125_000
-
-    # Move the drivetrain. Skips sending CAN commands when called faster than 125kbits/s.
+        self.vesc_l = Vesc(self.can, controller_id_l)
+        self.vesc_r = Vesc(self.can, controller_id_r)
+        # Motor feedback (RPM, currents, temperatures, voltage) decoded in the background; read it
+        # with `self.feedback.status(controller_id)` without blocking on the bus.
+        self.feedback = StatusReceiver(self.can, (controller_id_l, controller_id_r)).start()
+
+        # The kernel's broadcast manager resends both duty cycles every `can_refresh` seconds (no
+        # faster than the bus can carry them, less the status frames, as measured while driving),
+        # so the VESCs get a steady refresh without waking Python up; `drive` only swaps in new
+        # duty cycles and re-arms the resends, which end `can_hold` seconds after the last `drive`
+        # if the control loop stalls.
+        self.can_bitrate = can_bitrate
+        self.scheduler = SendScheduler(
+            self.can,
+            can_bitrate,
+            (self.vesc_l.message(Packet.SET_DUTY), self.vesc_r.message(Packet.SET_DUTY)),
+            receiver=self.feedback,
+            refresh=can_refresh,
+            duration=can_hold,
+        ).start()
+        logger.info(f"Drivetrain duty cycles every {self.scheduler.interval * 1000:.2f} ms at {can_bitrate} bit/s.")
+
+    # Move the drivetrain. Updates the periodic CAN frames only when the duty cycles change, except
+    # that a stop is also sent right away. Restarts them after `halt`.
     def drive(self, x_vel: float, z_rot: float) -> (float, float):
-        curr_time = perf_counter()
-
-        can_command_delta = curr_time - self.can_command_prev
+        stop = x_vel == 0.0 and z_rot == 0.0
 
-        if can_command_delta > 5.0:
-            logger.info("Sending CAN message.")
+        (l_duty, r_duty) = super().drive(x_vel, z_rot)
 
-            (l_duty, r_duty) = super().drive(x_vel, z_rot)
+        self.vesc_l.prepare(Packet.SET_DUTY, l_duty)
+        self.vesc_r.prepare(Packet.SET_DUTY, -r_duty)
+        if not self.scheduler.running:
+            self.scheduler.start()
+        self.scheduler.send(stop)
 
-            self.can.send(
-                can.Message(
-                    arbitration_id=self.controller_id_l,
-                    data=int(l_duty * 100_000).to_bytes(4, byteorder="big", signed=True),
-                    is_extended_id=True
-                )
-            )
-            self.can.send(
-                can.Message(
-                    arbitration_id=self.controller_id_r,
-                    data=(-int(r_duty * 100_000)).to_bytes(4, byteorder="big", signed=True),
-                    is_extended_id=True
-                )
-            )
+        return (l_duty, r_duty)
 
-            self.can_command_prev = curr_time
+    # Stop the motors and stop resending the duty cycles, until the next `drive`.
+    def halt(self):
+        if self.scheduler.running:
+            self.drive(0.0, 0.0)
+            self.scheduler.stop()
 
-            return (l_duty, r_duty)
-        else:
-            return self.prev_wheels
+    # Stop resending the duty cycles.
+    def close(self):
+        self.scheduler.stop()
+        self.feedback.stop()
 
 class Controller:
     HEART_ATTACK_THRESHOLD = 1.0
@@ -206,7 +282,7 @@ class Controller:
         else:
             logger.info("Controller not connected.")
 
-            self.drivetrain.drive(0.0, 0.0)
+            self.drivetrain.halt()
             self.spinner.spin(0.0)
 
             if command_prev != command:
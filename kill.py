@@ -1,7 +1,6 @@
-from serial import Serial
-from roboclaw import Roboclaw
+from roboclaw.baud import connect
 
-rclaw = Roboclaw(Serial('/dev/ttyS1', 38400))
-
-rclaw.forward_m1(0)
-rclaw.forward_m2(0)
\ No newline at end of file
+# Send the stops even if the board doesn't answer a probe, at the rate that last worked (or 38400)
+with connect('/dev/ttyS1', fallback=True) as rclaw:
+    rclaw.forward_m1(0)
+    rclaw.forward_m2(0)
\ No newline at end of file
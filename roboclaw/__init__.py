@@ -1,3 +1,5 @@
 """module management for the RoboClaw package"""
 from .roboclaw import Roboclaw
-__all__ = ['Roboclaw']
+from .snapshot import Snapshot
+from .policy import RetryPolicy, RoboclawError, DeadlineExceeded, NoReply, BadReply, LinkDown
+__all__ = ['Roboclaw', 'Snapshot', 'RetryPolicy', 'RoboclawError', 'DeadlineExceeded', 'NoReply', 'BadReply', 'LinkDown']
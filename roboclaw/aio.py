@@ -0,0 +1,374 @@
+"""An asyncio flavor of the roboclaw driver. Commands are written as soon as they are issued and
+their replies are matched to the waiting coroutines in the order they arrive, so several
+requests can be outstanding on the serial port at once."""
+import asyncio
+import os
+import time
+from collections import deque
+from itertools import islice
+from .codec import COMMANDS, CRC16, MAX_VERSION
+from .roboclaw import _CRC16, Roboclaw, _parse_snapshot
+from .snapshot import SNAPSHOT_FIELDS, Snapshot, plan
+
+_LOOKAHEAD = 8 # how many pending requests a garbled reply is compared with
+
+class _Request:
+    """a frame written to the serial port and the reply it awaits"""
+    __slots__ = ('size', 'ack', 'crc', 'future', 'end', 'wire', 'expired')
+
+    def __init__(self, size, crc, future):
+        self.ack = size is None
+        self.size = 1 if size is None else size # see `Roboclaw._transact()`
+        self.crc = crc # the CRC16 of a read command's frame, which its reply's checksum continues
+        self.future = future
+        self.end = 0 # the count of bytes written to the port once this frame is
+        self.wire = 0.0 # the seconds the frame and its reply take on the wire
+        self.expired = False # timed out, but its reply may still arrive
+
+    def length(self, rx):
+        """the length of the reply at the start of ``rx``, or `None` until all of it arrived"""
+        if self.size:
+            return self.size if len(rx) >= self.size else None
+        end = rx.find(b'\n\x00') # line feed and null terminated string followed by its CRC16 checksum
+        return end + 4 if 0 <= end and end + 4 <= len(rx) else None
+
+    def check(self, rx):
+        """the length of this request's reply if ``rx`` starts with it, ``0`` if it doesn't or
+        `None` if that can't be told yet"""
+        size = self.length(rx)
+        if size is None:
+            return None
+        if self.ack:
+            return size if rx[0] == 0xff else 0
+        if self.crc is None:
+            return size
+        end = size - CRC16.size
+        return size if _CRC16.checksum(rx[:end], self.crc) == CRC16.unpack_from(rx, end)[0] else 0
+
+
+class AsyncRoboclaw(Roboclaw):
+    """A `Roboclaw` driver whose command methods are coroutines. It reads and writes the serial
+    port's file descriptor through the running event loop, so it needs a POSIX serial port (like
+    PySerial's `~serial.Serial`) and must be used within an open session::
+
+        async with AsyncRoboclaw(Serial('/dev/ttyS1', 38400)) as rclaw:
+            await rclaw.forward_backward_m1(64)
+            currents, pwms = await asyncio.gather(rclaw.read_currents(), rclaw.read_pwms())
+
+    The Roboclaw answers frames in order, so each request's `timeout` starts once its frame is
+    written and every frame before it was answered (or timed out), plus the time its frame and
+    reply take on the wire, and it is extended while bytes keep arriving; a long queue of
+    pipelined requests doesn't eat into the time of the last ones. A request that times out (or
+    is cancelled, like by `asyncio.wait_for()`) keeps its place in line, so that a late reply is
+    recognized by its length and checksum and dropped instead of being taken for the reply to the
+    next request.
+
+    :param ~serial.Serial serial_obj: The serial obj associated with the serial port that is connected to the RoboClaw.
+    :param int address: The unique address assigned to the particular RoboClaw. Valid addresses range [``0x80``, ``0x87``].
+    :param int retries: The amount of attempts to read/write data over the serial port. Defaults to 3.
+    :param float timeout: The seconds to wait for each attempt's reply. Defaults to 0.02.
+    :param int frame_cache: The number of fully framed packets to remember. Defaults to 64.
+    """
+    def __init__(self, serial_obj, address=0x80, retries=3, timeout=0.02, frame_cache=64):
+        super().__init__(serial_obj, address=address, retries=retries, frame_cache=frame_cache)
+        self.timeout = timeout
+        self._loop = None
+        self._fd = None
+        self._byte_time = 0.0 # the seconds a byte takes on the wire
+        self._rx = bytearray()
+        self._tx = bytearray()
+        self._queued = 0 # bytes handed to `_write()`
+        self._written = 0 # bytes written to the port
+        self._pending = deque() # the `_Request` of every reply still to arrive, in send order
+        self._armed = None # the `_Request` whose `timeout` is running
+        self._timer = None
+        self._received = 0.0 # the event loop time at which bytes last arrived
+
+    async def __aenter__(self):
+        return self.open()
+
+    async def __aexit__(self, *exc):
+        self.close()
+        return False
+
+    def open(self):
+        """Open the serial port and attach it to the running event loop."""
+        if not self._session:
+            super().open()
+            self._loop = asyncio.get_running_loop()
+            self._fd = self.serial_obj.fileno()
+            baudrate = getattr(self.serial_obj, 'baudrate', None)
+            self._byte_time = 10.0 / baudrate if baudrate else 0.0
+            os.set_blocking(self._fd, False)
+            self._loop.add_reader(self._fd, self._on_readable)
+        return self
+
+    def close(self):
+        """Detach the serial port from the event loop, fail any outstanding requests and close
+        the port."""
+        if self._session:
+            self._loop.remove_reader(self._fd)
+            if self._tx:
+                self._loop.remove_writer(self._fd)
+                self._tx.clear()
+            self._disarm()
+            while self._pending:
+                future = self._pending.popleft().future
+                if not future.done():
+                    future.cancel()
+            self._rx.clear()
+            self._queued = self._written = 0
+            super().close()
+
+    @property
+    def outstanding(self):
+        """The number of requests still waiting for a reply."""
+        return sum(1 for entry in self._pending if not entry.future.done())
+
+    def _write(self, buf):
+        self._queued += len(buf)
+        if not self._tx:
+            try:
+                written = os.write(self._fd, buf)
+            except BlockingIOError:
+                written = 0
+            self._written += written
+            if written == len(buf):
+                return
+            buf = memoryview(buf)[written:]
+            self._loop.add_writer(self._fd, self._on_writable)
+        self._tx += buf
+
+    def _on_writable(self):
+        try:
+            written = os.write(self._fd, self._tx)
+        except BlockingIOError:
+            return
+        del self._tx[:written]
+        self._written += written
+        if not self._tx:
+            self._loop.remove_writer(self._fd)
+        self._arm()
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 512)
+        except BlockingIOError:
+            return
+        self._rx += data
+        self._received = self._loop.time()
+        self._match()
+
+    def _match(self):
+        """hand each complete reply in the receive buffer to its request, dropping the late
+        replies of abandoned requests"""
+        rx = self._rx
+        while self._pending:
+            size = self._split()
+            if size is None:
+                break
+            entry = self._pending.popleft()
+            reply = bytes(rx[:size])
+            del rx[:size]
+            if entry is self._armed:
+                self._disarm()
+            if not entry.future.done():
+                entry.future.set_result(reply or None)
+        if not self._pending:
+            rx.clear() # nobody is waiting for these bytes
+        self._arm()
+
+    def _split(self):
+        """get the length of the first pending request's reply at the start of the receive
+        buffer, ``0`` if that reply was lost (a later request's reply is there instead) or
+        `None` until that can be told"""
+        rx = self._rx
+        head = self._pending[0]
+        following = self._pending[1] if len(self._pending) > 1 else None
+        own = head.check(rx)
+        after = 0 if following is None else following.check(rx)
+        abandoned = head.future.done() # timed out or cancelled
+        if own and head.crc is not None:
+            # a late reply to an abandoned request is only taken as such if the next request
+            # (like a retry of the same read) can't claim it
+            if abandoned and after and following.crc is not None and not following.future.done():
+                return 0
+            return own
+        if own == 0 and head.crc is not None:
+            return self._resync(head)
+        if head.ack and following is not None and following.crc is not None:
+            # an ack, or the first byte of the next reply?
+            if own == 0:
+                return 0
+            return None if after is None else (0 if after else own)
+        if abandoned:
+            if after and own is not None: # acks can't be told apart; assume this one's was lost
+                return 0
+            if own:
+                return own
+            return None if own is None or after is None else 0
+        return head.length(rx)
+
+    def _resync(self, head):
+        """`_split()` for a read whose reply fails its checksum: it was lost (and a later reply
+        is there instead), cut short (and the next reply follows it), or stray bytes came first"""
+        rx = self._rx
+        undecided = False
+        for entry in islice(self._pending, 1, _LOOKAHEAD):
+            if entry.crc is not None:
+                found = entry.check(rx)
+                if found:
+                    return 0
+                undecided = undecided or found is None
+            elif entry is self._pending[1] and entry.ack and rx[0] == 0xff:
+                return 0
+        following = self._pending[1] if len(self._pending) > 1 and self._pending[1].crc is not None else None
+        size = head.length(rx)
+        for offset in range(1, len(rx)):
+            tail = rx[offset:]
+            if head.check(tail):
+                del rx[:offset]
+                return head.length(rx)
+            if following is not None and offset <= size:
+                found = following.check(tail)
+                if found:
+                    return offset
+                undecided = undecided or found is None
+        return None if undecided else size
+
+    def _arm(self):
+        """start the `timeout` of the first request that hasn't timed out, once its frame is
+        written (a cancelled request still keeps the Roboclaw busy)"""
+        if self._armed is not None:
+            return
+        for entry in self._pending:
+            if not entry.expired:
+                break
+        else:
+            return
+        if entry.end <= self._written:
+            self._armed = entry
+            self._timer = self._loop.call_later(self.timeout + entry.wire, self._on_timeout)
+
+    def _disarm(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._armed = self._timer = None
+
+    def _on_timeout(self):
+        idle = self._loop.time() - self._received
+        if idle < self.timeout: # a reply is still arriving
+            self._timer = self._loop.call_later(self.timeout - idle, self._on_timeout)
+            return
+        entry = self._armed
+        self._armed = self._timer = None
+        while self._pending[0] is not entry:
+            self._pending.popleft() # a request that timed out before and whose reply never came
+        entry.expired = True
+        if not entry.future.done():
+            entry.future.set_result(None)
+        self._match()
+
+    async def _request(self, buf, size, crc=None):
+        """write ``buf`` and wait for the next ``size`` bytes that arrive after the replies to
+        any requests sent before it. See `Roboclaw._transact()` for ``size``.
+
+        :param int crc: The CRC16 of a read command's ``buf``, so that its reply (or a late one)
+            is recognized by its checksum.
+        :Returns: The reply or `None` if it didn't arrive within `timeout` seconds.
+        """
+        return (await self._requests(((buf, crc),), (size,)))[0]
+
+    async def _requests(self, frames, sizes):
+        """`_request()` for several ``(frame, crc)`` pairs at once, written back to back in a
+        single write.
+
+        :Returns: A `list` of each frame's reply (or `None`).
+        """
+        if not self._session:
+            raise RuntimeError('AsyncRoboclaw commands need an open session')
+        entries = []
+        end = self._queued
+        for (frame, crc), size in zip(frames, sizes):
+            entry = _Request(size, crc, self._loop.create_future())
+            end += len(frame)
+            entry.end = end
+            entry.wire = (len(frame) + (entry.size or MAX_VERSION)) * self._byte_time
+            entries.append(entry)
+        self._pending.extend(entries)
+        self._write(b''.join(frame for frame, _ in frames) if len(entries) > 1 else frames[0][0])
+        self._arm()
+        try:
+            return [await entry.future for entry in entries]
+        except asyncio.CancelledError: # the frames keep their place in line for their replies
+            for entry in entries:
+                entry.future.cancel()
+            raise
+
+    def _exchange(self, buf, size, crc=None, timeout=None):
+        # with ``frame_cache=0`` the frame is a view of the shared frame buffer, which the next
+        # command overwrites before this request is written (or retried)
+        return self._acked(bytes(buf) if isinstance(buf, memoryview) else buf, size, crc, timeout)
+
+    async def _acked(self, buf, size, crc=None, timeout=None):
+        """`_exchange()` on the event loop"""
+        if timeout is not None:
+            try:
+                return await asyncio.wait_for(self._acked(buf, size, crc), timeout)
+            except asyncio.TimeoutError:
+                return False
+        if crc is not None:
+            return self._checked(await self._request(buf, size, crc), crc)
+        for _ in range(self._retries):
+            reply = await self._request(buf, size)
+            if size is not None:
+                return reply or False
+            if reply and reply[0] == 0xff:
+                return True
+        return False
+
+    def _checked(self, reply, crc):
+        """the payload of a read command's ``reply`` (or `False` if it is missing or fails its
+        checksum)"""
+        if not reply or len(reply) < 2:
+            self.stats.timeouts += 1
+            return False
+        payload = memoryview(reply)[:-2]
+        if _CRC16.checksum(payload, crc) != CRC16.unpack_from(reply, len(reply) - 2)[0]:
+            self.stats.crc_errors += 1
+            return False
+        self.stats.replies += 1
+        return bytes(payload)
+
+    async def _payload(self, cmd, args, address):
+        spec = COMMANDS[cmd]
+        frame, crc = self._frame(cmd, args, address)
+        frame = bytes(frame) # stays valid while other requests reuse the frame buffer
+        size = 0 if spec.terminated else spec.reply.size + 2
+        for _ in range(self._retries):
+            payload = self._checked(await self._request(frame, size, crc), crc)
+            if payload is not False:
+                return payload
+        return False
+
+    async def _query(self, cmd, *args, address=None):
+        assert address is None or address in range(0x80, 0x88)
+        payload = await self._payload(cmd, args, self._address if address is None else address)
+        return False if payload is False else COMMANDS[cmd].unpack(payload)
+
+    async def read_snapshot(self, fields=None, address=None, raw=False):
+        assert address is None or address in range(0x80, 0x88)
+        address = self._address if address is None else address
+        pending = plan(SNAPSHOT_FIELDS if fields is None else fields, raw)
+        snapshot = Snapshot(time.monotonic())
+        for _ in range(self._retries):
+            frames = [self._snapshot_frame(spec.cmd, address) for _, spec, _ in pending]
+            replies = await self._requests(frames, [spec.reply.size + 2 for _, spec, _ in pending])
+            pending = [
+                field for field, frame, reply in zip(pending, frames, replies)
+                if _parse_snapshot(snapshot, [field], [frame], reply or b'')
+            ]
+            if not pending:
+                break
+        snapshot.failed = tuple(name for name, _, _ in pending)
+        return snapshot
@@ -0,0 +1,226 @@
+"""Finding the baud rate that a Roboclaw's packet serial port is set to, and raising it to the
+fastest rate that the link carries without errors.
+
+`connect()` is the usual way in::
+
+    rclaw = connect('/dev/ttyS1', negotiate=True)
+
+It tries the rate that last worked on the port first (see `BaudCache`), then the others, with a
+single cheap read at each, and opens a `~roboclaw.Roboclaw` at the one that answers. With
+``negotiate``, it then moves both ends to the fastest rate that passes a `soak()` test."""
+import json
+import os
+import time
+from serial import Serial
+from .policy import NoReply, RoboclawError
+from .roboclaw import Roboclaw
+from .serial_commands import Cmd
+
+#: The baud rates of packet serial mode, in the order of their config bits (see `BAUD_MASK`).
+BAUD_RATES = (2400, 9600, 19200, 38400, 57600, 115200, 230400, 460800)
+BAUD_MASK = 0x00E0 #: The config bits (see `~roboclaw.Roboclaw.set_config()`) of the baud rate.
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'roboclaw', 'baud.json') #: Where `BaudCache` keeps the rates by default.
+
+_SOAK = (Cmd.READM1PID, Cmd.READM2PID, Cmd.GETCONFIG, Cmd.GETM1MAXCURRENT) # long replies
+
+
+def baud_of(config):
+    """Get the baud rate that the ``config`` bits (see `~roboclaw.Roboclaw.get_config()`) set."""
+    return BAUD_RATES[(config & BAUD_MASK) >> 5]
+
+def with_baud(config, rate):
+    """Get the ``config`` bits with their baud rate bits set to ``rate`` (one of `BAUD_RATES`)."""
+    return config & ~BAUD_MASK | BAUD_RATES.index(rate) << 5
+
+
+class BaudCache:
+    """The baud rate that last worked on each serial port, kept in a JSON file so that the next
+    connection tries it first.
+
+    :param str path: The file to keep the rates in. Defaults to `CACHE_PATH`. `None` keeps them in
+        memory only.
+
+    A file that can't be read or written is treated as empty, so a read-only file system only
+    costs the probes.
+    """
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._rates = {}
+        if path is not None:
+            try:
+                with open(path) as file:
+                    self._rates = {port: int(rate) for port, rate in json.load(file).items()}
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    def get(self, port):
+        """The baud rate that last worked on ``port`` (or `None`)."""
+        return self._rates.get(port)
+
+    def set(self, port, rate):
+        """Remember that ``rate`` works on ``port``."""
+        if self._rates.get(port) == rate:
+            return
+        self._rates[port] = rate
+        if self.path is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'w') as file:
+                    json.dump(self._rates, file, indent=2)
+            except OSError:
+                pass
+
+
+def _answers(rclaw, address):
+    """one `Cmd.GETCONFIG` read without retries or the policy: `True` if it got a valid reply"""
+    frame, crc = rclaw._frame(Cmd.GETCONFIG, (), address) # pylint: disable=protected-access
+    return rclaw._exchange(frame, 4, crc) is not False # pylint: disable=protected-access
+
+def _switch(rclaw, rate, settle):
+    """set the host's end of the link to ``rate`` and drop whatever arrived at the old one"""
+    port = rclaw.serial_obj
+    port.baudrate = rate
+    time.sleep(settle) # the Roboclaw drops a garbled partial frame once the line goes idle
+    port.reset_input_buffer()
+
+def probe(rclaw, rates=BAUD_RATES, address=None, settle=0.02):
+    """Find the baud rate of the Roboclaw by trying a `~roboclaw.Roboclaw.get_config()` read at
+    each of ``rates`` in turn. Open ``rclaw``'s session first.
+
+    :param ~roboclaw.Roboclaw rclaw: The driver whose serial port to probe with.
+    :param rates: The baud rates to try, in order.
+    :param int address: The Roboclaw to probe. `None` (the default) probes ``rclaw``'s address.
+    :param float settle: The seconds to wait after switching rates. Defaults to 0.02.
+    :Returns: The rate the Roboclaw answered at (and the serial port is left at), or `None` (the
+        serial port is left at its rate from before).
+    """
+    address = rclaw.address if address is None else address
+    port = rclaw.serial_obj
+    before, timeout = port.baudrate, port.timeout
+    try:
+        for rate in rates:
+            _switch(rclaw, rate, settle)
+            # the 6 bytes of a read (at 10 bits each) and a turnaround take long at low rates
+            port.timeout = max(timeout or 0, 100 / rate)
+            if _answers(rclaw, address) or _answers(rclaw, address):
+                return rate
+        _switch(rclaw, before, settle)
+        return None
+    finally:
+        port.timeout = timeout
+
+def soak(rclaw, count=64, address=None, burst=16):
+    """Check the link with ``count`` reads of the settings with the longest replies, ``burst`` of
+    them back-to-back per round-trip. Open ``rclaw``'s session first.
+
+    :Returns: `True` if every reply passed its checksum at the first attempt.
+    """
+    address = rclaw.address if address is None else address
+    stats = rclaw.stats
+    errors = stats.crc_errors + stats.timeouts
+    queries = [(_SOAK[index % len(_SOAK)], ()) for index in range(count)]
+    replies = rclaw._read_batch(queries, address, burst) # pylint: disable=protected-access
+    return None not in replies and stats.crc_errors + stats.timeouts == errors
+
+def negotiate(rclaw, rates=BAUD_RATES, address=None, count=64, settle=0.02):
+    """Move the Roboclaw and the serial port to the fastest of ``rates`` at which a `soak()`
+    passes, trying them from the fastest down to the current rate. Open ``rclaw``'s session
+    first.
+
+    The rate is set with `~roboclaw.Roboclaw.set_config()` but not saved to non-volatile memory,
+    so the Roboclaw goes back to its saved rate when it is power cycled (and `probe()` finds it
+    there).
+
+    :param ~roboclaw.Roboclaw rclaw: The driver to negotiate with, at the Roboclaw's current rate.
+    :param rates: The baud rates to consider (of `BAUD_RATES`).
+    :param int address: The Roboclaw to negotiate with. `None` (the default) uses ``rclaw``'s
+        address.
+    :param int count: The reads of each `soak()`. Defaults to 64.
+    :param float settle: The seconds to wait after switching rates. Defaults to 0.02.
+    :Returns: The rate that both ends are left at.
+    :Raises: `~roboclaw.NoReply` if the Roboclaw stops answering at every rate.
+    """
+    address = rclaw.address if address is None else address
+    current = rclaw.serial_obj.baudrate
+    config = rclaw.get_config(address=address)
+    if not config:
+        raise NoReply('no reply to command {} from address 0x{:02X}'.format(Cmd.GETCONFIG, address))
+    config = config[0]
+    for rate in sorted(rates, reverse=True):
+        if rate <= current:
+            break
+        try:
+            rclaw.set_config(with_baud(config, rate), address=address)
+        except RoboclawError: # the ack may come at either rate
+            pass
+        _switch(rclaw, rate, settle)
+        if soak(rclaw, count, address):
+            return rate
+        try:
+            rclaw.set_config(with_baud(config, current), address=address)
+        except RoboclawError:
+            pass
+        found = probe(rclaw, tuple(dict.fromkeys((current, rate) + BAUD_RATES)), address, settle)
+        if found is None:
+            raise NoReply('Roboclaw 0x{:02X} stopped answering at every baud rate'.format(address))
+        current = found
+    return current
+
+_negotiate = negotiate # `connect()` has an argument of the same name
+
+def connect(port, address=0x80, baudrate=38400, rates=BAUD_RATES, negotiate=False, cache=None,
+            timeout=0.01, driver=Roboclaw, fallback=False, **kwargs): # pylint: disable=redefined-outer-name
+    """Open a `~roboclaw.Roboclaw` on the serial ``port`` at whatever baud rate the board is set
+    to, and optionally raise the rate (see `negotiate()`).
+
+    A `~roboclaw.link.SupervisedRoboclaw` ``driver`` is returned right away with its link
+    `~roboclaw.link.LinkState.DOWN`; its reconnection thread opens the port, finds the rate (and
+    remembers it in ``cache``) and loads the settings, so a board that is off or a missing port
+    doesn't stop the program (see `~roboclaw.link.SupervisedRoboclaw.connect()`).
+
+    :param str port: The serial port's device path.
+    :param int address: The packet serial address of the Roboclaw. Defaults to ``0x80``.
+    :param int baudrate: The rate to try after the cached one. Defaults to 38400 (the Roboclaw's
+        own default).
+    :param rates: The rates to try after that (from the fastest down) and to negotiate among.
+    :param bool negotiate: Move both ends to the fastest rate that passes a `soak()`.
+    :param BaudCache cache: Where to remember the rate that worked. Defaults to a `BaudCache` at
+        `CACHE_PATH`.
+    :param float timeout: The serial port's read timeout. Defaults to 0.01.
+    :param type driver: The class to open, like `~roboclaw.link.SupervisedRoboclaw`. Defaults to
+        `~roboclaw.Roboclaw`.
+    :param bool fallback: Open the port at the first rate tried (the cached one, else
+        ``baudrate``) instead of raising if no rate gets an answer, like to send stop commands
+        regardless.
+    :param kwargs: The other arguments of ``driver``.
+    :Returns: The ``driver`` object, with its session open and its `~roboclaw.Roboclaw.config`
+        cache (if it has one) loaded.
+    :Raises: `~roboclaw.NoReply` if no rate gets an answer (without ``fallback``) or the settings
+        can't be read.
+    """
+    from .link import SupervisedRoboclaw # pylint: disable=import-outside-toplevel,cyclic-import
+    cache = BaudCache() if cache is None else cache
+    first = [rate for rate in (cache.get(port), baudrate) if rate is not None]
+    order = list(dict.fromkeys(first + sorted(rates, reverse=True)))
+    if issubclass(driver, SupervisedRoboclaw):
+        serial_obj = Serial(None, order[0], timeout=timeout) # opened by the reconnection thread
+        serial_obj.port = port
+        return driver(serial_obj, address=address, **kwargs).connect(
+            order, rates if negotiate else (), lambda rate: cache.set(port, rate))
+    rclaw = driver(Serial(port, order[0], timeout=timeout), address=address, **kwargs).open()
+    try:
+        rate = probe(rclaw, order)
+        if rate is None and fallback:
+            return rclaw
+        if rate is None:
+            raise NoReply('no Roboclaw at address 0x{:02X} answered on {} at any of {}'.format(
+                address, port, order))
+        if negotiate:
+            rate = _negotiate(rclaw, rates)
+        if rclaw.config is not None and not rclaw.config.refresh(address):
+            raise NoReply('could not read the settings of Roboclaw 0x{:02X} on {}'.format(address, port))
+    except BaseException:
+        rclaw.close()
+        raise
+    cache.set(port, rate)
+    return rclaw
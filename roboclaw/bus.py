@@ -0,0 +1,270 @@
+"""A bus arbiter that lets several Roboclaws (and several threads) share one serial port. Every
+transaction goes through a single worker thread in priority order, so frames never interleave
+and drive commands don't wait behind telemetry reads."""
+import itertools
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from queue import PriorityQueue
+from .codec import COMMANDS, CRC16, DRIVE_MOTORS
+from .policy import BadReply, DeadlineExceeded, NoReply
+from .roboclaw import Roboclaw
+
+PRIORITY_DRIVE = 0      #: Motor commands, including stops.
+PRIORITY_CONFIG = 1     #: Commands that change settings.
+PRIORITY_TELEMETRY = 2  #: Read commands.
+
+#: The command bytes that move (or stop) a motor.
+DRIVE_COMMANDS = frozenset(DRIVE_MOTORS)
+
+def priority_of(cmd):
+    """The default priority of a command byte."""
+    if cmd in DRIVE_COMMANDS:
+        return PRIORITY_DRIVE
+    spec = COMMANDS.get(cmd)
+    if spec is not None and spec.is_read:
+        return PRIORITY_TELEMETRY
+    return PRIORITY_CONFIG
+
+
+class BusStats:
+    """Counters of the transactions served for one address."""
+    __slots__ = ('transactions', 'failures', 'bytes_out', 'bytes_in', 'busy', 'waited')
+
+    def __init__(self):
+        self.transactions = 0 #: completed transactions
+        self.failures = 0 #: transactions that got no (valid) ack or reply
+        self.bytes_out = 0 #: bytes written
+        self.bytes_in = 0 #: bytes read
+        self.busy = 0.0 #: seconds the port spent on this address's transactions
+        self.waited = 0.0 #: seconds transactions spent queued before being served
+
+    def __repr__(self):
+        return 'BusStats({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class _BusPort:
+    """Stands in for the serial port of every `RoboclawHandle`; the arbiter owns the real one."""
+    def __init__(self, arbiter):
+        self.arbiter = arbiter
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RoboclawHandle(Roboclaw):
+    """A `Roboclaw` bound to one address on a `BusArbiter`'s serial port. It has the full command
+    set; each transaction is queued on the arbiter and the calling thread waits for its turn.
+    Get these from `BusArbiter.handle()`.
+
+    Several threads may share a handle: its frame buffer and cache, ``keepalive`` state and
+    `stats` are only touched under its lock, which is released while a transaction waits for
+    its turn and reply (so a drive command from one thread isn't held up by another thread's
+    telemetry read)."""
+    def __init__(self, arbiter, address, retries=3, frame_cache=64, keepalive=None, policy=None):
+        super().__init__(_BusPort(arbiter), address=address, retries=retries, frame_cache=frame_cache, keepalive=keepalive, policy=policy)
+        self.arbiter = arbiter
+        self._lock = threading.Lock()
+
+    def _command(self, cmd, *args, address=None):
+        with self._lock:
+            return super()._command(cmd, *args, address=address)
+
+    def _query(self, cmd, *args, address=None):
+        with self._lock:
+            return super()._query(cmd, *args, address=address)
+
+    def _send(self, buf, ack=None, address=None, crc=True):
+        with self._lock:
+            return super()._send(buf, ack=ack, address=address, crc=crc)
+
+    def _read_batch(self, queries, address, burst=16):
+        with self._lock:
+            return super()._read_batch(queries, address, burst=burst)
+
+    def read_snapshot(self, fields=None, address=None, raw=False):
+        with self._lock:
+            return super().read_snapshot(fields, address=address, raw=raw)
+
+    def _result(self, future, timeout=None):
+        """wait for a queued transaction without holding the lock"""
+        self._lock.release()
+        try:
+            return future.result(timeout)
+        finally:
+            self._lock.acquire()
+
+    def _sleep(self, seconds):
+        self._lock.release()
+        try:
+            time.sleep(seconds)
+        finally:
+            self._lock.acquire()
+
+    def _transact(self, buf, size, crc=None, timeout=None):
+        if timeout is not None:
+            try:
+                return self._attempt(buf, size, crc, timeout)
+            except (DeadlineExceeded, NoReply, BadReply):
+                return False
+        # a copy, since the frame buffer is reused once the lock is released
+        return self._result(self.arbiter.submit(bytes(buf), size, crc=crc))
+
+    def _attempt(self, buf, size, crc, timeout):
+        future = self.arbiter.submit(bytes(buf), size, crc=crc, timeout=timeout)
+        try:
+            return self._result(future, timeout)
+        except FutureTimeout:
+            if future.cancel():
+                raise DeadlineExceeded('command {} to address 0x{:02X} is still queued'.format(
+                    buf[1], buf[0])) from None
+        # already on the wire, where the arbiter holds it to the same deadline
+        return self._result(future)
+
+
+class BusArbiter:
+    """Owns one serial port and serves the `RoboclawHandle` objects of every Roboclaw on it.
+
+    :param ~serial.Serial serial_obj: The serial obj associated with the serial port that is shared by the Roboclaws.
+    :param int retries: The amount of attempts for each acknowledged command. Defaults to 3.
+
+    Transactions are served in `priority_of()` order (drive commands before settings before
+    telemetry reads) and first come, first served within a priority::
+
+        bus = BusArbiter(Serial('/dev/ttyS1', 38400)).start()
+        weapon, lifter = bus.handle(0x80), bus.handle(0x81)
+        weapon.forward_backward_m1(127)
+    """
+    def __init__(self, serial_obj, retries=3):
+        self._driver = Roboclaw(serial_obj, retries=retries)
+        self._queue = PriorityQueue()
+        self._order = itertools.count()
+        self._handles = {}
+        self._lock = threading.Lock() # guards `_handles`
+        self._thread = None
+        self._started = None
+        self.stats = {} #: `BusStats` keyed on address
+
+    def start(self):
+        """Open the serial port and start serving transactions.
+
+        :Returns: This `BusArbiter` object."""
+        if self._thread is None:
+            self._driver.open()
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self._serve, name='roboclaw-bus', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Serve what is already queued, then stop and close the serial port."""
+        if self._thread is not None:
+            self._queue.put((PRIORITY_TELEMETRY + 1, next(self._order), None))
+            self._thread.join()
+            self._thread = None
+            self._driver.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def handle(self, address, retries=3, keepalive=None, policy=None):
+        """Get the `RoboclawHandle` for the Roboclaw at ``address`` (in range [``0x80``, ``0x87``]).
+        See `Roboclaw` for ``keepalive`` and ``policy``. Every call for the same address gets the
+        same handle, so they must all agree on the other arguments.
+
+        :Raises: `ValueError` if the handle for ``address`` was made with other ``retries``,
+            ``keepalive`` or ``policy``.
+        """
+        with self._lock:
+            handle = self._handles.get(address)
+            if handle is None:
+                handle = self._handles[address] = RoboclawHandle(
+                    self, address, retries=retries, keepalive=keepalive, policy=policy)
+            elif (handle._retries, handle.keepalive) != (retries, keepalive) or handle.policy is not policy: # pylint: disable=protected-access
+                raise ValueError('the handle for address 0x{:02X} was made with retries={!r}, keepalive={!r} and policy={!r}'.format(
+                    address, handle._retries, handle.keepalive, handle.policy)) # pylint: disable=protected-access
+        return handle
+
+    def submit(self, buf, size, priority=None, crc=None, timeout=None):
+        """Queue a fully framed transaction (see `Roboclaw._transact()` for ``size`` and
+        ``crc``).
+
+        :param int priority: Overrides the priority given by `priority_of()` for ``buf``'s
+            command byte.
+        :param float timeout: Makes the transaction a single attempt that must be done within
+            this many seconds of being queued (see `Roboclaw._attempt()`). Its future then
+            raises `NoReply` or `BadReply` for a failed attempt, and `DeadlineExceeded` if the
+            time ran out before it reached the port.
+        :Returns: A `~concurrent.futures.Future` of the transaction's result.
+        """
+        if self._thread is None:
+            raise RuntimeError('BusArbiter is not started')
+        if priority is None:
+            priority = priority_of(buf[1])
+        future = Future()
+        queued = time.monotonic()
+        until = None if timeout is None else queued + timeout
+        self._queue.put((priority, next(self._order), (buf, size, crc, until, future, queued)))
+        return future
+
+    def throughput(self):
+        """Get ``(transactions/s, bytes/s)`` for each address since `start()`."""
+        elapsed = max(time.monotonic() - self._started, 1e-9) if self._started else 1.0
+        return {
+            address: (stats.transactions / elapsed, (stats.bytes_out + stats.bytes_in) / elapsed)
+            for address, stats in self.stats.items()
+        }
+
+    @property
+    def link_stats(self):
+        """The `~roboclaw.roboclaw.LinkStats` of every reply read from the shared serial port."""
+        return self._driver.stats
+
+    def _serve(self):
+        while True:
+            job = self._queue.get()[2]
+            if job is None:
+                return
+            buf, size, crc, until, future, queued = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.monotonic()
+            if until is not None and until <= start:
+                future.set_exception(DeadlineExceeded('command {} to address 0x{:02X} expired in the queue'.format(
+                    buf[1], buf[0])))
+                continue
+            error = None
+            try:
+                if until is None:
+                    result = self._driver._transact(buf, size, crc) # pylint: disable=protected-access
+                else:
+                    result = self._driver._attempt(buf, size, crc, until - start) # pylint: disable=protected-access
+            except Exception as exc: # pylint: disable=broad-except
+                error, result = exc, False
+            stats = self.stats.get(buf[0])
+            if stats is None:
+                stats = self.stats[buf[0]] = BusStats()
+            stats.transactions += 1
+            stats.failures += result is False
+            stats.bytes_out += len(buf)
+            if size is None:
+                stats.bytes_in += bool(result)
+            elif result:
+                stats.bytes_in += len(result) + (0 if crc is None else CRC16.size)
+            stats.busy += time.monotonic() - start
+            stats.waited += start - queued
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
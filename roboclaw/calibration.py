@@ -0,0 +1,174 @@
+"""Per-robot calibration images: the words of a Roboclaw's user EEPROM and the settings it keeps in
+non-volatile memory, saved to a JSON file and written back to the board by differences only.
+
+An image file looks like::
+
+    {
+      "format": "roboclaw-image",
+      "version": 1,
+      "eeprom": [1200, 1185, null, ...],
+      "settings": {"READM1PID": [65536, 32768, 0, 44000], "GETM1MAXCURRENT": [1500, 0]}
+    }
+
+``eeprom`` has one entry per word (`EEPROM_WORDS` of them); `null` leaves a word alone.
+``settings`` maps the name (see `~roboclaw.serial_commands.Cmd`) of a read of
+`~roboclaw.codec.CONFIG_READS` to its raw reply, so values are in the board's own units."""
+import json
+from .codec import CONFIG_READS, CONFIG_WRITES
+from .serial_commands import Cmd
+
+EEPROM_WORDS = 128 #: The 16-bit words of user EEPROM (256 bytes).
+FORMAT = 'roboclaw-image'
+VERSION = 1
+
+_NAMES = {getattr(Cmd, name): name for name in dir(Cmd) if getattr(Cmd, name) in CONFIG_READS}
+
+
+class CalibrationImage:
+    """The user EEPROM words and settings that a Roboclaw should hold.
+
+    :param list eeprom: The value of every word (`None` for a word that the image doesn't set).
+        Defaults to no words.
+    :param dict settings: The raw reply `tuple` of settings reads keyed on their command byte (one
+        of `~roboclaw.codec.CONFIG_READS`). Defaults to no settings.
+    """
+    __slots__ = ('eeprom', 'settings')
+
+    def __init__(self, eeprom=None, settings=None):
+        self.eeprom = [None] * EEPROM_WORDS if eeprom is None else list(eeprom)
+        if len(self.eeprom) != EEPROM_WORDS:
+            raise ValueError('an image has {} EEPROM words, not {}'.format(EEPROM_WORDS, len(self.eeprom)))
+        self.settings = {cmd: tuple(data) for cmd, data in (settings or {}).items()}
+        for cmd in self.settings:
+            if cmd not in CONFIG_READS:
+                raise ValueError('Unsupported setting read: {}'.format(cmd))
+
+    def __eq__(self, other):
+        if not isinstance(other, CalibrationImage):
+            return NotImplemented
+        return self.eeprom == other.eeprom and self.settings == other.settings
+
+    def __repr__(self):
+        return 'CalibrationImage({} EEPROM words, settings={})'.format(
+            sum(word is not None for word in self.eeprom), sorted(_NAMES[cmd] for cmd in self.settings))
+
+    def to_json(self):
+        """Get the image as a JSON serializable `dict` (see the module's description)."""
+        return {
+            'format': FORMAT,
+            'version': VERSION,
+            'eeprom': list(self.eeprom),
+            'settings': {_NAMES[cmd]: list(data) for cmd, data in sorted(self.settings.items())},
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Make an image from the `dict` that `to_json()` returns."""
+        if data.get('format') != FORMAT or data.get('version') != VERSION:
+            raise ValueError('not a version {} {} file'.format(VERSION, FORMAT))
+        settings = {}
+        for name, reply in data.get('settings', {}).items():
+            cmd = getattr(Cmd, name, None)
+            if cmd not in _NAMES:
+                raise ValueError('Unsupported setting read: {}'.format(name))
+            settings[cmd] = reply
+        return cls(data.get('eeprom'), settings)
+
+    def save(self, path):
+        """Write the image to the file at ``path``."""
+        with open(path, 'w') as file:
+            json.dump(self.to_json(), file, indent=2)
+            file.write('\n')
+
+    @classmethod
+    def load(cls, path):
+        """Read an image from the file at ``path``."""
+        with open(path) as file:
+            return cls.from_json(json.load(file))
+
+
+class SyncReport:
+    """What `sync_image()` did."""
+    __slots__ = ('eeprom', 'settings', 'failed', 'saved')
+
+    def __init__(self):
+        self.eeprom = [] #: The EEPROM words that were written.
+        self.settings = [] #: The settings writes (command bytes) that were sent.
+        self.failed = [] #: The words (`int`) and settings reads (`Cmd` names) that don't match the image afterwards.
+        self.saved = False #: `True` if changed settings were saved to non-volatile memory.
+
+    @property
+    def ok(self):
+        """`True` if the Roboclaw matches the image."""
+        return not self.failed
+
+    def __repr__(self):
+        return 'SyncReport(eeprom={!r}, settings={!r}, failed={!r}, saved={!r})'.format(
+            self.eeprom, self.settings, self.failed, self.saved)
+
+
+def _address(rclaw, address):
+    return rclaw.address if address is None else address
+
+def read_image(rclaw, address=None, settings=True, burst=16):
+    """Read the whole user EEPROM (and the settings) of a Roboclaw, ``burst`` queries per
+    round-trip instead of one.
+
+    :param ~roboclaw.Roboclaw rclaw: The driver to read with. Open its session first.
+    :param int address: The Roboclaw to read. `None` (the default) reads ``rclaw``'s address.
+    :param bool settings: Also read every setting in `~roboclaw.codec.CONFIG_READS`.
+    :Returns: A `CalibrationImage`; words and settings that couldn't be read are left out.
+    """
+    address = _address(rclaw, address)
+    queries = [(Cmd.READEEPROM, (word,)) for word in range(EEPROM_WORDS)]
+    if settings:
+        queries += [(cmd, ()) for cmd in CONFIG_READS]
+    replies = rclaw._read_batch(queries, address, burst) # pylint: disable=protected-access
+    eeprom = [None if reply is None else reply[0] for reply in replies[:EEPROM_WORDS]]
+    return CalibrationImage(eeprom, {
+        cmd: reply for cmd, reply in zip(CONFIG_READS, replies[EEPROM_WORDS:]) if reply is not None})
+
+def sync_image(rclaw, image, address=None, verify=True, persist=True, burst=16):
+    """Make a Roboclaw match ``image``: read what it holds in bursts, write only the words and
+    settings that differ, then read those back.
+
+    :param ~roboclaw.Roboclaw rclaw: The driver to use. Open its session first.
+    :param CalibrationImage image: The words and settings the Roboclaw should hold.
+    :param int address: The Roboclaw to sync. `None` (the default) syncs ``rclaw``'s address.
+    :param bool verify: Read back (in bursts) what was written.
+    :param bool persist: Save changed settings to non-volatile memory (see
+        `~roboclaw.Roboclaw.write_nvm()`) so they survive a power cycle. EEPROM words always do.
+    :Returns: A `SyncReport`.
+
+    .. warning:: A settings image that changes the ``GETCONFIG`` baud rate, packet address or
+        control mode cuts communication off, like `~roboclaw.Roboclaw.set_config()` does.
+    """
+    address = _address(rclaw, address)
+    report = SyncReport()
+    current = read_image(rclaw, address, settings=bool(image.settings), burst=burst)
+    for word, value in enumerate(image.eeprom):
+        if value is not None and current.eeprom[word] != value:
+            report.eeprom.append(word)
+            rclaw.write_eeprom(word, value, address=address)
+    for read, wanted in image.settings.items():
+        have = current.settings.get(read)
+        for cmd, (target, positions) in CONFIG_WRITES.items():
+            if target != read or positions is None:
+                continue
+            if have is None or any(have[position] != wanted[position] for position in positions):
+                report.settings.append(cmd)
+                rclaw._command(cmd, *(wanted[position] for position in positions), address=address) # pylint: disable=protected-access
+    if verify and (report.eeprom or report.settings):
+        reads = sorted({CONFIG_WRITES[cmd][0] for cmd in report.settings})
+        queries = [(Cmd.READEEPROM, (word,)) for word in report.eeprom] + [(cmd, ()) for cmd in reads]
+        replies = rclaw._read_batch(queries, address, burst) # pylint: disable=protected-access
+        report.failed = [
+            word for word, reply in zip(report.eeprom, replies)
+            if reply is None or reply[0] != image.eeprom[word]
+        ] + [
+            _NAMES[cmd] for cmd, reply in zip(reads, replies[len(report.eeprom):])
+            if reply != image.settings[cmd]
+        ]
+    if persist and report.settings and not report.failed:
+        report.saved = bool(rclaw.write_nvm(address=address))
+    return report
@@ -0,0 +1,230 @@
+"""A declarative table describing how every packet serial command is encoded and how its reply is
+decoded. Each entry precompiles its `~struct.Struct` formats once at import time so that the
+`~roboclaw.Roboclaw` driver never reparses a format string on the actuation path."""
+from struct import Struct
+from .serial_commands import Cmd
+
+# pylint: disable=invalid-name
+
+CRC16 = Struct('>H') #: The encoder/decoder of the CRC16 checksum that ends a frame.
+
+class Command:
+    """How one `Cmd` is framed and how its reply is decoded.
+
+    :param int cmd: The command byte (one of the `Cmd` attributes).
+    :param str args: The `struct` format of the arguments that follow the command byte.
+    :param str reply: The `struct` format of the reply's payload (not including the CRC16
+        checksum). `None` (the default) means the command ends with a CRC16 checksum and is
+        answered with a single ``0xFF`` byte. Read commands are sent without a checksum and their
+        reply's checksum covers the sent bytes followed by the payload.
+    :param decode: A callable that turns the unpacked reply `tuple` into the value returned by
+        the driver. Defaults to returning the `tuple` as is.
+    :param bool terminated: `True` if the reply is a string terminated by a line feed and a null
+        character instead of a fixed size payload (only `Cmd.GETVERSION`).
+    """
+    __slots__ = ('cmd', 'request', 'reply', 'decode', 'terminated')
+
+    def __init__(self, cmd, args='', reply=None, decode=None, terminated=False):
+        self.cmd = cmd
+        self.request = Struct('>BB' + args) #: packs ``(address, cmd, *args)``
+        self.reply = None if reply is None else Struct('>' + reply) #: unpacks the reply payload
+        self.decode = decode
+        self.terminated = terminated
+
+    @property
+    def is_read(self):
+        """`True` if this command is answered with data instead of an ack."""
+        return self.reply is not None
+
+    def unpack(self, payload):
+        """Decode a reply's ``payload`` (already stripped of its checksum)."""
+        if self.terminated:
+            return self.decode(payload)
+        return self.convert(self.reply.unpack(payload))
+
+    def convert(self, data):
+        """Decode an already unpacked reply `tuple` (of a command that isn't ``terminated``)."""
+        return data if self.decode is None else self.decode(data)
+
+
+def _tenths(data):
+    return data[0] / 10
+
+def _flagged(data):
+    return (1,) + data
+
+def _velocity_pid(data):
+    return (data[0] / 65536.0, data[1] / 65536.0, data[2] / 65536.0, data[3])
+
+def _position_pid(data):
+    return (data[0] / 1024.0, data[1] / 1024.0, data[2] / 1024.0) + data[3:]
+
+def _version(payload):
+    return ''.join(chr(c) for c in payload.rstrip(b'\n\x00'))
+
+
+COMMANDS = {spec.cmd: spec for spec in (
+    Command(Cmd.M1FORWARD, 'B'),
+    Command(Cmd.M1BACKWARD, 'B'),
+    Command(Cmd.SETMINMB, 'B'),
+    Command(Cmd.SETMAXMB, 'B'),
+    Command(Cmd.M2FORWARD, 'B'),
+    Command(Cmd.M2BACKWARD, 'B'),
+    Command(Cmd.M17BIT, 'B'),
+    Command(Cmd.M27BIT, 'B'),
+    Command(Cmd.MIXEDFORWARD, 'B'),
+    Command(Cmd.MIXEDBACKWARD, 'B'),
+    Command(Cmd.MIXEDRIGHT, 'B'),
+    Command(Cmd.MIXEDLEFT, 'B'),
+    Command(Cmd.MIXEDFB, 'B'),
+    Command(Cmd.MIXEDLR, 'B'),
+    Command(Cmd.GETM1ENC, reply='iB'),
+    Command(Cmd.GETM2ENC, reply='IB'),
+    Command(Cmd.GETM1SPEED, reply='IB'),
+    Command(Cmd.GETM2SPEED, reply='IB'),
+    Command(Cmd.RESETENC),
+    Command(Cmd.GETVERSION, reply='', decode=_version, terminated=True),
+    Command(Cmd.SETM1ENCCOUNT, 'I'),
+    Command(Cmd.SETM2ENCCOUNT, 'I'),
+    Command(Cmd.GETMBATT, reply='h', decode=_tenths),
+    Command(Cmd.GETLBATT, reply='h', decode=_tenths),
+    Command(Cmd.SETMINLB, 'B'),
+    Command(Cmd.SETMAXLB, 'B'),
+    Command(Cmd.SETM1PID, 'IIII'),
+    Command(Cmd.SETM2PID, 'IIII'),
+    Command(Cmd.GETM1ISPEED, reply='Ib'),
+    Command(Cmd.GETM2ISPEED, reply='Ib'),
+    Command(Cmd.M1DUTY, 'h'),
+    Command(Cmd.M2DUTY, 'h'),
+    Command(Cmd.MIXEDDUTY, 'hh'),
+    Command(Cmd.M1SPEED, 'i'),
+    Command(Cmd.M2SPEED, 'i'),
+    Command(Cmd.MIXEDSPEED, 'ii'),
+    Command(Cmd.M1SPEEDACCEL, 'Ii'),
+    Command(Cmd.M2SPEEDACCEL, 'Ii'),
+    Command(Cmd.MIXEDSPEEDACCEL, 'Iii'),
+    Command(Cmd.M1SPEEDDIST, 'iIB'),
+    Command(Cmd.M2SPEEDDIST, 'iIB'),
+    Command(Cmd.MIXEDSPEEDDIST, 'iIiIB'),
+    Command(Cmd.M1SPEEDACCELDIST, 'IiIB'),
+    Command(Cmd.M2SPEEDACCELDIST, 'IiIB'),
+    Command(Cmd.MIXEDSPEEDACCELDIST, 'IiIiIB'),
+    Command(Cmd.GETBUFFERS, reply='BB', decode=_flagged),
+    Command(Cmd.GETPWMS, reply='hh', decode=_flagged),
+    Command(Cmd.GETCURRENTS, reply='hh', decode=_flagged),
+    Command(Cmd.MIXEDSPEED2ACCEL, 'IiIi'),
+    Command(Cmd.MIXEDSPEED2ACCELDIST, 'IiIIiIB'),
+    Command(Cmd.M1DUTYACCEL, 'hI'),
+    Command(Cmd.M2DUTYACCEL, 'hI'),
+    Command(Cmd.MIXEDDUTYACCEL, 'hIhI'),
+    Command(Cmd.READM1PID, reply='IIII', decode=_velocity_pid),
+    Command(Cmd.READM2PID, reply='IIII', decode=_velocity_pid),
+    Command(Cmd.SETMAINVOLTAGES, 'HH'),
+    Command(Cmd.SETLOGICVOLTAGES, 'HH'),
+    Command(Cmd.GETMINMAXMAINVOLTAGES, reply='HH', decode=_flagged),
+    Command(Cmd.GETMINMAXLOGICVOLTAGES, reply='HH', decode=_flagged),
+    Command(Cmd.SETM1POSPID, 'IIIIIII'),
+    Command(Cmd.SETM2POSPID, 'IIIIIII'),
+    Command(Cmd.READM1POSPID, reply='IIIIIII', decode=_position_pid),
+    Command(Cmd.READM2POSPID, reply='IIIIIII', decode=_position_pid),
+    Command(Cmd.M1SPEEDACCELDECCELPOS, 'IIIIB'),
+    Command(Cmd.M2SPEEDACCELDECCELPOS, 'IIIIB'),
+    Command(Cmd.MIXEDSPEEDACCELDECCELPOS, 'IIIIIIIIB'),
+    Command(Cmd.SETM1DEFAULTACCEL, 'I'),
+    Command(Cmd.SETM2DEFAULTACCEL, 'I'),
+    Command(Cmd.SETPINFUNCTIONS, 'BBB'),
+    Command(Cmd.GETPINFUNCTIONS, reply='BBB', decode=_flagged),
+    Command(Cmd.SETDEADBAND, 'BB'),
+    Command(Cmd.GETDEADBAND, reply='BB', decode=_flagged),
+    Command(Cmd.RESTOREDEFAULTS),
+    Command(Cmd.GETTEMP, reply='h'),
+    Command(Cmd.GETTEMP2, reply='h'),
+    Command(Cmd.GETERROR, reply='I'),
+    Command(Cmd.GETENCODERMODE, reply='BB', decode=_flagged),
+    Command(Cmd.SETM1ENCODERMODE, 'B'),
+    Command(Cmd.SETM2ENCODERMODE, 'B'),
+    Command(Cmd.WRITENVM, 'I'),
+    Command(Cmd.READNVM),
+    Command(Cmd.SETCONFIG, 'H'),
+    Command(Cmd.GETCONFIG, reply='H'),
+    Command(Cmd.SETM1MAXCURRENT, 'II'),
+    Command(Cmd.SETM2MAXCURRENT, 'II'),
+    Command(Cmd.GETM1MAXCURRENT, reply='II'),
+    Command(Cmd.GETM2MAXCURRENT, reply='II'),
+    Command(Cmd.SETPWMMODE, 'B'),
+    Command(Cmd.GETPWMMODE, reply='B'),
+    Command(Cmd.READEEPROM, 'B', reply='H', decode=_flagged),
+    Command(Cmd.WRITEEEPROM, 'BH'),
+)} #: Every supported `Command` keyed on its command byte.
+
+#: The size of the largest framed request (including its CRC16 checksum).
+MAX_REQUEST = max(spec.request.size for spec in COMMANDS.values()) + CRC16.size
+
+_M1, _M2, _BOTH = (1,), (2,), (1, 2)
+
+#: The motors that each drive command moves (or stops), keyed on its command byte.
+DRIVE_MOTORS = {
+    Cmd.M1FORWARD: _M1, Cmd.M1BACKWARD: _M1, Cmd.M17BIT: _M1, Cmd.M1DUTY: _M1,
+    Cmd.M1DUTYACCEL: _M1, Cmd.M1SPEED: _M1, Cmd.M1SPEEDACCEL: _M1, Cmd.M1SPEEDDIST: _M1,
+    Cmd.M1SPEEDACCELDIST: _M1, Cmd.M1SPEEDACCELDECCELPOS: _M1,
+    Cmd.M2FORWARD: _M2, Cmd.M2BACKWARD: _M2, Cmd.M27BIT: _M2, Cmd.M2DUTY: _M2,
+    Cmd.M2DUTYACCEL: _M2, Cmd.M2SPEED: _M2, Cmd.M2SPEEDACCEL: _M2, Cmd.M2SPEEDDIST: _M2,
+    Cmd.M2SPEEDACCELDIST: _M2, Cmd.M2SPEEDACCELDECCELPOS: _M2,
+    Cmd.MIXEDFORWARD: _BOTH, Cmd.MIXEDBACKWARD: _BOTH, Cmd.MIXEDRIGHT: _BOTH,
+    Cmd.MIXEDLEFT: _BOTH, Cmd.MIXEDFB: _BOTH, Cmd.MIXEDLR: _BOTH, Cmd.MIXEDDUTY: _BOTH,
+    Cmd.MIXEDDUTYACCEL: _BOTH, Cmd.MIXEDSPEED: _BOTH, Cmd.MIXEDSPEEDACCEL: _BOTH,
+    Cmd.MIXEDSPEED2ACCEL: _BOTH, Cmd.MIXEDSPEEDDIST: _BOTH, Cmd.MIXEDSPEEDACCELDIST: _BOTH,
+    Cmd.MIXEDSPEED2ACCELDIST: _BOTH, Cmd.MIXEDSPEEDACCELDECCELPOS: _BOTH,
+}
+
+#: The settings writes mapped to ``(read, positions)``: the read command whose reply they change
+#: and the position in that reply of each argument, or `None` if the reply can't be worked out
+#: from the arguments.
+CONFIG_WRITES = {
+    Cmd.SETM1PID: (Cmd.READM1PID, (2, 0, 1, 3)), # sends D, P, I but reads back P, I, D
+    Cmd.SETM2PID: (Cmd.READM2PID, (2, 0, 1, 3)),
+    Cmd.SETM1POSPID: (Cmd.READM1POSPID, (2, 0, 1, 3, 4, 5, 6)),
+    Cmd.SETM2POSPID: (Cmd.READM2POSPID, (2, 0, 1, 3, 4, 5, 6)),
+    Cmd.SETMAINVOLTAGES: (Cmd.GETMINMAXMAINVOLTAGES, (0, 1)),
+    Cmd.SETLOGICVOLTAGES: (Cmd.GETMINMAXLOGICVOLTAGES, (0, 1)),
+    Cmd.SETMINMB: (Cmd.GETMINMAXMAINVOLTAGES, None), # in different units
+    Cmd.SETMAXMB: (Cmd.GETMINMAXMAINVOLTAGES, None),
+    Cmd.SETMINLB: (Cmd.GETMINMAXLOGICVOLTAGES, None),
+    Cmd.SETMAXLB: (Cmd.GETMINMAXLOGICVOLTAGES, None),
+    Cmd.SETPINFUNCTIONS: (Cmd.GETPINFUNCTIONS, (0, 1, 2)),
+    Cmd.SETDEADBAND: (Cmd.GETDEADBAND, (0, 1)),
+    Cmd.SETM1ENCODERMODE: (Cmd.GETENCODERMODE, (0,)),
+    Cmd.SETM2ENCODERMODE: (Cmd.GETENCODERMODE, (1,)),
+    Cmd.SETCONFIG: (Cmd.GETCONFIG, (0,)),
+    Cmd.SETM1MAXCURRENT: (Cmd.GETM1MAXCURRENT, (0, 1)),
+    Cmd.SETM2MAXCURRENT: (Cmd.GETM2MAXCURRENT, (0, 1)),
+    Cmd.SETPWMMODE: (Cmd.GETPWMMODE, (0,)),
+}
+
+#: The reads of settings that only change when they are written (see `CONFIG_WRITES`).
+CONFIG_READS = tuple(dict.fromkeys(read for read, _ in CONFIG_WRITES.values()))
+
+#: The commands that change every setting.
+CONFIG_RESETS = frozenset((Cmd.RESTOREDEFAULTS, Cmd.READNVM))
+
+def written(cmd, args, current=None):
+    """Get the reply of the read that the ``cmd`` settings write (see `CONFIG_WRITES`) changes,
+    once it is written with ``args``.
+
+    :param tuple current: The reply before the write, needed if ``cmd`` sets only part of it.
+    :Returns: The unpacked reply `tuple` or `None` if it can't be worked out.
+    """
+    read, positions = CONFIG_WRITES[cmd]
+    size = len(COMMANDS[read].reply.format) - 1
+    if positions is None or (current is None and len(positions) < size):
+        return None
+    data = list(current or (0,) * size)
+    for position, arg in zip(positions, args):
+        data[position] = arg
+    return tuple(data)
+
+#: The size of the largest fixed size reply (including its CRC16 checksum).
+MAX_REPLY = max(spec.reply.size for spec in COMMANDS.values() if spec.is_read) + CRC16.size
+
+#: The longest string (including its line feed and null terminator) that `Cmd.GETVERSION` returns.
+MAX_VERSION = 48
@@ -0,0 +1,95 @@
+"""An in-memory copy of the settings of the Roboclaws that a driver talks to, so reading a setting
+doesn't cost a serial round-trip (see the ``config_cache`` option of `~roboclaw.Roboclaw`)."""
+from .codec import COMMANDS, CONFIG_READS, CONFIG_RESETS, CONFIG_WRITES, written
+
+class ConfigCache:
+    """The replies of the `CONFIG_READS` commands of every address, read from the Roboclaw once
+    and then answered from memory. The driver writes settings through the cache: an acknowledged
+    write updates the cached reply it changes, and a failed one (or one whose effect can't be
+    worked out) forgets it so that the next read goes to the Roboclaw. A reset (like
+    `~roboclaw.Roboclaw.restore_defaults()`) forgets every setting of the board, which are then
+    read again as they are asked for: right after one the board may not answer at the same baud
+    rate or address.
+
+    `~roboclaw.baud.connect()` loads every setting once the board answers; otherwise each one is
+    read the first time it is asked for. Call `refresh()` after changing settings some other way
+    (like with Motion Studio).
+
+    :param ~roboclaw.Roboclaw rclaw: The driver whose reads fill the cache.
+    """
+    def __init__(self, rclaw):
+        self._rclaw = rclaw
+        self._replies = {} # unpacked reply keyed on (address, read command byte)
+        self._loaded = set() # addresses that `refresh()` read every setting of
+        self.hits = 0 #: reads answered from memory
+        self.misses = 0 #: reads that went to the Roboclaw
+
+    def refresh(self, address=None):
+        """Read every setting of ``address`` (defaults to the driver's address) from the
+        Roboclaw again.
+
+        :Returns: `True` if every setting was read, otherwise `False` (or see
+            `~roboclaw.Roboclaw.policy`).
+        """
+        address = self._rclaw.address if address is None else address
+        self.clear(address)
+        if not all([self.read(cmd, address) is not False for cmd in CONFIG_READS]):
+            return False
+        self._loaded.add(address)
+        return True
+
+    def loaded(self, address):
+        """`True` if `refresh()` has read every setting of ``address``, even if some (or all) of
+        them were forgotten since (like by a reset)."""
+        return address in self._loaded
+
+    def settings(self, address):
+        """Get the cached replies of ``address`` as a `dict` keyed on read command byte."""
+        return {key[1]: data for key, data in self._replies.items() if key[0] == address}
+
+    def clear(self, address=None):
+        """Forget the settings of ``address`` (`None` forgets those of every address)."""
+        if address is None:
+            self._replies.clear()
+            return
+        for key in [key for key in self._replies if key[0] == address]:
+            del self._replies[key]
+
+    def read(self, cmd, address):
+        """Get the unpacked reply of the ``cmd`` read of ``address``, from memory if it is there.
+
+        :Returns: The reply `tuple` or `False` if no valid reply was received (or see
+            `~roboclaw.Roboclaw.policy`).
+        """
+        data = self._replies.get((address, cmd))
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        payload = self._rclaw._payload(cmd, (), address) # pylint: disable=protected-access
+        if payload is False:
+            return False
+        data = self._replies[(address, cmd)] = COMMANDS[cmd].reply.unpack(payload)
+        return data
+
+    def write(self, cmd, args, address):
+        """Send the ``cmd`` settings write (a key of `CONFIG_WRITES` or one of `CONFIG_RESETS`)
+        and update the cache to match.
+
+        :Returns: `True` if the write was acknowledged, otherwise `False` (or see
+            `~roboclaw.Roboclaw.policy`).
+        """
+        acked = False
+        try:
+            acked = self._rclaw._write_command(cmd, args, address) # pylint: disable=protected-access
+        finally:
+            if cmd in CONFIG_RESETS:
+                self.clear(address)
+            else:
+                key = (address, CONFIG_WRITES[cmd][0])
+                data = written(cmd, args, self._replies.get(key)) if acked else None
+                if data is None:
+                    self._replies.pop(key, None)
+                else:
+                    self._replies[key] = data
+        return acked
@@ -0,0 +1,421 @@
+"""A software Roboclaw that speaks packet serial on a pseudo-terminal, so the driver can be
+benchmarked and exercised without the board. It checks addresses and CRC16 checksums, acks
+writes with ``0xFF``, answers every read command in `COMMANDS` from a simple model of two motors
+and can pace its replies to a baud rate, add turnaround latency and inject faults.
+
+Run it on its own with ``python -m roboclaw.emulator --help``; it prints the port to open."""
+import argparse
+import os
+import random
+import select
+import termios
+import threading
+import time
+import tty
+from collections import deque
+from struct import Struct, calcsize
+from .baud import baud_of
+from .codec import COMMANDS, CONFIG_WRITES, CRC16, DRIVE_MOTORS, written
+from .data_manip import crc_engine
+from .serial_commands import Cmd
+
+_CRC16 = crc_engine(16, 0x1021, 0)
+
+DUTY_MAX = 32767 #: The duty cycle of full speed.
+
+#: The (speed, distance) argument positions of each motor's move in the buffered distance commands.
+_MOVES = {
+    Cmd.M1SPEEDDIST: ((0, 1), None),
+    Cmd.M2SPEEDDIST: (None, (0, 1)),
+    Cmd.MIXEDSPEEDDIST: ((0, 1), (2, 3)),
+    Cmd.M1SPEEDACCELDIST: ((1, 2), None),
+    Cmd.M2SPEEDACCELDIST: (None, (1, 2)),
+    Cmd.MIXEDSPEEDACCELDIST: ((1, 2), (3, 4)),
+    Cmd.MIXEDSPEED2ACCELDIST: ((1, 2), (4, 5)),
+}
+
+#: The power-on value of each register.
+DEFAULTS = {
+    Cmd.READM1PID: (0x10000, 0x8000, 0, 44000),
+    Cmd.READM2PID: (0x10000, 0x8000, 0, 44000),
+    Cmd.READM1POSPID: (0, 0, 0, 0, 0, 0, 0),
+    Cmd.READM2POSPID: (0, 0, 0, 0, 0, 0, 0),
+    Cmd.GETMINMAXMAINVOLTAGES: (60, 340),
+    Cmd.GETMINMAXLOGICVOLTAGES: (60, 340),
+    Cmd.GETPINFUNCTIONS: (0, 0, 0),
+    Cmd.GETDEADBAND: (0, 0),
+    Cmd.GETCONFIG: (0x8063,),
+    Cmd.GETM1MAXCURRENT: (750, 0),
+    Cmd.GETM2MAXCURRENT: (750, 0),
+    Cmd.GETPWMMODE: (1,),
+    Cmd.GETENCODERMODE: (0, 0),
+}
+
+# every reply is packed with unsigned fields (and the mask of each) so that negative values wrap
+# like they do on the wire
+_UNSIGNED = {
+    spec.cmd: (Struct(spec.reply.format.upper()),
+               tuple((1 << 8 * calcsize(code)) - 1 for code in spec.reply.format[1:]))
+    for spec in COMMANDS.values() if spec.is_read
+}
+
+
+class Faults:
+    """The chance (in range [0, 1]) of each fault that `RoboclawEmulator` injects into a reply.
+
+    :param float drop: Leave out one byte of the reply.
+    :param float corrupt: Flip a bit of the reply's checksum (or of the ack).
+    :param float silent: Don't reply at all.
+    :param int seed: Seeds the random choices so that a run can be repeated.
+    """
+    __slots__ = ('drop', 'corrupt', 'silent', '_random')
+
+    def __init__(self, drop=0.0, corrupt=0.0, silent=0.0, seed=None):
+        self.drop = drop
+        self.corrupt = corrupt
+        self.silent = silent
+        self._random = random.Random(seed)
+
+    def apply(self, reply):
+        """Get ``reply`` after the faults that were rolled for it (and the name of the fault)."""
+        roll = self._random.random()
+        if roll < self.silent:
+            return b'', 'silent'
+        roll -= self.silent
+        if roll < self.drop:
+            index = self._random.randrange(len(reply))
+            return reply[:index] + reply[index + 1:], 'drop'
+        roll -= self.drop
+        if roll < self.corrupt:
+            reply = bytearray(reply)
+            reply[-1] ^= 1 << self._random.randrange(8)
+            return bytes(reply), 'corrupt'
+        return reply, None
+
+
+class EmulatorStats:
+    """Counters of the frames seen by a `RoboclawEmulator`."""
+    __slots__ = ('frames', 'acks', 'replies', 'bad_crc', 'ignored', 'discarded', 'faults')
+
+    def __init__(self):
+        self.frames = 0 #: complete frames addressed to the emulator
+        self.acks = 0 #: writes answered with ``0xFF``
+        self.replies = 0 #: reads answered with data
+        self.bad_crc = 0 #: writes dropped because of their checksum
+        self.ignored = 0 #: frames for other addresses
+        self.discarded = 0 #: bytes thrown away as unknown commands or stale partial frames
+        self.faults = {} #: injected faults counted by name
+
+    def __repr__(self):
+        return 'EmulatorStats({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class RoboclawEmulator:
+    """A Roboclaw on the slave side of a pseudo-terminal. Open `port` with the driver::
+
+        with RoboclawEmulator(baudrate=38400, latency=0.001) as emulator:
+            rclaw = Roboclaw(Serial(emulator.port, 38400, timeout=0.05))
+            rclaw.forward_backward_m1(96)
+
+    :param int address: The packet serial address it answers to. Frames for other addresses are
+        ignored, like a board sharing the bus with others would.
+    :param int baudrate: The bits per second at which requests and replies cross the emulated
+        wire (10 bits per byte). `None` (the default) doesn't pace them.
+    :param float latency: The seconds the board takes to turn a request around. Defaults to 0.
+    :param Faults faults: The faults to inject. Defaults to none.
+    :param int max_speed: The encoder pulses per second at full duty cycle. Defaults to 44000.
+    :param str version: The reply to `Cmd.GETVERSION` (without its terminator).
+    :param bool check_baud: Drop the bytes that the driver sends while its serial port is set to
+        another baud rate than the config bits (see `Roboclaw.set_config()`) are, like the board
+        would see them garbled. Defaults to `False`.
+
+    The motors are modelled by their duty cycles (`duty`), from which the speeds, currents and
+    encoder counts follow. The other readings (`main_battery`, `logic_battery`, `temp`, `temp2`
+    and `error`) are attributes to set from the test or benchmark.
+    """
+    def __init__(self, address=0x80, baudrate=None, latency=0.0, faults=None, max_speed=44000,
+                 version='USB Roboclaw 2x15a v4.1.34', check_baud=False):
+        self.address = address
+        self.baudrate = baudrate
+        self.latency = latency
+        self.faults = faults or Faults()
+        self.max_speed = max_speed
+        self.version = version.encode() + b'\n\x00'
+        self.check_baud = check_baud
+        self.stats = EmulatorStats()
+        self.duty = [0, 0] #: the duty cycle of each motor in range [-32767, 32767]
+        self.encoders = [0, 0] #: the encoder count of each motor
+        self.main_battery = 16.8 #: volts
+        self.logic_battery = 5.0 #: volts
+        self.temp = 30.0 #: degrees Celsius
+        self.temp2 = 30.0 #: degrees Celsius
+        self.error = 0 #: the status bit mask (see `Roboclaw.read_error()`)
+        self.registers = dict(DEFAULTS) #: the replies of the configuration reads
+        self.eeprom = {} #: user EEPROM words keyed on address
+        self._moved = time.monotonic()
+        self._moves = (deque(), deque()) # (speed, distance) of the buffered moves of each motor
+        self._left = [None, None] # the counts left of each motor's executing move
+        self._master = self._slave = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def port(self):
+        """The path of the pseudo-terminal to open with the driver."""
+        return os.ttyname(self._slave)
+
+    def start(self):
+        """Open the pseudo-terminal and start answering frames.
+
+        :Returns: This `RoboclawEmulator` object."""
+        if self._thread is None:
+            self._master, self._slave = os.openpty()
+            tty.setraw(self._slave)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._serve, name='roboclaw-emulator', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop answering and close the pseudo-terminal."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            os.close(self._slave)
+            os.close(self._master)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _serve(self):
+        rx = bytearray()
+        while not self._stop.is_set():
+            # a partial frame left idle for this long is stale, like the board's own timeout
+            if not select.select((self._master,), (), (), 0.01)[0]:
+                self.stats.discarded += len(rx)
+                rx.clear()
+                continue
+            try:
+                data = os.read(self._master, 512)
+            except OSError:
+                return
+            if self.check_baud and termios.tcgetattr(self._slave)[4] != self._line_speed():
+                self.stats.discarded += len(data)
+                continue
+            rx += data
+            while rx:
+                used = self._handle(rx)
+                if not used:
+                    break
+                del rx[:used]
+
+    def _line_speed(self):
+        """the termios speed of the baud rate in the config bits"""
+        return getattr(termios, 'B{}'.format(baud_of(self.registers[Cmd.GETCONFIG][0])))
+
+    def _handle(self, rx):
+        """answer the frame at the start of ``rx`` and return its length (or 0 if incomplete)"""
+        spec = COMMANDS.get(rx[1]) if len(rx) > 1 else None
+        if spec is None:
+            if len(rx) < 2:
+                return 0
+            self.stats.discarded += 1 # not the start of a frame; resync on the next byte
+            return 1
+        size = spec.request.size + (0 if spec.is_read else CRC16.size)
+        if len(rx) < size:
+            return 0
+        frame = bytes(rx[:size])
+        if frame[0] != self.address:
+            self.stats.ignored += 1
+            return size
+        self.stats.frames += 1
+        args = spec.request.unpack_from(frame)[2:]
+        if spec.is_read:
+            payload = self._read(spec, args)
+            reply = payload + CRC16.pack(_CRC16.checksum(frame + payload))
+            self.stats.replies += 1
+        else:
+            if _CRC16.checksum(frame[:-2]) != CRC16.unpack_from(frame, size - 2)[0]:
+                self.stats.bad_crc += 1
+                return size
+            self._write(spec.cmd, args)
+            reply = b'\xff'
+            self.stats.acks += 1
+        self._reply(len(frame), reply)
+        return size
+
+    def _reply(self, sent, reply):
+        reply, fault = self.faults.apply(reply)
+        if fault is not None:
+            self.stats.faults[fault] = self.stats.faults.get(fault, 0) + 1
+        delay = self.latency
+        if self.baudrate:
+            delay += (sent + len(reply)) * 10 / self.baudrate
+        if delay:
+            time.sleep(delay)
+        if reply:
+            os.write(self._master, reply)
+
+    def _advance(self):
+        """integrate the encoder counts up to now, working through the buffered moves"""
+        now = time.monotonic()
+        elapsed, self._moved = now - self._moved, now
+        for motor in range(2):
+            left = elapsed
+            while self._left[motor] is not None and left > 0:
+                speed = self._speed(motor)
+                if speed and abs(speed) * left < self._left[motor]:
+                    break
+                self.encoders[motor] += round(self._left[motor]) * (-1 if speed < 0 else 1)
+                left -= self._left[motor] / abs(speed) if speed else 0
+                self._next_move(motor)
+            if self._left[motor] is not None:
+                self._left[motor] -= abs(self._speed(motor)) * left
+            self.encoders[motor] += round(self._speed(motor) * left)
+
+    def _next_move(self, motor):
+        if self._moves[motor]:
+            speed, self._left[motor] = self._moves[motor].popleft()
+            self.duty[motor] = self._duty_of(speed)
+        else: # the last buffered move is done
+            self._left[motor] = None
+            self.duty[motor] = 0
+
+    def _speed(self, motor):
+        return self.duty[motor] * self.max_speed // DUTY_MAX
+
+    def _read(self, spec, args):
+        cmd = spec.cmd
+        if cmd == Cmd.GETVERSION:
+            return self.version
+        self._advance()
+        if cmd in (Cmd.GETM1ENC, Cmd.GETM2ENC):
+            motor = cmd - Cmd.GETM1ENC
+            values = (self.encoders[motor], (self.duty[motor] < 0) << 1)
+        elif cmd in (Cmd.GETM1SPEED, Cmd.GETM2SPEED, Cmd.GETM1ISPEED, Cmd.GETM2ISPEED):
+            motor = (cmd - Cmd.GETM1SPEED) % 2
+            speed = self._speed(motor)
+            if cmd in (Cmd.GETM1ISPEED, Cmd.GETM2ISPEED):
+                speed //= 300 # pulses per 1/300th of a second
+            values = (abs(speed), speed < 0)
+        elif cmd == Cmd.GETPWMS:
+            values = tuple(self.duty)
+        elif cmd == Cmd.GETCURRENTS: # 10 mA units, 7.5 A at full duty
+            values = tuple(abs(duty) * 750 // DUTY_MAX for duty in self.duty)
+        elif cmd == Cmd.GETBUFFERS: # 0x80 once the last move is done
+            values = tuple(0x80 if left is None else len(moves)
+                           for left, moves in zip(self._left, self._moves))
+        elif cmd in (Cmd.GETMBATT, Cmd.GETLBATT, Cmd.GETTEMP, Cmd.GETTEMP2):
+            reading = {Cmd.GETMBATT: self.main_battery, Cmd.GETLBATT: self.logic_battery,
+                       Cmd.GETTEMP: self.temp, Cmd.GETTEMP2: self.temp2}[cmd]
+            values = (round(reading * 10),)
+        elif cmd == Cmd.GETERROR:
+            values = (self.error,)
+        elif cmd == Cmd.READEEPROM:
+            values = (self.eeprom.get(args[0], 0),)
+        else:
+            values = self.registers[cmd]
+        packer, masks = _UNSIGNED[cmd]
+        return packer.pack(*(value & mask for value, mask in zip(values, masks)))
+
+    def _write(self, cmd, args):
+        if cmd in CONFIG_WRITES: # settings that read back what was written
+            read = CONFIG_WRITES[cmd][0]
+            data = written(cmd, args, self.registers[read])
+            if data is not None:
+                self.registers[read] = data
+            return
+        self._advance()
+        if cmd in (Cmd.M1FORWARD, Cmd.M1BACKWARD, Cmd.M2FORWARD, Cmd.M2BACKWARD,
+                   Cmd.MIXEDFORWARD, Cmd.MIXEDBACKWARD):
+            duty = min(args[0], 127) * DUTY_MAX // 127
+            sign = -1 if cmd in (Cmd.M1BACKWARD, Cmd.M2BACKWARD, Cmd.MIXEDBACKWARD) else 1
+            self._drive(cmd, sign * duty, sign * duty)
+        elif cmd in (Cmd.M17BIT, Cmd.M27BIT, Cmd.MIXEDFB):
+            duty = (min(args[0], 127) - 64) * DUTY_MAX // 63
+            self._drive(cmd, duty, duty)
+        elif cmd in (Cmd.MIXEDRIGHT, Cmd.MIXEDLEFT, Cmd.MIXEDLR):
+            if cmd == Cmd.MIXEDLR:
+                turn = (min(args[0], 127) - 64) * DUTY_MAX // 63
+            else:
+                turn = min(args[0], 127) * DUTY_MAX // 127 * (1 if cmd == Cmd.MIXEDRIGHT else -1)
+            self.duty = [_clamp(self.duty[0] + turn), _clamp(self.duty[1] - turn)]
+        elif cmd in (Cmd.M1DUTY, Cmd.M2DUTY, Cmd.M1DUTYACCEL, Cmd.M2DUTYACCEL):
+            self._drive(cmd, args[0], args[0])
+        elif cmd in (Cmd.MIXEDDUTY, Cmd.MIXEDDUTYACCEL):
+            self._drive(cmd, args[0], args[len(args) // 2])
+        elif cmd in (Cmd.M1SPEED, Cmd.M2SPEED, Cmd.MIXEDSPEED):
+            self._drive(cmd, self._duty_of(args[0]), self._duty_of(args[-1]))
+        elif cmd in (Cmd.M1SPEEDACCEL, Cmd.M2SPEEDACCEL):
+            self._drive(cmd, self._duty_of(args[1]), self._duty_of(args[1]))
+        elif cmd in _MOVES: # accelerations are ignored, like everywhere else
+            for motor, move in enumerate(_MOVES[cmd]):
+                if move is None:
+                    continue
+                if args[-1]: # replace whatever is executing or buffered
+                    self._moves[motor].clear()
+                    self._left[motor] = None
+                self._moves[motor].append((args[move[0]], args[move[1]]))
+                if self._left[motor] is None:
+                    self._next_move(motor)
+        elif cmd == Cmd.SETM1ENCCOUNT:
+            self.encoders[0] = args[0]
+        elif cmd == Cmd.SETM2ENCCOUNT:
+            self.encoders[1] = args[0]
+        elif cmd == Cmd.RESETENC:
+            self.encoders = [0, 0]
+        elif cmd == Cmd.WRITEEEPROM:
+            self.eeprom[args[0]] = args[1]
+        elif cmd == Cmd.RESTOREDEFAULTS:
+            self.registers = dict(DEFAULTS)
+        # the remaining writes (mixed speed profiles, positions, limits, NVM) are only acked
+
+    def _duty_of(self, speed):
+        return _clamp(speed * DUTY_MAX // self.max_speed)
+
+    def _drive(self, cmd, m1, m2):
+        """set the duty cycle of the motor(s) that ``cmd`` drives"""
+        motors = DRIVE_MOTORS[cmd]
+        for motor in motors: # unbuffered commands drop the buffered moves
+            self._moves[motor - 1].clear()
+            self._left[motor - 1] = None
+        if 1 in motors:
+            self.duty[0] = _clamp(m1)
+        if 2 in motors:
+            self.duty[1] = _clamp(m2)
+
+
+def _clamp(duty):
+    return max(-DUTY_MAX, min(DUTY_MAX, duty))
+
+
+def main(argv=None):
+    """Run an emulator until interrupted."""
+    parser = argparse.ArgumentParser(prog='python -m roboclaw.emulator', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--address', type=lambda text: int(text, 0), default=0x80)
+    parser.add_argument('--baudrate', type=int, default=None, help='pace replies to this baud rate')
+    parser.add_argument('--latency', type=float, default=0.0, help='turnaround seconds')
+    parser.add_argument('--drop', type=float, default=0.0, help='chance of dropping a reply byte')
+    parser.add_argument('--corrupt', type=float, default=0.0, help='chance of a corrupt checksum')
+    parser.add_argument('--silent', type=float, default=0.0, help='chance of not replying')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    faults = Faults(args.drop, args.corrupt, args.silent, args.seed)
+    with RoboclawEmulator(args.address, args.baudrate, args.latency, faults) as emulator:
+        print(emulator.port, flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(emulator.stats)
+
+
+if __name__ == '__main__':
+    main()
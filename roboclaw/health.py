@@ -0,0 +1,213 @@
+"""A health monitor that polls a Roboclaw's status mask, temperatures and battery voltages, each at
+its own adaptive rate: slowly while a reading is steady and quickly while it is near a limit or
+flagged in the status mask. Changes are reported as `HealthEvent` objects."""
+import enum
+import threading
+import time
+
+class Status(enum.IntFlag):
+    """The bits of the status mask returned by `~roboclaw.Roboclaw.read_error()`."""
+    NORMAL = 0x0000
+    M1_OVERCURRENT_WARNING = 0x0001
+    M2_OVERCURRENT_WARNING = 0x0002
+    E_STOP = 0x0004
+    TEMPERATURE_ERROR = 0x0008
+    TEMPERATURE2_ERROR = 0x0010
+    MAIN_BATTERY_HIGH_ERROR = 0x0020
+    LOGIC_BATTERY_HIGH_ERROR = 0x0040
+    LOGIC_BATTERY_LOW_ERROR = 0x0080
+    MAIN_BATTERY_HIGH_WARNING = 0x0400
+    MAIN_BATTERY_LOW_WARNING = 0x0800
+    TEMPERATURE_WARNING = 0x1000
+    TEMPERATURE2_WARNING = 0x2000
+
+#: The bits that stop (or shut down) the motors.
+ERRORS = (Status.E_STOP | Status.TEMPERATURE_ERROR | Status.TEMPERATURE2_ERROR
+          | Status.MAIN_BATTERY_HIGH_ERROR | Status.LOGIC_BATTERY_HIGH_ERROR
+          | Status.LOGIC_BATTERY_LOW_ERROR)
+
+#: The readings a `HealthMonitor` polls besides the status mask, mapped to the status bits about
+#: them (which make the reading be polled quickly while they are set).
+READINGS = {
+    'temp': Status.TEMPERATURE_ERROR | Status.TEMPERATURE_WARNING,
+    'temp2': Status.TEMPERATURE2_ERROR | Status.TEMPERATURE2_WARNING,
+    'main_battery': (Status.MAIN_BATTERY_HIGH_ERROR | Status.MAIN_BATTERY_HIGH_WARNING
+                     | Status.MAIN_BATTERY_LOW_WARNING),
+    'logic_battery': Status.LOGIC_BATTERY_HIGH_ERROR | Status.LOGIC_BATTERY_LOW_ERROR,
+}
+
+#: The default ``(low, high)`` limits of each reading in degrees Celsius or volts (`None` for no
+#: limit). The Roboclaw flags its own battery limits in the status mask.
+LIMITS = {
+    'temp': (None, 85.0),
+    'temp2': (None, 85.0),
+    'main_battery': (None, None),
+    'logic_battery': (None, None),
+}
+
+
+class HealthEvent:
+    """A change seen by a `HealthMonitor`.
+
+    :param float timestamp: The `time.monotonic()` seconds at which the reading was taken.
+    :param str field: ``'error'`` for a change of the status mask, otherwise the reading (see
+        `READINGS`) that went past (or back within) one of its limits.
+    :param previous: The previous value (a `Status` for ``'error'``, otherwise `float` or `None`).
+    :param value: The new value.
+    """
+    __slots__ = ('timestamp', 'field', 'previous', 'value')
+
+    def __init__(self, timestamp, field, previous, value):
+        self.timestamp = timestamp
+        self.field = field
+        self.previous = previous
+        self.value = value
+
+    @property
+    def raised(self):
+        """The status bits that were set by this change (`Status.NORMAL` for readings)."""
+        return self.value & ~self.previous if self.field == 'error' else Status.NORMAL
+
+    @property
+    def cleared(self):
+        """The status bits that were cleared by this change (`Status.NORMAL` for readings)."""
+        return self.previous & ~self.value if self.field == 'error' else Status.NORMAL
+
+    def __repr__(self):
+        return 'HealthEvent({}: {!r} -> {!r})'.format(self.field, self.previous, self.value)
+
+
+class HealthMonitor:
+    """Polls one Roboclaw's health, batching the readings that are due at the same time into a
+    single `~roboclaw.Roboclaw.read_snapshot()` round-trip.
+
+    Each reading is polled every ``fast`` seconds of its ``(fast, slow)`` interval while it is
+    alerted, and the wait doubles (up to ``slow``) with every steady reading after that. The
+    status mask is alerted while any bit is set; a reading is alerted while it is within
+    ``margin`` of (or past) a limit, or while a status bit about it is set. A new status bit also
+    makes the readings it is about due right away.
+
+    Call `poll()` from the control loop (it returns at once if nothing is due), or `start()` a
+    background thread that does so::
+
+        health = HealthMonitor(rclaw, limits={'main_battery': (19.8, 25.2)})
+        ...
+        for event in health.poll():
+            if event.raised & ERRORS:
+                ...
+
+    :param ~roboclaw.Roboclaw rclaw: The driver to poll. Give the background thread a
+        `~roboclaw.bus.RoboclawHandle` if other threads use the same serial port.
+    :param dict limits: ``(low, high)`` limits keyed on reading, overriding `LIMITS`.
+    :param tuple error_interval: The ``(fast, slow)`` seconds between reads of the status mask.
+        Defaults to ``(0.005, 0.02)``.
+    :param tuple reading_interval: The ``(fast, slow)`` seconds between reads of the other
+        readings. Defaults to ``(0.1, 2.0)``.
+    :param float margin: The fraction of a limit within which a reading is alerted. Defaults to
+        0.1.
+    :param on_event: A callable that is given every `HealthEvent`, as well as `poll()` returning
+        them.
+    :param int address: The Roboclaw to poll. `None` (the default) polls ``rclaw``'s address.
+    """
+    def __init__(self, rclaw, limits=None, error_interval=(0.005, 0.02),
+                 reading_interval=(0.1, 2.0), margin=0.1, on_event=None, address=None):
+        self.rclaw = rclaw
+        self.limits = dict(LIMITS)
+        self.limits.update(limits or {})
+        self.margin = margin
+        self.on_event = on_event
+        self.address = address
+        self.values = dict.fromkeys(READINGS) #: the latest value of every reading
+        self.status = Status.NORMAL #: the latest status mask
+        self.failures = 0 #: polls that got no valid reply for a due reading
+        self._intervals = dict.fromkeys(READINGS, reading_interval)
+        self._intervals['error'] = error_interval
+        self._waits = {field: interval[0] for field, interval in self._intervals.items()}
+        self._due = dict.fromkeys(self._intervals, 0.0)
+        self._past = dict.fromkeys(READINGS, False)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start polling from a background thread.
+
+        :Returns: This `HealthMonitor` object."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='roboclaw-health', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    @property
+    def next_due(self):
+        """The `time.monotonic()` seconds at which the next reading is due."""
+        return min(self._due.values())
+
+    def poll(self):
+        """Read whatever is due now.
+
+        :Returns: A `list` of the `HealthEvent` objects of the changes seen (empty if nothing was
+            due).
+        """
+        now = time.monotonic()
+        due = [field for field, when in self._due.items() if when <= now]
+        if not due:
+            return []
+        snapshot = self.rclaw.read_snapshot(due, self.address)
+        events = []
+        for field in due:
+            value = getattr(snapshot, field)
+            if value is None: # try again soon
+                self.failures += 1
+                self._due[field] = now + self._intervals[field][0]
+                continue
+            if field == 'error':
+                alerted = self._update_status(Status(value), snapshot.timestamp, events)
+            else:
+                alerted = self._update_reading(field, value, snapshot.timestamp, events)
+            fast, slow = self._intervals[field]
+            self._waits[field] = fast if alerted else min(self._waits[field] * 2, slow)
+            self._due[field] = now + self._waits[field]
+        if self.on_event is not None:
+            for event in events:
+                self.on_event(event)
+        return events
+
+    def _update_status(self, status, timestamp, events):
+        previous, self.status = self.status, status
+        if status != previous:
+            events.append(HealthEvent(timestamp, 'error', previous, status))
+            for field, bits in READINGS.items():
+                if status & ~previous & bits:
+                    self._due[field] = 0.0
+        return bool(status)
+
+    def _update_reading(self, field, value, timestamp, events):
+        previous, self.values[field] = self.values[field], value
+        low, high = self.limits[field]
+        past = (low is not None and value < low) or (high is not None and value > high)
+        if past != self._past[field]:
+            self._past[field] = past
+            events.append(HealthEvent(timestamp, field, previous, value))
+        near = ((low is not None and value < low + abs(low) * self.margin)
+                or (high is not None and value > high - abs(high) * self.margin))
+        return near or bool(self.status & READINGS[field])
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(max(self.next_due - time.monotonic(), 0.0))
@@ -0,0 +1,239 @@
+"""A driver that survives losing its serial link: when the port throws or the Roboclaw stops
+answering (a brownout of its logic supply, a loose connector), it fails commands straight away
+while a background thread reopens the port with bounded backoff, finds the board's baud rate
+again and puts back the settings it had."""
+import enum
+import threading
+import time
+from .baud import BAUD_RATES, negotiate, probe
+from .calibration import CalibrationImage, sync_image
+from .policy import LinkDown, RoboclawError
+from .roboclaw import Roboclaw
+from .serial_commands import Cmd
+
+class LinkState(enum.Enum):
+    """The state of a `SupervisedRoboclaw`'s link."""
+    UP = 'up'
+    DOWN = 'down'
+
+
+class SupervisedRoboclaw(Roboclaw):
+    """A `~roboclaw.Roboclaw` that reconnects on its own. The link goes `LinkState.DOWN` when the
+    serial port raises an `OSError` (like `~serial.SerialException`) or ``failures`` transactions
+    in a row get no valid reply. While it is down, commands return `False` (and snapshots fail
+    every field), or raise `~roboclaw.LinkDown` under a `~roboclaw.RetryPolicy`, without touching
+    the port, and a background thread:
+
+    1. closes and reopens the serial port,
+    2. `~roboclaw.baud.probe()`\\ s for the board, at the rate the link had first, and raises the
+       rate back to that if the board came back at its saved one,
+    3. writes back the settings held by the `~roboclaw.Roboclaw.config` cache that differ from the
+       board's (see `~roboclaw.calibration.sync_image()`, but without the ``GETCONFIG`` bits,
+       which the probe takes care of),
+
+    retrying every ``backoff`` seconds (doubling up to the second value) until it works. Motor
+    commands are then sent again even if they repeat the last one (see ``keepalive``). The
+    `~roboclaw.Roboclaw.config` cache must have been loaded by then (`~roboclaw.baud.connect()`
+    loads it, or call its `~roboclaw.config.ConfigCache.refresh()`): without that the reconnection
+    thread raises `RuntimeError` (also kept in `error`) and leaves the link down, rather than bring
+    back a board that may have lost its settings. If a reset (like
+    `~roboclaw.Roboclaw.restore_defaults()`) emptied it since, there is nothing to put back and
+    the cache is loaded again from the board instead::
+
+        rclaw = SupervisedRoboclaw(Serial('/dev/ttyS1', 38400), config_cache=True).open()
+        ...
+        if rclaw.state is LinkState.UP:
+            rclaw.forward_backward_m1(96)
+
+    :param ~serial.Serial serial_obj: The serial obj associated with the serial port that is connected to the RoboClaw.
+    :param int failures: The failed transactions in a row after which the link is down.
+        Defaults to 10.
+    :param tuple backoff: The ``(first, longest)`` seconds between reconnection attempts.
+        Defaults to ``(0.01, 0.2)``.
+    :param on_state: A callable given the new `LinkState` whenever it changes (from the thread
+        that changed it).
+    :param kwargs: The other arguments of `~roboclaw.Roboclaw`.
+
+    Open its session first, or start it with `connect()` to leave finding the board to the
+    reconnection thread. Use one thread for the commands, like with `~roboclaw.Roboclaw`; the
+    reconnection thread only uses the port while the link is down.
+    """
+    def __init__(self, serial_obj, failures=10, backoff=(0.01, 0.2), on_state=None, **kwargs):
+        super().__init__(serial_obj, **kwargs)
+        self.failures = failures
+        self.backoff = backoff
+        self.on_state = on_state
+        self.state = LinkState.UP #: the `LinkState` of the link
+        self.error = None #: the exception (or `None` for unanswered transactions) that took the link down last
+        self.outages = 0 #: times the link went down
+        self.downtime = 0.0 #: seconds the last outage lasted (so far, while it is down)
+        self._failed = 0
+        self._since = None
+        self._rate = None # the baud rate the link had when it went down
+        self._first = None # the arguments of `connect()` until the link first comes up
+        self._stop = threading.Event()
+        self._thread = None
+
+    def connect(self, rates=BAUD_RATES, faster=(), on_rate=None):
+        """Start the session with the link `LinkState.DOWN` and let the reconnection thread open
+        the serial port and `~roboclaw.baud.probe()` for the board at each of ``rates`` in turn,
+        so a board that is off (or a port that isn't there yet) doesn't hold up the caller. Once
+        the board answers, the link is raised to the fastest of ``faster`` that works (see
+        `~roboclaw.baud.negotiate()`) and the `~roboclaw.Roboclaw.config` cache is loaded before
+        the link comes up.
+
+        :param on_rate: A callable given the baud rate of the link (from the reconnection thread)
+            when it first comes up.
+        :Returns: This object.
+        """
+        if not self._session:
+            self._session = True # the reconnection thread opens the port
+            self._first = (tuple(rates), tuple(faster), on_rate)
+            self._since = time.monotonic()
+            self.state = LinkState.DOWN
+            self._supervise()
+        return self
+
+    def close(self):
+        """Stop reconnecting and close the serial port."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        super().close()
+
+    def _blocked(self):
+        """`True` if the link is down and this isn't the reconnection thread"""
+        if self.state is LinkState.UP or threading.current_thread() is self._thread:
+            return False
+        self.downtime = time.monotonic() - self._since
+        return True
+
+    def _count(self, ok):
+        if ok:
+            self._failed = 0
+        else:
+            self._failed += 1
+            if self._failed >= self.failures:
+                self._lost(None)
+
+    def _exchange(self, buf, size, crc=None, timeout=None):
+        if self._blocked():
+            return False
+        try:
+            result = super()._exchange(buf, size, crc, timeout)
+        except OSError as exc:
+            self._lost(exc)
+            return False
+        # a multi-frame read (``crc`` is `None`) that stops short comes back as fewer bytes
+        self._count(result is not False and (crc is not None or not size or len(result) >= size))
+        return result
+
+    def _resync(self):
+        if self._blocked():
+            return False
+        try:
+            return super()._resync()
+        except OSError as exc:
+            self._lost(exc)
+            return False
+
+    def read_snapshot(self, fields=None, address=None, raw=False):
+        if self.policy is not None and self._blocked():
+            raise LinkDown('the link to address 0x{:02X} is down'.format(self.address if address is None else address))
+        return super().read_snapshot(fields, address, raw)
+
+    def _guarded(self, cmd, buf, size, crc=None):
+        if self._blocked():
+            raise LinkDown('the link to address 0x{:02X} is down'.format(buf[0]))
+        try:
+            result = super()._guarded(cmd, buf, size, crc)
+        except RoboclawError: # before OSError, which `DeadlineExceeded` also is
+            self._count(False)
+            raise
+        except OSError as exc:
+            self._lost(exc)
+            raise LinkDown('the link to address 0x{:02X} went down'.format(buf[0])) from exc
+        self._count(True)
+        return result
+
+    def _lost(self, error):
+        """take the link down and start reconnecting"""
+        if self.state is not LinkState.UP or threading.current_thread() is self._thread:
+            return
+        self.error = error
+        self.outages += 1
+        self._since = time.monotonic()
+        self.downtime = 0.0
+        self._rate = self.serial_obj.baudrate
+        self._set_state(LinkState.DOWN)
+        self._supervise()
+
+    def _supervise(self):
+        """start the reconnection thread"""
+        if self._thread is not None: # a previous reconnection thread that already finished
+            self._thread.join()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._recover, name='roboclaw-link', daemon=True)
+        self._thread.start()
+
+    def _set_state(self, state):
+        self.state = state
+        if self.on_state is not None:
+            self.on_state(state)
+
+    def _recover(self):
+        delay, longest = self.backoff
+        while not self._stop.wait(delay):
+            try:
+                if self._reconnect():
+                    break
+            except (OSError, RoboclawError):
+                pass
+            delay = min(delay * 2, longest)
+        else:
+            return
+        self._failed = 0
+        self._motor_writes.clear() # the board may have reset; send the next command regardless
+        self.downtime = time.monotonic() - self._since
+        self._set_state(LinkState.UP)
+
+    def _reconnect(self):
+        """one attempt to bring the link back: `True` if the board answers with its settings back"""
+        port = self.serial_obj
+        if self._session:
+            port.close()
+            port.open()
+        if self._first is not None:
+            return self._connect(*self._first)
+        rates = tuple(dict.fromkeys((self._rate, port.baudrate) + BAUD_RATES[::-1]))
+        found = probe(self, rates, settle=0.005)
+        if found is None:
+            return False
+        if found < self._rate: # back at its saved rate; a failed soak leaves the link slower
+            negotiate(self, (self._rate,), count=16, settle=0.005)
+        if self.config is None:
+            return True
+        settings = self.config.settings(self.address)
+        if not settings and self.config.loaded(self.address): # emptied by a reset
+            return self.config.refresh()
+        if not settings:
+            self.error = RuntimeError('no settings of Roboclaw 0x{:02X} to put back: its config cache '
+                                      'was never loaded'.format(self.address))
+            raise self.error
+        settings.pop(Cmd.GETCONFIG, None)
+        return not settings or sync_image(self, CalibrationImage(settings=settings), persist=False).ok
+
+    def _connect(self, rates, faster, on_rate):
+        """`_reconnect()` for the first time the link comes up (see `connect()`)"""
+        found = probe(self, rates, settle=0.005)
+        if found is None:
+            return False
+        if faster:
+            found = negotiate(self, faster, settle=0.005)
+        if self.config is not None and not self.config.refresh():
+            return False
+        self._first = None
+        if on_rate is not None:
+            on_rate(found)
+        return True
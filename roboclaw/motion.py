@@ -0,0 +1,184 @@
+"""A motion planner that turns a trajectory into the Roboclaw's buffered move commands and keeps
+its command buffers topped up, so a scripted motion runs on the board's own timing instead of on
+the host's control loop."""
+import threading
+from collections import deque
+from .serial_commands import Cmd
+
+BUFFER_SIZE = 64 #: The moves each motor's command buffer holds.
+EMPTY = 0x80 #: The buffer length that `~roboclaw.Roboclaw.read_buffer_length()` returns once the last move is done.
+
+
+class Segment:
+    """One buffered move of both motors.
+
+    :param int cmd: The command byte (`Cmd.MIXEDSPEEDACCELDIST` or `Cmd.MIXEDSPEEDACCELDECCELPOS`).
+    :param tuple args: Its arguments, without the trailing buffer flag.
+    """
+    __slots__ = ('cmd', 'args')
+
+    def __init__(self, cmd, args):
+        self.cmd = cmd
+        self.args = tuple(args)
+
+    @classmethod
+    def distance(cls, accel, speed1, distance1, speed2, distance2):
+        """A move of each motor by ``distance`` counts at the signed ``speed`` (counts per
+        second) after ramping at ``accel`` (see `~roboclaw.Roboclaw.speed_accel_distance_m1_m2()`)."""
+        return cls(Cmd.MIXEDSPEEDACCELDIST, (accel, speed1, distance1, speed2, distance2))
+
+    @classmethod
+    def position(cls, accel1, speed1, deccel1, position1, accel2, speed2, deccel2, position2):
+        """A move of each motor to an absolute encoder ``position`` (see
+        `~roboclaw.Roboclaw.speed_accel_deccel_position_m1_m2()`)."""
+        return cls(Cmd.MIXEDSPEEDACCELDECCELPOS,
+                   (accel1, speed1, deccel1, position1, accel2, speed2, deccel2, position2))
+
+    def __eq__(self, other):
+        if not isinstance(other, Segment):
+            return NotImplemented
+        return self.cmd == other.cmd and self.args == other.args
+
+    def __repr__(self):
+        return 'Segment({}, {})'.format(self.cmd, self.args)
+
+
+def split(waypoints, accel):
+    """Turn a trajectory into `Segment.distance()` moves, one between each pair of waypoints.
+
+    :param waypoints: ``(seconds, position_m1, position_m2)`` tuples in encoder counts, in order
+        of time. The first one is where the motors start.
+    :param int accel: The acceleration (counts per second per second) of every move.
+    :Returns: A `list` of `Segment`.
+
+    Each motor runs its own buffer, so a motor that holds still between two waypoints (while the
+    other one moves) starts its next move straight away; give it waypoints with a small motion
+    instead if the two must stay in step.
+    """
+    result = []
+    for (start, a1, a2), (end, b1, b2) in zip(waypoints, waypoints[1:]):
+        seconds = end - start
+        if seconds <= 0:
+            raise ValueError('waypoints must be in order of time')
+        moves = []
+        for delta in (b1 - a1, b2 - a2):
+            speed = round(delta / seconds)
+            if delta and not speed:
+                speed = 1 if delta > 0 else -1
+            moves += [speed, abs(delta)]
+        result.append(Segment.distance(accel, *moves))
+    return result
+
+
+class MotionPlanner:
+    """Feeds `Segment` moves to one Roboclaw's command buffers. Each `service()` reads the buffer
+    lengths (a single round-trip) and, once fewer than ``low`` moves are left in the fuller buffer,
+    tops it up to ``depth`` moves. Between calls the board runs the moves on its own, so the host
+    loop only needs to call `service()` before the buffer drains: every ``low`` moves' worth of
+    time, not every move. Call it from the control loop or `start()` a background thread::
+
+        planner = MotionPlanner(rclaw)
+        planner.extend(split([(0, 0, 0), (0.5, 4000, 4000), (1.0, 0, 0)], accel=20000))
+        while not planner.done:
+            planner.service()
+            ...
+
+    :param ~roboclaw.Roboclaw rclaw: The driver to send the moves with. Give the background thread
+        a `~roboclaw.bus.RoboclawHandle` if other threads use the same serial port.
+    :param int depth: The moves to keep buffered, at most `BUFFER_SIZE`. Defaults to 32.
+    :param int low: Top the buffers up once fewer moves than this are left. Defaults to half of
+        ``depth``.
+    :param float interval: The seconds between `service()` calls of the background thread.
+        Defaults to 0.05.
+    :param int address: The Roboclaw to drive. `None` (the default) drives ``rclaw``'s address.
+    """
+    def __init__(self, rclaw, depth=32, low=None, interval=0.05, address=None):
+        if not 0 < depth <= BUFFER_SIZE:
+            raise ValueError('depth must be in range [1, {}]'.format(BUFFER_SIZE))
+        self.rclaw = rclaw
+        self.depth = depth
+        self.low = depth // 2 if low is None else low
+        self.interval = interval
+        self.address = address
+        self.sent = 0 #: moves sent so far
+        self.buffered = None #: the moves left in the fuller buffer at the last `service()`: ``-1`` once finished, `None` before the first call
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def extend(self, segments):
+        """Queue ``segments`` after the moves already queued."""
+        with self._lock:
+            self._pending.extend(segments)
+
+    @property
+    def pending(self):
+        """The number of queued moves that are not sent yet."""
+        return len(self._pending)
+
+    @property
+    def done(self):
+        """`True` once every queued move has been sent and the last one has finished."""
+        return not self._pending and self.buffered == -1
+
+    def service(self):
+        """Read the buffer lengths and top the buffers up if they are running low.
+
+        :Returns: The number of moves sent, or `None` if the buffer lengths couldn't be read.
+        """
+        lengths = self.rclaw.read_buffer_length(address=self.address)
+        if not lengths:
+            return None
+        # -1 for a finished buffer, 0 while its last move executes
+        self.buffered = max(-1 if length == EMPTY else length for length in lengths[1:])
+        sent = 0
+        if self.buffered < self.low:
+            with self._lock:
+                while self._pending and self.buffered + sent < self.depth:
+                    segment = self._pending[0]
+                    if not self.rclaw._command(segment.cmd, *segment.args, 0, address=self.address): # pylint: disable=protected-access
+                        break
+                    self._pending.popleft()
+                    sent += 1
+            self.sent += sent
+            if sent: # an idle buffer starts executing the first move right away
+                self.buffered = self.buffered + sent if self.buffered >= 0 else sent - 1
+        return sent
+
+    def cancel(self):
+        """Drop the queued moves and stop both motors, clearing their buffers.
+
+        :Returns: `True` if the stop was acknowledged."""
+        with self._lock:
+            self._pending.clear()
+        return self.rclaw.speed_accel_distance_m1_m2(0, 0, 0, 0, 0, 1, address=self.address)
+
+    def start(self):
+        """Start calling `service()` every ``interval`` seconds from a background thread.
+
+        :Returns: This `MotionPlanner` object."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='roboclaw-motion', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread (the moves already buffered on the board still run)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.service()
+            self._stop.wait(self.interval)
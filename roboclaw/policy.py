@@ -0,0 +1,69 @@
+"""Deadlines, backoff and the exceptions that a `~roboclaw.Roboclaw` driver with a `RetryPolicy`
+raises instead of returning `False`."""
+from .codec import COMMANDS, DRIVE_MOTORS
+
+class RoboclawError(Exception):
+    """A transaction with the Roboclaw failed."""
+
+class DeadlineExceeded(RoboclawError, TimeoutError):
+    """The transaction didn't complete within its deadline."""
+
+class NoReply(RoboclawError):
+    """Every attempt went unanswered (or the reply stopped short)."""
+
+class BadReply(RoboclawError):
+    """The last attempt was answered with a corrupt reply (a failed checksum or a wrong ack)."""
+
+class LinkDown(RoboclawError):
+    """The serial link is being reconnected (see `~roboclaw.link.SupervisedRoboclaw`), so the
+    transaction wasn't attempted."""
+
+
+class RetryPolicy:
+    """How long a transaction may take and how it is retried. Give one to the `Roboclaw`
+    constructor to opt into deadlines and exceptions::
+
+        rclaw = Roboclaw(Serial('/dev/ttyS1', 38400), policy=RetryPolicy(drive=0.005))
+        try:
+            rclaw.forward_backward_m1(64)
+        except RoboclawError:
+            ...
+
+    :param float drive: The seconds a motor command may take, including retries. Defaults to 0.005.
+    :param float config: The seconds a command that changes a setting may take. Defaults to 0.05.
+    :param float telemetry: The seconds a read command may take. Defaults to 0.02.
+    :param int retries: The most attempts within a deadline. Defaults to 3.
+    :param float backoff: The seconds to wait after the first failed attempt (so the Roboclaw
+        drops the rest of a garbled frame). Defaults to 0.0005.
+    :param float factor: Multiplies the wait after each further failed attempt. Defaults to 2.
+    :param float max_backoff: The longest wait between attempts. Defaults to 0.005.
+
+    Waits never run past the deadline and the serial port's read timeout is set to what is left
+    of it before each attempt, so a call never blocks for longer than its deadline.
+    """
+    __slots__ = ('drive', 'config', 'telemetry', 'retries', 'backoff', 'factor', 'max_backoff')
+
+    def __init__(self, drive=0.005, config=0.05, telemetry=0.02, retries=3, backoff=0.0005,
+                 factor=2.0, max_backoff=0.005):
+        self.drive = drive
+        self.config = config
+        self.telemetry = telemetry
+        self.retries = retries
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+
+    def deadline(self, cmd):
+        """The seconds that a transaction of the ``cmd`` command byte may take."""
+        if cmd in DRIVE_MOTORS:
+            return self.drive
+        if COMMANDS[cmd].is_read:
+            return self.telemetry
+        return self.config
+
+    def delays(self):
+        """The waits between consecutive attempts."""
+        delay = self.backoff
+        for _ in range(self.retries - 1):
+            yield delay
+            delay = min(delay * self.factor, self.max_backoff)
@@ -1,17 +1,54 @@
 """roboclaw driver module contains the roboclaw driver class that controls
 the roboclaw via a UART serial"""
 import os
-from struct import pack, unpack
+import select
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from .serial_commands import Cmd
-from .data_manip import crc16, validate16
+from .codec import (COMMANDS, CONFIG_READS, CONFIG_RESETS, CONFIG_WRITES, CRC16, DRIVE_MOTORS,
+                    MAX_REPLY, MAX_REQUEST, MAX_VERSION)
+from .config import ConfigCache
+from .data_manip import crc_engine
+from .policy import BadReply, DeadlineExceeded, NoReply
+from .snapshot import SNAPSHOT_FIELDS, Snapshot, plan
 
 # pylint: disable=line-too-long,invalid-name,too-many-function-args,too-many-public-methods
 
-# this function doesn't need a self pointer
-def _recv(buf):
-    if validate16(buf):
-        return buf[:-2]
-    return False
+_CRC16 = crc_engine(16, 0x1021, 0)
+
+def _parse_snapshot(snapshot, pending, frames, reply):
+    """Store each valid reply in ``snapshot`` and return the part of ``pending`` that failed."""
+    failed = []
+    offset = 0
+    reply = memoryview(reply)
+    for (name, spec, store), (_, crc) in zip(pending, frames):
+        size = spec.reply.size
+        end = offset + size + 2
+        if end <= len(reply) and _CRC16.checksum(reply[offset:offset + size], crc) == CRC16.unpack_from(reply, offset + size)[0]:
+            setattr(snapshot, name, store(spec.reply.unpack_from(reply, offset)))
+        else:
+            failed.append((name, spec, store))
+        offset = end
+    return failed
+
+class LinkStats:
+    """Counters of the writes a `Roboclaw` has sent and the replies it has read."""
+    __slots__ = ('writes', 'suppressed', 'replies', 'crc_errors', 'timeouts', 'overruns', 'resyncs')
+
+    def __init__(self):
+        self.writes = 0 #: acknowledged commands that were sent
+        self.suppressed = 0 #: repeated motor commands that were not sent (see ``keepalive``)
+        self.replies = 0 #: replies that passed their checksum
+        self.crc_errors = 0 #: replies that failed their checksum (or lacked their terminator)
+        self.timeouts = 0 #: replies that stopped short
+        self.overruns = 0 #: `Cmd.GETVERSION` replies longer than `MAX_VERSION`
+        self.resyncs = 0 #: times the receive buffer was flushed after a failed reply
+
+    def __repr__(self):
+        return 'LinkStats({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__))
+
 
 class Roboclaw:
     """A driver class for the RoboClaw Motor Controller device.
@@ -19,8 +56,15 @@ class Roboclaw:
     :param ~serial.Serial serial_obj: The serial obj associated with the serial port that is connected to the RoboClaw.
     :param int address: The unique address assigned to the particular RoboClaw. Valid addresses range [``0x80``, ``0x87``].
     :param int retries: The amount of attempts to read/write data over the serial port. Defaults to 3.
+    :param int frame_cache: The number of fully framed packets to remember, so that repeating a command with the same arguments skips encoding and checksumming. Defaults to 64.
+    :param float keepalive: Opts into dropping a motor command that repeats the last acknowledged command (and arguments) of the same motors, unless this many seconds have passed since it was sent. Keep it below the Roboclaw's serial timeout. `None` (the default) sends every command.
+    :param RetryPolicy policy: Opts into per-command deadlines, backoff between attempts and exceptions (see `RetryPolicy`) for failed commands instead of returning `False`. `None` (the default) retries ``retries`` times and returns `False`.
+    :param bool config_cache: Opts into answering reads of settings (like `get_config()` or `read_m1_velocity_pid()`) from memory after the first one, with the ``set_*`` methods writing through to the cache (see `ConfigCache`, which is the `config` attribute). Defaults to `False`.
+
+    Use the object as a context manager (or call `open()`/`close()`) to keep the serial port open
+    across commands instead of reopening it for every transaction.
     """
-    def __init__(self, serial_obj, address=0x80, retries=3, packet_serial=True):
+    def __init__(self, serial_obj, address=0x80, retries=3, packet_serial=True, frame_cache=64, keepalive=None, policy=None, config_cache=False):
         self.serial_obj = serial_obj
         self.serial_obj.close()
         self._retries = retries
@@ -28,6 +72,73 @@ class Roboclaw:
         if address not in range(0x80, 0x88):
             raise ValueError('Unsupported specified address: {address}')
         self._address = address
+        self._session = False
+        self._crc_seeds = {} # CRC16 of an address byte, keyed on address
+        self._frames = OrderedDict() # LRU of (frame, CRC16) keyed on (address, cmd, args)
+        self._frame_cache = frame_cache
+        # preallocated buffers (and views of every length into them) for building frames and
+        # reading acks without allocating new objects per command
+        self._frame_buf = bytearray(MAX_REQUEST)
+        view = memoryview(self._frame_buf)
+        self._frame_views = tuple(view[:n] for n in range(MAX_REQUEST + 1))
+        self._frame_bodies = tuple(view[1:n] for n in range(MAX_REQUEST + 1))
+        self._ack_buf = bytearray(1)
+        self._reply_buf = bytearray(MAX_REPLY)
+        self._reply_view = memoryview(self._reply_buf)
+        self.policy = policy
+        self._deadline = None # overrides the policy's deadlines (see `deadline()`)
+        self._until = None # the `time.monotonic()` by which the current `_attempt()` must end
+        self.keepalive = keepalive
+        self._motor_writes = {} # (cmd, args, sent at) of the last acked command keyed on (address, motor)
+        self.stats = LinkStats() #: The `LinkStats` of the writes and replies so far.
+        self.config = ConfigCache(self) if config_cache else None #: The `ConfigCache` (or `None`).
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def open(self):
+        """Open the serial port and keep it open for every following command until `close()` is
+        called. Without an open session, each command opens and closes the serial port on its
+        own, which costs more than the transaction itself at control loop rates.
+
+        :Returns: This `Roboclaw` object, so that ``rclaw = Roboclaw(port).open()`` works."""
+        if not self._session:
+            self.serial_obj.__enter__()
+            self._session = True
+        return self
+
+    def close(self):
+        """End a session started with `open()` and close the serial port."""
+        if self._session:
+            self._session = False
+            self._motor_writes.clear()
+            self.serial_obj.__exit__(None, None, None)
+
+    @property
+    def is_open(self):
+        """`True` while a session started with `open()` (or a ``with`` block) holds the serial
+        port open."""
+        return self._session
+
+    @contextmanager
+    def deadline(self, seconds):
+        """Give each command within a ``with`` block ``seconds`` to complete (instead of the
+        deadline that the `policy` gives its kind of command)::
+
+            with rclaw.deadline(0.005):
+                rclaw.forward_backward_m1(64) # stop the weapon, now
+        """
+        if self.policy is None:
+            raise RuntimeError('deadlines need a RetryPolicy')
+        previous, self._deadline = self._deadline, seconds
+        try:
+            yield self
+        finally:
+            self._deadline = previous
 
     @property
     def address(self):
@@ -40,6 +151,222 @@ class Roboclaw:
         assert addr in range(0x80, 0x88)
         self._address = addr
 
+    def _crc_seed(self, address):
+        """get the CRC16 of the ``address`` byte"""
+        seed = self._crc_seeds.get(address)
+        if seed is None:
+            seed = self._crc_seeds[address] = _CRC16.checksum((address,))
+        return seed
+
+    def _frame(self, cmd, args, address):
+        """Get the packet that sends ``cmd`` with ``args`` to ``address`` and the CRC16 of every
+        byte in it (excluding its own checksum). Recently used packets come from an LRU cache.
+        Other packets are packed into a preallocated buffer, so with ``frame_cache=0`` the
+        returned packet is only valid until the next call."""
+        key = (address, cmd, args)
+        entry = self._frames.get(key)
+        if entry is not None:
+            self._frames.move_to_end(key)
+            return entry
+        spec = COMMANDS[cmd]
+        size = spec.request.size
+        spec.request.pack_into(self._frame_buf, 0, address, cmd, *args)
+        crc = _CRC16.checksum(self._frame_bodies[size], self._crc_seed(address))
+        if self.packet_serial and not spec.is_read:
+            CRC16.pack_into(self._frame_buf, size, crc)
+            size += CRC16.size
+        if not self._frame_cache:
+            return self._frame_views[size], crc
+        entry = self._frames[key] = (bytes(self._frame_views[size]), crc)
+        if len(self._frames) > self._frame_cache:
+            self._frames.popitem(last=False)
+        return entry
+
+    def _command(self, cmd, *args, address=None):
+        """Send a command that the Roboclaw acknowledges with ``0xFF``.
+
+        :Returns: `True` if the command was acknowledged, otherwise `False` (or see `policy`).
+        """
+        assert address is None or address in range(0x80, 0x88)
+        address = self._address if address is None else address
+        if self.config is not None and (cmd in CONFIG_WRITES or cmd in CONFIG_RESETS):
+            return self.config.write(cmd, args, address)
+        return self._write_command(cmd, args, address)
+
+    def _write_command(self, cmd, args, address):
+        """`_command()` without the `config` cache"""
+        if self.keepalive is not None:
+            return self._refresh(cmd, args, address)
+        self.stats.writes += 1
+        frame = self._frame(cmd, args, address)[0]
+        if self.policy is None:
+            return self._exchange(frame, None)
+        return self._guarded(cmd, frame, None)
+
+    def _refresh(self, cmd, args, address):
+        """`_command()` that skips a motor command which repeats what its motors were last sent
+        less than `keepalive` seconds ago"""
+        motors = DRIVE_MOTORS.get(cmd, ())
+        now = time.monotonic()
+        for motor in motors:
+            last = self._motor_writes.get((address, motor))
+            if last is None or last[0] != cmd or last[1] != args or now - last[2] >= self.keepalive:
+                break
+        else:
+            if motors:
+                self.stats.suppressed += 1
+                return True
+        self.stats.writes += 1
+        frame = self._frame(cmd, args, address)[0]
+        acked = False
+        try:
+            acked = self._exchange(frame, None) if self.policy is None else self._guarded(cmd, frame, None)
+        finally:
+            if not motors: # settings (like `restore_defaults()`) may change what the motors do
+                for key in [key for key in self._motor_writes if key[0] == address]:
+                    del self._motor_writes[key]
+            for motor in motors:
+                if acked:
+                    self._motor_writes[(address, motor)] = (cmd, args, now)
+                else:
+                    self._motor_writes.pop((address, motor), None)
+        return acked
+
+    def _query(self, cmd, *args, address=None):
+        """Send a read command and decode its reply (see `COMMANDS`).
+
+        :Returns: The decoded reply or `False` if no valid reply was received (or see `policy`).
+        """
+        assert address is None or address in range(0x80, 0x88)
+        address = self._address if address is None else address
+        spec = COMMANDS[cmd]
+        if self.config is not None and cmd in CONFIG_READS:
+            data = self.config.read(cmd, address)
+            return False if data is False else spec.convert(data)
+        payload = self._payload(cmd, args, address)
+        return False if payload is False else spec.unpack(payload)
+
+    def _payload(self, cmd, args, address):
+        """send a read command and get its reply's payload (without the checksum), retrying like
+        `_query()` does. `False` if no valid reply was received (or see `policy`)."""
+        spec = COMMANDS[cmd]
+        frame, crc = self._frame(cmd, args, address)
+        size = 0 if spec.terminated else spec.reply.size + 2
+        if self.policy is not None:
+            return self._guarded(cmd, frame, size, crc)
+        for _ in range(self._retries):
+            payload = self._exchange(frame, size, crc)
+            if payload is not False:
+                return payload
+        return False
+
+    def _guarded(self, cmd, buf, size, crc=None):
+        """`_exchange()` under the `policy`: attempt the transaction until it succeeds, its
+        deadline passes or the policy's retries run out, backing off between attempts.
+
+        :Returns: `True` for an ack or the payload of a reply.
+        :Raises: `DeadlineExceeded`, `NoReply` or `BadReply`.
+        """
+        seconds = self.policy.deadline(cmd) if self._deadline is None else self._deadline
+        deadline = time.monotonic() + seconds
+        if self._session:
+            return self._retry(buf, size, crc, deadline, seconds)
+        with self.serial_obj:
+            return self._retry(buf, size, crc, deadline, seconds)
+
+    def _retry(self, buf, size, crc, deadline, seconds):
+        delays = self.policy.delays()
+        error = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded('command {} to address 0x{:02X} missed its {:g} ms deadline'.format(
+                    buf[1], buf[0], seconds * 1000)) from error
+            try:
+                return self._attempt(buf, size, crc, remaining)
+            except (NoReply, BadReply) as exc:
+                error = exc
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                self._sleep(max(min(delay, deadline - time.monotonic()), 0))
+
+    def _sleep(self, seconds):
+        """back off between attempts"""
+        time.sleep(seconds)
+
+    def _attempt(self, buf, size, crc, timeout):
+        """one attempt of a `_guarded()` transaction that waits at most ``timeout`` seconds for
+        the response. A read of several back-to-back replies (``size`` without ``crc``) returns
+        the bytes that arrived in time"""
+        self._until = time.monotonic() + timeout
+        try:
+            self.serial_obj.write(buf)
+            if crc is not None:
+                errors = self.stats.crc_errors + self.stats.overruns
+                payload = self._receive(size, crc)
+                if payload is not False:
+                    return payload
+                if self.stats.crc_errors + self.stats.overruns != errors:
+                    raise BadReply('corrupt reply to command {} from address 0x{:02X}'.format(buf[1], buf[0]))
+            elif size:
+                reply = self._read(size)
+                if reply:
+                    return reply
+            elif self._readinto(self._ack_buf):
+                if self._ack_buf[0] == 0xff:
+                    return True
+                self._resync()
+                raise BadReply('command {} to address 0x{:02X} got a bad ack'.format(buf[1], buf[0]))
+            raise NoReply('no reply to command {} from address 0x{:02X}'.format(buf[1], buf[0]))
+        finally:
+            self._until = None
+
+    def _snapshot_frame(self, cmd, address):
+        """`_frame()` of a read command that stays valid after the next call"""
+        frame, crc = self._frame(cmd, (), address)
+        return bytes(frame), crc
+
+    def _read_batch(self, queries, address, burst=16):
+        """Send the read ``queries`` (``(cmd, args)`` pairs) ``burst`` at a time, each burst as
+        a single write of back-to-back frames and a single read of all their replies (like
+        `read_snapshot()`), and retry the queries whose reply failed its checksum.
+
+        :Returns: A `list` of the unpacked reply `tuple` of each query (`None` for a query that
+            got no valid reply).
+        """
+        results = [None] * len(queries)
+        pending = list(range(len(queries)))
+        for _ in range(self._retries):
+            failed = []
+            for start in range(0, len(pending), burst):
+                chunk = pending[start:start + burst]
+                frames = []
+                for index in chunk:
+                    cmd, args = queries[index]
+                    frame = COMMANDS[cmd].request.pack(address, cmd, *args)
+                    frames.append((frame, _CRC16.checksum(frame)))
+                size = sum(COMMANDS[queries[index][0]].reply.size + 2 for index in chunk)
+                reply = memoryview(self._exchange(b''.join(frame for frame, _ in frames), size) or b'')
+                offset = 0
+                errors = len(failed)
+                for index, (_, crc) in zip(chunk, frames):
+                    spec = COMMANDS[queries[index][0]]
+                    end = offset + spec.reply.size
+                    if end + 2 <= len(reply) and _CRC16.checksum(reply[offset:end], crc) == CRC16.unpack_from(reply, end)[0]:
+                        self.stats.replies += 1
+                        results[index] = spec.reply.unpack_from(reply, offset)
+                    else:
+                        self.stats.crc_errors += 1
+                        failed.append(index)
+                    offset = end + 2
+                if len(failed) > errors and self._session:
+                    self._resync() # drop the rest of a garbled burst
+            pending = failed
+            if not pending:
+                break
+        return results
+
     def _send(self, buf, ack=None, address=None, crc=True):
         """
         :param bytearray buf: the message to send (not including address nor CRC16 checksum)
@@ -55,25 +382,165 @@ class Roboclaw:
             serial" mode using the Ion Motion Studio software or using `set_config()` and setting
             `packet_serial` to `False`.
         """
-        trys = self._retries
         assert address is None or address in range(0x80, 0x88)
-        buf = bytes(([self._address] if address is None else [address])) + buf
+        address = self._address if address is None else address
         if self.packet_serial:
-            checksum = crc16(buf)
-            buf += bytes([checksum >> 8, checksum & 0xff])
+            checksum = _CRC16.checksum(buf, self._crc_seed(address))
+            buf = bytes([address]) + buf + CRC16.pack(checksum)
+        else:
+            buf = bytes([address]) + buf
+        if ack:
+            ack += 2 if self.packet_serial and crc else 0
+        return self._exchange(buf, ack)
+
+    def _exchange(self, buf, size, crc=None, timeout=None):
+        """write a fully framed ``buf`` and read the response, opening the serial port for the
+        transaction unless a session holds it open. See `_transact()` for ``size``, ``crc`` and
+        ``timeout``."""
+        if self._session:
+            return self._transact(buf, size, crc, timeout)
         with self.serial_obj:
-            while trys:
-                self.serial_obj.write(buf)
-                if ack is None: # expects blanket ack
-                    response = self.serial_obj.read(1)
-                    if response: # if not timeout
-                        if unpack('>B', response)[0] == 0xff:
-                            return True
-                elif not ack:
-                    return self.serial_obj.read_until() # special case ack terminated w/ '\n' char
-                else: # for passing ack to _recv()
-                    return self.serial_obj.read(ack + (2 if self.packet_serial and crc else 0))
-                trys -= 1
+            return self._transact(buf, size, crc, timeout)
+
+    def _transact(self, buf, size, crc=None, timeout=None):
+        """write a fully framed ``buf`` and read the response on an already opened serial port.
+
+        :param int size: The number of bytes to read in response (including any checksum).
+            `None` reads 1 byte (expected to be ``0xFF``) and returns `True` if successful. ``0``
+            reads a line feed and null terminated string followed by its CRC16 checksum.
+        :param int crc: The CRC16 of ``buf`` for a read command. If given, the reply is
+            checked as it arrives (see `_receive()`) and only its payload is returned (or `False`).
+        :param float timeout: Makes this a single `_attempt()` that waits at most this many
+            seconds for the response (and returns `False` if it fails).
+        """
+        if timeout is not None:
+            try:
+                return self._attempt(buf, size, crc, timeout)
+            except (NoReply, BadReply):
+                return False
+        if crc is not None:
+            self.serial_obj.write(buf)
+            return self._receive(size, crc)
+        trys = self._retries
+        while trys:
+            self.serial_obj.write(buf)
+            if size is None: # expects blanket ack
+                if self.serial_obj.readinto(self._ack_buf) and self._ack_buf[0] == 0xff: # if not timeout
+                    return True
+            elif not size: # special case ack terminated w/ '\n' then '\0' chars
+                return self.serial_obj.read_until() + self.serial_obj.read(3)
+            else:
+                return self.serial_obj.read(size)
+            trys -= 1
+        return False
+
+    def _receive(self, size, crc):
+        """read a reply of ``size`` bytes (see `_transact()`) while shifting each chunk of its
+        payload into ``crc`` as soon as it arrives, so the checksum is ready with the last byte.
+        A reply that stops short, runs too long or fails its checksum is rejected right away
+        and the receive buffer is flushed, so a retry starts on a frame boundary.
+
+        :Returns: The payload (without the checksum) or `False`.
+        """
+        if not size:
+            line = self._read_line()
+            if len(line) > MAX_VERSION:
+                self.stats.overruns += 1
+                return self._resync()
+            tail = self._read(3) if line.endswith(b'\n') else b''
+            if len(tail) < 3:
+                self.stats.timeouts += 1
+                return self._resync()
+            payload = line + tail[:1]
+            if tail[0] or _CRC16.checksum(payload, crc) != CRC16.unpack_from(tail, 1)[0]:
+                self.stats.crc_errors += 1
+                return self._resync()
+            self.stats.replies += 1
+            return payload
+        end = size - CRC16.size
+        view = self._reply_view
+        received = 0
+        while received < size:
+            count = self._readinto(view[received:size])
+            if not count:
+                self.stats.timeouts += 1
+                return self._resync()
+            if received < end:
+                crc = _CRC16.checksum(view[received:min(received + count, end)], crc)
+            received += count
+        if crc != CRC16.unpack_from(self._reply_buf, end)[0]:
+            self.stats.crc_errors += 1
+            return self._resync()
+        self.stats.replies += 1
+        return bytes(view[:end])
+
+    def _readinto(self, view):
+        """`readinto()` that gives up at the end of the current `_attempt()` (if any). The wait
+        is a `select.select()` on the port's file descriptor rather than a new port timeout, since
+        pyserial reconfigures the whole port (``tcsetattr``) on every timeout change.
+
+        :Returns: The number of bytes read, which may be fewer than ``len(view)``.
+        """
+        port = self.serial_obj
+        if self._until is None:
+            return port.readinto(view)
+        remaining = self._until - time.monotonic()
+        if remaining <= 0:
+            return 0
+        try:
+            fd = port.fileno()
+        except (AttributeError, OSError, ValueError): # not a file descriptor based port
+            previous, port.timeout = port.timeout, remaining
+            try:
+                return port.readinto(view)
+            finally:
+                port.timeout = previous
+        if not select.select((fd,), (), (), remaining)[0]:
+            return 0
+        try:
+            return os.readv(fd, (view,))
+        except BlockingIOError:
+            return 0
+
+    def _read(self, size):
+        """read up to ``size`` bytes with `_readinto()`. Once bytes arrive, it stops early when
+        nothing more does within the port's timeout, so a burst of replies that lost one doesn't
+        hold the attempt until its deadline."""
+        if self._until is None:
+            return self.serial_obj.read(size)
+        buf = bytearray(size)
+        view = memoryview(buf)
+        received = 0
+        until, idle = self._until, self.serial_obj.timeout
+        try:
+            while received < size:
+                count = self._readinto(view[received:])
+                if not count:
+                    break
+                received += count
+                if idle is not None:
+                    self._until = min(until, time.monotonic() + idle)
+        finally:
+            self._until = until
+        return bytes(buf[:received])
+
+    def _read_line(self):
+        """read up to a line feed (or past `MAX_VERSION` bytes) with `_readinto()`"""
+        if self._until is None:
+            return self.serial_obj.read_until()
+        line = bytearray()
+        while len(line) <= MAX_VERSION and not line.endswith(b'\n'):
+            if not self._readinto(self._ack_buf):
+                break
+            line += self._ack_buf
+        return bytes(line)
+
+    def _resync(self):
+        """discard whatever is left of a failed reply"""
+        self.stats.resyncs += 1
+        flush = getattr(self.serial_obj, 'reset_input_buffer', None)
+        if flush is not None:
+            flush()
         return False
 
     # User accessible functions
@@ -81,10 +548,7 @@ class Roboclaw:
         """Send some randomly generated data of of a certain length. Don't know what this would be used for, but it was in the original driver code...
 
         :param int cnt: the number of bytes to randomly generate."""
-        buf = b''
-        for _ in range(cnt):
-            buf += pack('>B', os.urandom(1))
-        self._send(buf, address=address)
+        return self._send(os.urandom(cnt), address=address)
 
     def forward_m1(self, val, address=None):
         """Drive motor 1 forward.
@@ -92,7 +556,7 @@ class Roboclaw:
         :param int val: Valid data range is 0 - 127. A value of 127 = full speed forward, 64 = about half speed forward and 0 = full stop.
         """
         # :Sends: [Address, 0, Value]
-        return self._send(pack('>BB', Cmd.M1FORWARD, val), address=address)
+        return self._command(Cmd.M1FORWARD, val, address=address)
 
     def backward_m1(self, val, address=None):
         """Drive motor 1 backwards.
@@ -100,7 +564,7 @@ class Roboclaw:
         :param int val: Valid data range is 0 - 127. A value of 127 full speed backwards, 64 = about half speed backward and 0 = full stop.
         """
         # :Sends: [Address, 1, Value]
-        return self._send(pack('>BB', Cmd.M1BACKWARD, val), address=address)
+        return self._command(Cmd.M1BACKWARD, val, address=address)
 
     def set_min_voltage_main_battery(self, val, address=None):
         """Sets main battery (B- / B+) minimum voltage level. If the battery voltages drops below the set voltage level, RoboClaw will stop driving the motors. The voltage is set in .2 volt increments. The minimum value allowed which is 6V.
@@ -111,7 +575,7 @@ class Roboclaw:
         # translated byte value range = [0, 140]
         # The formula for calculating the voltage is: (Desired Volts - 6) x 5 = Value.
         # Examples of valid values are 6V = 0, 8V = 10 and 11V = 25.
-        return self._send(pack('>BB', Cmd.SETMINMB, int(val / 5 + 6)), address=address)
+        return self._command(Cmd.SETMINMB, int(val / 5 + 6), address=address)
 
     def set_max_voltage_main_battery(self, val, address=None):
         """Sets main battery (B- / B+) maximum voltage level. During regenerative breaking a back voltage is applied to charge the battery. When using a power supply, by setting the maximum voltage level, RoboClaw will, before exceeding it, go into hard braking mode until the voltage drops below the maximum value set. This will prevent overvoltage conditions when using power supplies.
@@ -122,7 +586,7 @@ class Roboclaw:
         # translated byte value range = [30, 175]
         # The formula for calculating the voltage is: Desired Volts x 5.12 = Value.
         # Examples of valid values are 12V = 62, 16V = 82 and 24V = 123.
-        return self._send(pack('>BB', Cmd.SETMAXMB, int(val / 5.12)), address=address)
+        return self._command(Cmd.SETMAXMB, int(val / 5.12), address=address)
 
     def forward_m2(self, val, address=None):
         """Drive motor 2 forward.
@@ -130,7 +594,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 127 full speed forward, 64 = about half speed forward and 0 = full stop.
         """
         # :Sends: [Address, 4, Value]
-        return self._send(pack('>BB', Cmd.M2FORWARD, val), address=address)
+        return self._command(Cmd.M2FORWARD, val, address=address)
 
     def backward_m2(self, val, address=None):
         """Drive motor 2 backwards.
@@ -138,7 +602,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 127 full speed backwards, 64 = about half speed backward and 0 = full stop.
         """
         # :Sends: [Address, 5, Value]
-        return self._send(pack('>BB', Cmd.M2BACKWARD, val), address=address)
+        return self._command(Cmd.M2BACKWARD, val, address=address)
 
     def forward_backward_m1(self, val, address=None):
         """Drive motor 1 forward or reverse.
@@ -146,7 +610,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = full speed reverse, 64 = stop and 127 = full speed forward.
         """
         # :Sends: [Address, 6, Value]
-        return self._send(pack('>BB', Cmd.M17BIT, val), address=address)
+        return self._command(Cmd.M17BIT, val, address=address)
 
     def forward_backward_m2(self, val, address=None):
         """Drive motor 2 forward or reverse.
@@ -154,7 +618,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = full speed reverse, 64 = stop and 127 = full speed forward.
         """
         # :Sends: [Address, 7, Value]
-        return self._send(pack('>BB', Cmd.M27BIT, val), address=address)
+        return self._command(Cmd.M27BIT, val, address=address)
 
     def forward_mixed(self, val, address=None):
         """Drive forward in mix mode.
@@ -162,7 +626,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = full stop and 127 = full forward.
         """
         # :Sends: [Address, 8, Value]
-        return self._send(pack('>BB', Cmd.MIXEDFORWARD, val), address=address)
+        return self._command(Cmd.MIXEDFORWARD, val, address=address)
 
     def backward_mixed(self, val, address=None):
         """Drive backwards in mix mode.
@@ -170,7 +634,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = full stop and 127 = full reverse.
         """
         # :Sends: [Address, 9, Value]
-        return self._send(pack('>BB', Cmd.MIXEDBACKWARD, val), address=address)
+        return self._command(Cmd.MIXEDBACKWARD, val, address=address)
 
     def turn_right_mixed(self, val, address=None):
         """Turn right in mix mode.
@@ -178,7 +642,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = stop turn and 127 = full speed turn.
         """
         # :Sends: [Address, 10, Value]
-        return self._send(pack('>BB', Cmd.MIXEDRIGHT, val), address=address)
+        return self._command(Cmd.MIXEDRIGHT, val, address=address)
 
     def turn_left_mixed(self, val, address=None):
         """Turn left in mix mode.
@@ -186,7 +650,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = stop turn and 127 = full speed turn.
         """
         # :Sends: [Address, 11, Value]
-        return self._send(pack('>BB', Cmd.MIXEDLEFT, val), address=address)
+        return self._command(Cmd.MIXEDLEFT, val, address=address)
 
     def forward_backward_mixed(self, val, address=None):
         """Drive forward or backwards.
@@ -194,7 +658,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = full backward, 64 = stop and 127 = full forward.
         """
         # :Sends: [Address, 12, Value]
-        return self._send(pack('>BB', Cmd.MIXEDFB, val), address=address)
+        return self._command(Cmd.MIXEDFB, val, address=address)
 
     def left_right_mixed(self, val, address=None):
         """Turn left or right.
@@ -202,7 +666,7 @@ class Roboclaw:
         :param int val: Valid data range is [0, 127]. A value of 0 = full left, 64 = stop turn and 127 = full right.
         """
         # :Sends: [Address, 13, Value]
-        return self._send(pack('>BB', Cmd.MIXEDLR, val), address=address)
+        return self._command(Cmd.MIXEDLR, val, address=address)
 
     def read_encoder_m1(self, address=None):
         """Read M1 encoder count/position.
@@ -218,7 +682,7 @@ class Roboclaw:
         * Bit2 - Counter Overflow (1= Underflow Occurred, Clear After Reading)
         * Bit3 through Bit7 - Reserved
         """
-        return unpack('>iB', _recv(self._send(pack('>B', Cmd.GETM1ENC), address=address, ack=5)))
+        return self._query(Cmd.GETM1ENC, address=address)
 
     def read_encoder_m2(self, address=None):
         """ Read M2 encoder count/position.
@@ -235,7 +699,7 @@ class Roboclaw:
         * Bit3 through Bit7 - Reserved
 
         """
-        return unpack('>IB', _recv(self._send(pack('>B', Cmd.GETM2ENC), address=address, ack=5)))
+        return self._query(Cmd.GETM2ENC, address=address)
 
     def read_speed_m1(self, address=None):
         """Read M1 counter speed. Returned value is in pulses per second. MCP keeps track of how many pulses received per second for both encoder channels.
@@ -244,7 +708,7 @@ class Roboclaw:
 
         Status indicates the direction (0 – forward, 1 - backward).
         """
-        return unpack('>IB', _recv(self._send(pack('>B', Cmd.GETM1SPEED), address=address, ack=5)))
+        return self._query(Cmd.GETM1SPEED, address=address)
 
     def read_speed_m2(self, address=None):
         """Read M2 counter speed. Returned value is in pulses per second. MCP keeps track of how many pulses received per second for both encoder channels.
@@ -253,11 +717,11 @@ class Roboclaw:
 
         Status indicates the direction (0 – forward, 1 - backward).
         """
-        return unpack('>IB', _recv(self._send(pack('>B', Cmd.GETM2SPEED), address=address, ack=5)))
+        return self._query(Cmd.GETM2SPEED, address=address)
 
     def reset_encoders(self, address=None):
         """Will reset both quadrature decoder counters to zero. This command applies to quadrature encoders only."""
-        return self._send(pack('>B', Cmd.RESETENC), address=address)
+        return self._command(Cmd.RESETENC, address=address)
 
     def read_version(self, address=None):
         """Read RoboClaw firmware version. Returns up to 48 bytes(depending on the Roboclaw model) and is terminated by a line feed character and a null character.
@@ -266,18 +730,15 @@ class Roboclaw:
 
         The command will return up to 48 bytes. The return string includes the product name and firmware version. The return string is terminated with a line feed (10) and null (0) character.
         """
-        version = _recv(self._send(pack('>B', Cmd.GETVERSION), address=address, ack=0))
-        if version:
-            return ''.join(chr(c) for c in version[:-2])
-        return 'Unknown. Read command failed'
+        return self._query(Cmd.GETVERSION, address=address)
 
     def set_enc_m1(self, cnt, address=None):
         """Set the value of the Encoder 1 register. Useful when homing motor 1. This command applies to quadrature encoders only."""
-        return self._send(pack('>BI', Cmd.SETM1ENCCOUNT, cnt), address=address)
+        return self._command(Cmd.SETM1ENCCOUNT, cnt, address=address)
 
     def set_enc_m2(self, cnt, address=None):
         """Set the value of the Encoder 2 register. Useful when homing motor 2. This command applies to quadrature encoders only."""
-        return self._send(pack('>BI', Cmd.SETM2ENCCOUNT, cnt), address=address)
+        return self._command(Cmd.SETM2ENCCOUNT, cnt, address=address)
 
     def read_main_battery_voltage(self, address=None):
         """Read the main battery voltage level connected to B+ and B- terminals.
@@ -285,17 +746,14 @@ class Roboclaw:
         :Returns: The voltage is returned in 10ths of a volt (eg 30.0).
         """
         # :Returns: [Value(2 bytes)]The voltage is returned in 10ths of a volt(eg 300 = 30v).
-        return unpack('>h', _recv(self._send(pack('>B', Cmd.GETMBATT), address=address, ack=2)))[0] / 10
+        return self._query(Cmd.GETMBATT, address=address)
 
     def read_logic_battery_voltage(self, address=None):
-        """Read a logic battery voltage level connected to LB+ and LB- terminals. The voltage is returned in 10ths of a volt(eg 50 = 5v).
+        """Read a logic battery voltage level connected to LB+ and LB- terminals.
 
-        :Returns: [Value.Byte1, Value.Byte0]
+        :Returns: The voltage is returned in 10ths of a volt (eg 5.0).
         """
-        data = unpack('>BB', _recv(self._send(pack('>B', Cmd.GETLBATT), address=address, ack=2)))
-        if data:
-            return data
-        return (0, 0)
+        return self._query(Cmd.GETLBATT, address=address)
 
     def set_min_voltage_logic_battery(self, val, address=None):
         """
@@ -308,7 +766,7 @@ class Roboclaw:
         # translated byte value range = [0, 140]
         # The formula for calculating the voltage is: (Desired Volts - 6) x 5 = Value.
         # Examples of valid values are 6V = 0, 8V = 10 and 11V = 25.
-        return self._send(pack('>BB', Cmd.SETMINLB, int(val / 5 + 6), address=address))
+        return self._command(Cmd.SETMINLB, int(val / 5 + 6), address=address)
 
     def set_max_voltage_logic_battery(self, val, address=None):
         """Sets logic input (LB- / LB+) maximum voltage level. RoboClaw will shutdown with an error if the voltage is above this level.
@@ -320,7 +778,7 @@ class Roboclaw:
         # translated byte value ranges [30, 175]
         # The formula for calculating the voltage is: Desired Volts x 5.12 = Value.
         # Examples of valid values are 12V = 62, 16V = 82 and 24V = 123.
-        return self._send(pack('>BB', Cmd.SETMAXLB, int(val / 5.12), address=address))
+        return self._command(Cmd.SETMAXLB, int(val / 5.12), address=address)
 
     def set_m1_velocity_pid(self, p, i, d, qpps, address=None):
         """Several motor and quadrature combinations can be used with RoboClaw. In some cases the default PID values will need to be tuned for the systems being driven. This gives greater flexibility in what motor and encoder combinations can be used. The RoboClaw PID system consist of four constants starting with QPPS, P = Proportional, I= Integral and D= Derivative.
@@ -333,7 +791,7 @@ class Roboclaw:
         QPPS is the speed of the encoder when the motor is at 100% power. P, I, D are the default values used after a reset.
         """
         # :Sends: [Address, 28, D(4 bytes), P(4 bytes), I(4 bytes), QPPS(4 byte)]
-        return self._send(pack('>BIIII', Cmd.SETM1PID, d * 65536, p * 65536, i * 65536, qpps), address=address)
+        return self._command(Cmd.SETM1PID, int(d * 65536), int(p * 65536), int(i * 65536), qpps, address=address)
 
     def set_m2_velocity_pid(self, p, i, d, qpps, address=None):
         """Several motor and quadrature combinations can be used with RoboClaw. In some cases the default PID values will need to be tuned for the systems being driven. This gives greater flexibility in what motor and encoder combinations can be used. The RoboClaw PID system consist of four constants starting with QPPS, P = Proportional, I= Integral and D= Derivative.
@@ -346,7 +804,7 @@ class Roboclaw:
         QPPS is the speed of the encoder when the motor is at 100% power. P, I, D are the default values used after a reset.
         """
         # :Sends: [Address, 29, D(4 bytes), P(4 bytes), I(4 bytes), QPPS(4 byte)]
-        return self._send(pack('>BIIII', Cmd.SETM2PID, d * 65536, p * 65536, i * 65536, qpps), address=address)
+        return self._command(Cmd.SETM2PID, int(d * 65536), int(p * 65536), int(i * 65536), qpps, address=address)
 
     def read_raw_speed_m1(self, address=None):
         """Read the pulses counted in that last 300th of a second. This is an unfiltered version of `read_speed_m1()`. This function can be used to make a independent PID routine. Value returned is in encoder counts per second.
@@ -355,7 +813,7 @@ class Roboclaw:
 
         The Status byte is direction (0 – forward, 1 - backward).
         """
-        return unpack('>Ib', _recv(self._send(pack('>B', Cmd.GETM1ISPEED), address=address, ack=5)))
+        return self._query(Cmd.GETM1ISPEED, address=address)
 
     def read_raw_speed_m2(self, address=None):
         """Read the pulses counted in that last 300th of a second. This is an unfiltered version of `read_speed_m2()`. This function can be used to make a independent PID routine. Value returned is in encoder counts per second.
@@ -364,7 +822,7 @@ class Roboclaw:
 
         The Status byte is direction (0 – forward, 1 - backward).
         """
-        return unpack('>Ib', _recv(self._send(pack('>B', Cmd.GETM2ISPEED), address=address, ack=5)))
+        return self._query(Cmd.GETM2ISPEED, address=address)
 
     def duty_m1(self, val, address=None):
         """Drive M1 using a duty cycle value. The duty cycle is used to control the speed of the motor without a quadrature encoder.
@@ -372,7 +830,7 @@ class Roboclaw:
         :param int val: The duty value is signed and the range [-32767, 32767] (eg. +-100% duty).
         """
         # :Sends: [Address, 32, Duty(2 Bytes)]
-        return self._send(pack('>Bh', Cmd.M1DUTY, val), address=address)
+        return self._command(Cmd.M1DUTY, val, address=address)
 
     def duty_m2(self, val, address=None):
         """Drive M2 using a duty cycle value. The duty cycle is used to control the speed of the motor without a quadrature encoder.
@@ -380,7 +838,7 @@ class Roboclaw:
         :param int val: The duty value is signed and the range [-32767, 32767] (eg. +-100% duty).
         """
         # :Sends: [Address, 33, Duty(2 Bytes)]
-        return self._send(pack('>Bh', Cmd.M2DUTY, val), address=address)
+        return self._command(Cmd.M2DUTY, val, address=address)
 
     def duty_m1_m2(self, m1, m2, address=None):
         """Drive both M1 and M2 using a duty cycle value. The duty cycle is used to control the speed of the motor without a quadrature encoder.
@@ -389,7 +847,7 @@ class Roboclaw:
         :param int m2: The duty value is signed and the range [-32767, 32767] (eg. +-100% duty).
         """
         # :Sends: [Address, 34, DutyM1(2 Bytes), DutyM2(2 Bytes)]
-        return self._send(pack('>Bhh', Cmd.MIXEDDUTY, m1, m2), address=address)
+        return self._command(Cmd.MIXEDDUTY, m1, m2, address=address)
 
     def speed_m1(self, val, address=None):
         """Drive M1 using a speed value. The sign indicates which direction the motor will turn. This command is used to drive the motor by quad pulses per second. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate as fast as possible until the defined rate is reached.
@@ -397,7 +855,7 @@ class Roboclaw:
         :param int val: Valid input ranges [-2147483647, 2147483647].
         """
         # :Sends: [Address, 35, Speed(4 Bytes)]
-        return self._send(pack('>Bi', Cmd.M1SPEED, val), address=address)
+        return self._command(Cmd.M1SPEED, val, address=address)
 
     def speed_m2(self, val, address=None):
         """Drive M2 with a speed value. The sign indicates which direction the motor will turn. This command is used to drive the motor by quad pulses per second. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent, the motor will begin to accelerate as fast as possible until the rate defined is reached.
@@ -405,7 +863,7 @@ class Roboclaw:
         :param int val: Valid input ranges [-2147483647, 2147483647].
         """
         # :Sends: [Address, 36, Speed(4 Bytes)]
-        return self._send(pack('>Bi', Cmd.M2SPEED, val), address=address)
+        return self._command(Cmd.M2SPEED, val, address=address)
 
     def speed_m1_m2(self, m1, m2, address=None):
         """Drive M1 and M2 in the same command using a signed speed value. The sign indicates which direction the motor will turn. This command is used to drive the motor by quad pulses per second. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate as fast as possible until the rate defined is reached.
@@ -414,7 +872,7 @@ class Roboclaw:
         :param int m2: Valid input ranges [-2147483647, 2147483647].
         """
         # :Sends: [Address, 37, SpeedM1(4 Bytes), SpeedM2(4 Bytes)]
-        return self._send(pack('>Bii', Cmd.MIXEDSPEED, m1, m2), address=address)
+        return self._command(Cmd.MIXEDSPEED, m1, m2, address=address)
 
     def speed_accel_m1(self, accel, speed, address=None):
         """Drive M1 with a signed speed and acceleration value. The sign indicates which direction the motor will run. The acceleration values are not signed. This command is used to drive the motor by quad pulses per second and using an acceleration value for ramping. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate incrementally until the rate defined is reached.
@@ -422,7 +880,7 @@ class Roboclaw:
         The acceleration is measured in speed increase per second. An acceleration value of 12,000 QPPS with a speed of 12,000 QPPS would accelerate a motor from 0 to 12,000 QPPS in 1 second. Another example would be an acceleration value of 24,000 QPPS and a speed value of 12,000 QPPS would accelerate the motor to 12,000 QPPS in 0.5 seconds.
         """
         # :Sends: [Address, 38, Accel(4 Bytes), Speed(4 Bytes)]
-        return self._send(pack('>BIi', Cmd.M1SPEEDACCEL, accel, speed), address=address)
+        return self._command(Cmd.M1SPEEDACCEL, accel, speed, address=address)
 
     def speed_accel_m2(self, accel, speed, address=None):
         """Drive M2 with a signed speed and acceleration value. The sign indicates which direction the motor will run. The acceleration value is not signed. This command is used to drive the motor by quad pulses per second and using an acceleration value for ramping. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate incrementally until the rate defined is reached.
@@ -430,7 +888,7 @@ class Roboclaw:
         The acceleration is measured in speed increase per second. An acceleration value of 12,000 QPPS with a speed of 12,000 QPPS would accelerate a motor from 0 to 12,000 QPPS in 1 second. Another example would be an acceleration value of 24,000 QPPS and a speed value of 12,000 QPPS would accelerate the motor to 12,000 QPPS in 0.5 seconds.
         """
         # :Sends: [Address, 39, Accel(4 Bytes), Speed(4 Bytes)]
-        return self._send(pack('>BIi', Cmd.M2SPEEDACCEL, accel, speed), address=address)
+        return self._command(Cmd.M2SPEEDACCEL, accel, speed, address=address)
 
     def speed_accel_m1_m2(self, accel, speed1, speed2, address=None):
         """Drive M1 and M2 in the same command using one value for acceleration and two signed speed values for each motor. The sign indicates which direction the motor will run. The acceleration value is not signed. The motors are sync during acceleration. This command is used to drive the motor by quad pulses per second and using an acceleration value for ramping. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate incrementally until the rate defined is reached.
@@ -438,7 +896,7 @@ class Roboclaw:
         The acceleration is measured in speed increase per second. An acceleration value of 12,000 QPPS with a speed of 12,000 QPPS would accelerate a motor from 0 to 12,000 QPPS in 1 second. Another example would be an acceleration value of 24,000 QPPS and a speed value of 12,000 QPPS would accelerate the motor to 12,000 QPPS in 0.5 seconds.
         """
         # :Sends: [Address, 40, Accel(4 Bytes), SpeedM1(4 Bytes), SpeedM2(4 Bytes)]
-        return self._send(pack('>BIii', Cmd.MIXEDSPEEDACCEL, accel, speed1, speed2), address=address)
+        return self._command(Cmd.MIXEDSPEEDACCEL, accel, speed1, speed2, address=address)
 
     def speed_distance_m1(self, speed, distance, buffer, address=None):
         """Drive M1 with a signed speed and distance value. The sign indicates which direction the motor will run. The distance value is not signed. This command is buffered. This command is used to control the top speed and total distance traveled by the motor. Each motor channel M1 and M2 have separate buffers. This command will execute immediately if no other command for that channel is executing, otherwise the command will be buffered in the order it was sent. Any buffered or executing command can be stopped when a new command is issued by setting the Buffer argument. All values used are in quad pulses per second.
@@ -446,7 +904,7 @@ class Roboclaw:
         The Buffer argument can be set to a 1 or 0. If a value of 0 is used the command will be buffered and executed in the order sent. If a value of 1 is used the current running command is stopped, any other commands in the buffer are deleted and the new command is executed.
         """
         # :Sends: [Address, 41, Speed(4 Bytes), Distance(4 Bytes), Buffer]
-        return self._send(pack('>BiIB', Cmd.M1SPEEDDIST, speed, distance, buffer), address=address)
+        return self._command(Cmd.M1SPEEDDIST, speed, distance, buffer, address=address)
 
     def speed_distance_m2(self, speed, distance, buffer, address=None):
         """Drive M2 with a speed and distance value. The sign indicates which direction the motor will run. The distance value is not signed. This command is buffered. Each motor channel M1 and M2 have separate buffers. This command will execute immediately if no other command for that channel is executing, otherwise the command will be buffered in the order it was sent. Any buffered or executing command can be stopped when a new command is issued by setting the Buffer argument. All values used are in quad pulses per second.
@@ -454,7 +912,7 @@ class Roboclaw:
         The Buffer argument can be set to a 1 or 0. If a value of 0 is used the command will be buffered and executed in the order sent. If a value of 1 is used the current running command is stopped, any other commands in the buffer are deleted and the new command is executed.
         """
         # :Sends: [Address, 42, Speed(4 Bytes), Distance(4 Bytes), Buffer]
-        return self._send(pack('>BiIB', Cmd.M2SPEEDDIST, speed, distance, buffer), address=address)
+        return self._command(Cmd.M2SPEEDDIST, speed, distance, buffer, address=address)
 
     def speed_distance_m1_m2(self, speed1, distance1, speed2, distance2, buffer, address=None):
         """Drive M1 and M2 with a speed and distance value. The sign indicates which direction the motor will run. The distance value is not signed. This command is buffered. Each motor channel M1 and M2 have separate buffers. This command will execute immediately if no other command for that channel is executing, otherwise the command will be buffered in the order it was sent. Any buffered or executing command can be stopped when a new command is issued by setting the Buffer argument. All values used are in quad pulses per second.
@@ -462,7 +920,7 @@ class Roboclaw:
         The Buffer argument can be set to a 1 or 0. If a value of 0 is used the command will be buffered and executed in the order sent. If a value of 1 is used the current running command is stopped, any other commands in the buffer are deleted and the new command is executed.
         """
         # :Sends: [Address, 43, SpeedM1(4 Bytes), DistanceM1(4 Bytes), SpeedM2(4 Bytes), DistanceM2(4 Bytes), Buffer]
-        return self._send(pack('>BiIiIB', Cmd.MIXEDSPEEDDIST, speed1, distance1, speed2, distance2, buffer), address=address)
+        return self._command(Cmd.MIXEDSPEEDDIST, speed1, distance1, speed2, distance2, buffer, address=address)
 
     def speed_accel_distance_m1(self, accel, speed, distance, buffer, address=None):
         """Drive M1 with a speed, acceleration and distance value. The sign indicates which direction the motor will run. The acceleration and distance values are not signed. This command is used to control the motors top speed, total distanced traveled and at what incremental acceleration value to use until the top speed is reached. Each motor channel M1 and M2 have separate buffers. This command will execute immediately if no other command for that channel is executing, otherwise the command will be buffered in the order it was sent. Any buffered or executing command can be stopped when a new command is issued by setting the Buffer argument. All values used are in quad pulses per second.
@@ -470,7 +928,7 @@ class Roboclaw:
         The Buffer argument can be set to a 1 or 0. If a value of 0 is used the command will be buffered and executed in the order sent. If a value of 1 is used the current running command is stopped, any other commands in the buffer are deleted and the new command is executed.
         """
         # :Sends: [Address, 44, Accel(4 bytes), Speed(4 Bytes), Distance(4 Bytes), Buffer]
-        return self._send(pack('>BIiIB', Cmd.M1SPEEDACCELDIST, accel, speed, distance, buffer), address=address)
+        return self._command(Cmd.M1SPEEDACCELDIST, accel, speed, distance, buffer, address=address)
 
     def speed_accel_distance_m2(self, accel, speed, distance, buffer, address=None):
         """Drive M2 with a speed, acceleration and distance value. The sign indicates which direction the motor will run. The acceleration and distance values are not signed. This command is used to control the motors top speed, total distanced traveled and at what incremental acceleration value to use until the top speed is reached. Each motor channel M1 and M2 have separate buffers. This command will execute immediately if no other command for that channel is executing, otherwise the command will be buffered in the order it was sent. Any buffered or executing command can be stopped when a new command is issued by setting the Buffer argument. All values used are in quad pulses per second.
@@ -478,7 +936,7 @@ class Roboclaw:
         The Buffer argument can be set to a 1 or 0. If a value of 0 is used the command will be buffered and executed in the order sent. If a value of 1 is used the current running command is stopped, any other commands in the buffer are deleted and the new command is executed.
         """
         # :Sends: [Address, 45, Accel(4 bytes), Speed(4 Bytes), Distance(4 Bytes), Buffer]
-        return self._send(pack('>BIiIB', Cmd.M2SPEEDACCELDIST, accel, speed, distance, buffer), address=address)
+        return self._command(Cmd.M2SPEEDACCELDIST, accel, speed, distance, buffer, address=address)
 
     def speed_accel_distance_m1_m2(self, accel, speed1, distance1, speed2, distance2, buffer, address=None):
         """Drive M1 and M2 with a speed, acceleration and distance value. The sign indicates which direction the motor will run. The acceleration and distance values are not signed. This command is used to control both motors top speed, total distanced traveled and at what incremental acceleration value to use until the top speed is reached. Each motor channel M1 and M2 have separate buffers. This command will execute immediately if no other command for that channel is executing, otherwise the command will be buffered in the order it was sent. Any buffered or executing command can be stopped when a new command is issued by setting the Buffer argument. All values used are in quad pulses per second.
@@ -486,7 +944,7 @@ class Roboclaw:
         The Buffer argument can be set to a 1 or 0. If a value of 0 is used the command will be buffered and executed in the order sent. If a value of 1 is used the current running command is stopped, any other commands in the buffer are deleted and the new command is executed.
         """
         # :Sends: [Address, 46, Accel(4 Bytes), SpeedM1(4 Bytes), DistanceM1(4 Bytes), SpeedM2(4 bytes), DistanceM2(4 Bytes), Buffer]
-        return self._send(pack('>BIiIiIB', Cmd.MIXEDSPEEDACCELDIST, accel, speed1, distance1, speed2, distance2, buffer), address=address)
+        return self._command(Cmd.MIXEDSPEEDACCELDIST, accel, speed1, distance1, speed2, distance2, buffer, address=address)
 
     def read_buffer_length(self, address=None):
         """Read both motor M1 and M2 buffer lengths. This command can be used to determine how many commands are waiting to execute.
@@ -495,10 +953,7 @@ class Roboclaw:
 
         The return values represent how many commands per buffer are waiting to be executed. The maximum buffer size per motor is 64 commands(0x3F). A return value of 0x80(128) indicates the buffer is empty. A return value of 0 indiciates the last command sent is executing. A value of 0x80 indicates the last command buffered has finished.
         """
-        val = unpack('>BB', _recv(self._send(pack('>B', Cmd.GETBUFFERS), address=address, ack=2)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETBUFFERS, address=address)
 
     def read_pwms(self, address=None):
         """Read the current PWM output values for the motor channels. The values returned are +/-32767. The duty cycle percent is calculated by dividing the Value by 327.67.
@@ -506,10 +961,7 @@ class Roboclaw:
         :Returns: [M1 PWM(2 bytes), M2 PWM(2 bytes)]
         """
         # Send: [Address, 48]
-        val = unpack('>hh', _recv(self._send(pack('>B', Cmd.GETPWMS), address=address, ack=4)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETPWMS, address=address)
 
     def read_currents(self, address=None):
         """Read the current draw from each motor in 10ma increments. The amps value is calculated by dividing the value by 100.
@@ -517,10 +969,7 @@ class Roboclaw:
         :Returns: [M1 Current(2 bytes), M2 Currrent(2 bytes)]
         """
         # Send: [Address, 49]
-        val = unpack('>hh', _recv(self._send(pack('>B', Cmd.GETCURRENTS), address=address, ack=4)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETCURRENTS, address=address)
 
     def speed_accel_m1_m2_2(self, accel1, speed1, accel2, speed2, address=None):
         """Drive M1 and M2 in the same command using one value for acceleration and two signed speed values for each motor. The sign indicates which direction the motor will run. The acceleration value is not signed. The motors are sync during acceleration. This command is used to drive the motor by quad pulses per second and using an acceleration value for ramping. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate incrementally until the rate defined is reached.
@@ -528,7 +977,7 @@ class Roboclaw:
         The acceleration is measured in speed increase per second. An acceleration value of 12,000 QPPS with a speed of 12,000 QPPS would accelerate a motor from 0 to 12,000 QPPS in 1 second. Another example would be an acceleration value of 24,000 QPPS and a speed value of 12,000 QPPS would accelerate the motor to 12,000 QPPS in 0.5 seconds.
         """
         # :Sends: [Address, 50, AccelM1(4 Bytes), SpeedM1(4 Bytes), AccelM2(4 Bytes), SpeedM2(4 Bytes)]
-        return self._send(pack('>BIiIi', Cmd.MIXEDSPEED2ACCEL, accel1, speed1, accel2, speed2), address=address)
+        return self._command(Cmd.MIXEDSPEED2ACCEL, accel1, speed1, accel2, speed2, address=address)
 
     def speed_accel_distance_m1_m2_2(self, accel1, speed1, distance1, accel2, speed2, distance2, buffer, address=None):
         """Drive M1 and M2 in the same command using one value for acceleration and two signed speed values for each motor. The sign indicates which direction the motor will run. The acceleration value is not signed. The motors are sync during acceleration. This command is used to drive the motor by quad pulses per second and using an acceleration value for ramping. Different quadrature encoders will have different rates at which they generate the incoming pulses. The values used will differ from one encoder to another. Once a value is sent the motor will begin to accelerate incrementally until the rate defined is reached.
@@ -536,7 +985,7 @@ class Roboclaw:
         The acceleration is measured in speed increase per second. An acceleration value of 12,000 QPPS with a speed of 12,000 QPPS would accelerate a motor from 0 to 12,000 QPPS in 1 second. Another example would be an acceleration value of 24,000 QPPS and a speed value of 12,000 QPPS would accelerate the motor to 12,000 QPPS in 0.5 seconds.
         """
         # :Sends: [Address, 50, AccelM1(4 Bytes), SpeedM1(4 Bytes), AccelM2(4 Bytes), SpeedM2(4 Bytes)]
-        return self._send(pack('>BIiIIiIB', Cmd.MIXEDSPEED2ACCELDIST, accel1, speed1, distance1, accel2, speed2, distance2, buffer), address=address)
+        return self._command(Cmd.MIXEDSPEED2ACCELDIST, accel1, speed1, distance1, accel2, speed2, distance2, buffer, address=address)
 
     def duty_accel_m1(self, accel, duty, address=None):
         """Drive M1 with a signed duty and acceleration value. The sign indicates which direction the motor will run. The acceleration values are not signed. This command is used to drive the motor by PWM and using an acceleration value for ramping. Accel is the rate per second at which the duty changes from the current duty to the specified duty.
@@ -544,7 +993,7 @@ class Roboclaw:
         The duty value is signed and the range is -32768 to +32767(eg. +-100% duty). The accel value range is 0 to 655359(eg maximum acceleration rate is -100% to 100% in 100ms).
         """
         # :Sends: [Address, 52, Duty(2 bytes), Accel(2 Bytes)]
-        return self._send(pack('>BhI', Cmd.M1DUTYACCEL, duty, accel), address=address)
+        return self._command(Cmd.M1DUTYACCEL, duty, accel, address=address)
 
     def duty_accel_m2(self, accel, duty, address=None):
         """Drive M2 with a signed duty and acceleration value. The sign indicates which direction the motor will run. The acceleration values are not signed. This command is used to drive the motor by PWM and using an acceleration value for ramping. Accel is the rate at which the duty changes from the current duty to the specified dury.
@@ -552,7 +1001,7 @@ class Roboclaw:
         The duty value is signed and the range is -32768 to +32767 (eg. +-100% duty). The accel value range is 0 to 655359 (eg maximum acceleration rate is -100% to 100% in 100ms).
         """
         # :Sends: [Address, 53, Duty(2 bytes), Accel(2 Bytes)]
-        return self._send(pack('>BhI', Cmd.M2DUTYACCEL, duty, accel), address=address)
+        return self._command(Cmd.M2DUTYACCEL, duty, accel, address=address)
 
     def duty_accel_m1_m2(self, accel1, duty1, accel2, duty2, address=None):
         """Drive M1 and M2 in the same command using acceleration and duty values for each motor. The sign indicates which direction the motor will run. The acceleration value is not signed. This command is used to drive the motor by PWM using an acceleration value for ramping.
@@ -560,7 +1009,7 @@ class Roboclaw:
         The duty value is signed and the range is -32768 to +32767 (eg. +-100% duty). The accel value range is 0 to 655359 (eg maximum acceleration rate is -100% to 100% in 100ms).
         """
         # :Sends: [Address, CMD, DutyM1(2 bytes), AccelM1(4 Bytes), DutyM2(2 bytes), AccelM1(4 bytes)]
-        return self._send(pack('>BhIhI', Cmd.MIXEDDUTYACCEL, duty1, accel1, duty2, accel2), address=address)
+        return self._command(Cmd.MIXEDDUTYACCEL, duty1, accel1, duty2, accel2, address=address)
 
     def read_m1_velocity_pid(self, address=None):
         """Read the PID and QPPS Settings.
@@ -568,10 +1017,7 @@ class Roboclaw:
         :Returns: [P(4 bytes), I(4 bytes), D(4 bytes), QPPS(4 byte)]
         """
         # :Sends: [Address, 55]
-        data = unpack('iiii', _recv(self._send(pack('>B', Cmd.READM1PID), address=address, ack=16)))
-        if data:
-            return (data[0], data[1] / 65536.0, data[2] / 65536.0, data[3] / 65536.0)
-        return (0, 0, 0, 0)
+        return self._query(Cmd.READM1PID, address=address)
 
     def read_m2_velocity_pid(self, address=None):
         """Read the PID and QPPS Settings.
@@ -579,40 +1025,31 @@ class Roboclaw:
         :Returns: [P(4 bytes), I(4 bytes), D(4 bytes), QPPS(4 byte)]
         """
         # :Sends: [Address, 55]
-        data = unpack('iiii', _recv(self._send(pack('>B', Cmd.READM2PID), address=address, ack=16)))
-        if data:
-            return (data[0], data[1] / 65536.0, data[2] / 65536.0, data[3] / 65536.0)
-        return (0, 0, 0, 0)
+        return self._query(Cmd.READM2PID, address=address)
 
     def set_main_voltages(self, minimum, maximum, address=None):
         """Set the Main Battery Voltage cutoffs, Min and Max. Min and Max voltages are in 10th of a volt increments. Multiply the voltage to set by 10."""
         # :Sends: [Address, 57, Min(2 bytes), Max(2bytes]
-        return self._send(pack('>BHH', Cmd.SETMAINVOLTAGES, minimum, maximum), address=address)
+        return self._command(Cmd.SETMAINVOLTAGES, minimum, maximum, address=address)
 
     def set_logic_voltages(self, minimum, maximum, address=None):
         """Set the Logic Battery Voltages cutoffs, Min and Max. Min and Max voltages are in 10th of a volt increments. Multiply the voltage to set by 10."""
         # :Sends: [Address, 58, Min(2 bytes), Max(2bytes]
-        return self._send(pack('>BHH', Cmd.SETLOGICVOLTAGES, minimum, maximum), address=address)
+        return self._command(Cmd.SETLOGICVOLTAGES, minimum, maximum, address=address)
 
     def read_min_max_main_voltages(self, address=None):
         """Read the Main Battery Voltage Settings. The voltage is calculated by dividing the value by 10
 
         :Returns: [Min(2 bytes), Max(2 bytes)]
         """
-        val = unpack('>HH', _recv(self._send(pack('>B', Cmd.GETMINMAXMAINVOLTAGES), address=address, ack=4)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETMINMAXMAINVOLTAGES, address=address)
 
     def read_min_max_logic_voltages(self, address=None):
         """Read the Logic Battery Voltage Settings. The voltage is calculated by dividing the value by 10
 
         :Returns: [Min(2 bytes), Max(2 bytes)]
         """
-        val = unpack('>HH', _recv(self._send(pack('>B', Cmd.GETMINMAXLOGICVOLTAGES), address=address, ack=4)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETMINMAXLOGICVOLTAGES, address=address)
 
     def set_m1_position_pid(self, kp, ki, kd, kimax, deadzone, minimum, maximum, address=None):
         """The RoboClaw Position PID system consist of seven constants starting with P = Proportional, I= Integral and D= Derivative, MaxI = Maximum Integral windup, Deadzone in encoder counts, MinPos = Minimum Position and MaxPos = Maximum Position. The defaults values are all zero.
@@ -620,7 +1057,7 @@ class Roboclaw:
         Position constants are used only with the Position commands, 65,66 and 67 or when encoders are enabled in RC/Analog modes.
         """
         # :Sends: [Address, 61, D(4 bytes), P(4 bytes), I(4 bytes), MaxI(4 bytes), Deadzone(4 bytes), MinPos(4 bytes), MaxPos(4 bytes)]
-        return self._send(pack('>BIIIIIII', Cmd.SETM1POSPID, kd * 1024, kp * 1024, ki * 1024, kimax, deadzone, minimum, maximum), address=address)
+        return self._command(Cmd.SETM1POSPID, int(kd * 1024), int(kp * 1024), int(ki * 1024), kimax, deadzone, minimum, maximum, address=address)
 
     def set_m2_position_pid(self, kp, ki, kd, kimax, deadzone, minimum, maximum, address=None):
         """The RoboClaw Position PID system consist of seven constants starting with P = Proportional, I= Integral and D= Derivative, MaxI = Maximum Integral windup, Deadzone in encoder counts, MinPos = Minimum Position and MaxPos = Maximum Position. The defaults values are all zero.
@@ -628,57 +1065,51 @@ class Roboclaw:
         Position constants are used only with the Position commands, 65,66 and 67 or when encoders are enabled in RC/Analog modes.
         """
         # :Sends: [Address, 62, D(4 bytes), P(4 bytes), I(4 bytes), MaxI(4 bytes), Deadzone(4 bytes), MinPos(4 bytes), MaxPos(4 bytes)]
-        return self._send(pack('>BIIIIIII', Cmd.SETM2POSPID, kd * 1024, kp * 1024, ki * 1024, kimax, deadzone, minimum, maximum), address=address)
+        return self._command(Cmd.SETM2POSPID, int(kd * 1024), int(kp * 1024), int(ki * 1024), kimax, deadzone, minimum, maximum, address=address)
 
     def read_m1_position_pid(self, address=None):
         """Read the Position PID Settings.
 
         :Returns: [P(4 bytes), I(4 bytes), D(4 bytes), MaxI(4 byte), Deadzone(4 byte), MinPos(4 byte), MaxPos(4 byte)]
         """
-        data = unpack('>IIIIIII', _recv(self._send(pack('>B', Cmd.READM1POSPID), address=address, ack=28)))
-        if data:
-            return (data[0], data[1] / 1024.0, data[2] / 1024.0, data[3] / 1024.0)
-        return (0, 0, 0, 0, 0, 0, 0)
+        return self._query(Cmd.READM1POSPID, address=address)
 
     def read_m2_position_pid(self, address=None):
         """Read the Position PID Settings.
 
         :Returns: [P(4 bytes), I(4 bytes), D(4 bytes), MaxI(4 byte), Deadzone(4 byte), MinPos(4 byte), MaxPos(4 byte)]
         """
-        data = unpack('>IIIIIII', _recv(self._send(pack('>B', Cmd.READM2POSPID), address=address, ack=28)))
-        if data:
-            return (1, data[0] / 1024.0, data[1] / 1024.0, data[2] / 1024.0)
-        return (0, 0, 0, 0, 0, 0, 0)
+        return self._query(Cmd.READM2POSPID, address=address)
 
     def speed_accel_deccel_position_m1(self, accel, speed, deccel, position, buffer, address=None):
         """Move M1 position from the current position to the specified new position and hold the new position. Accel sets the acceleration value and deccel the decceleration value. QSpeed sets the speed in quadrature pulses the motor will run at after acceleration and before decceleration.
         """
         # :Sends: [Address, 65, Accel(4 bytes), Speed(4 Bytes), Deccel(4 bytes), Position(4 Bytes), Buffer]
-        return self._send(pack('>BIIIIB', Cmd.M1SPEEDACCELDECCELPOS, accel, speed, deccel, position, buffer), address=address)
+        return self._command(Cmd.M1SPEEDACCELDECCELPOS, accel, speed, deccel, position, buffer, address=address)
 
     def speed_accel_deccel_position_m2(self, accel, speed, deccel, position, buffer, address=None):
         """Move M2 position from the current position to the specified new position and hold the new position. Accel sets the acceleration value and deccel the decceleration value. QSpeed sets the speed in quadrature pulses the motor will run at after acceleration and before decceleration.
         """
         # :Sends: [Address, 66, Accel(4 bytes), Speed(4 Bytes), Deccel(4 bytes), Position(4 Bytes), Buffer]
-        return self._send(pack('>BIIIIB', Cmd.M2SPEEDACCELDECCELPOS, accel, speed, deccel, position, buffer), address=address)
+        return self._command(Cmd.M2SPEEDACCELDECCELPOS, accel, speed, deccel, position, buffer, address=address)
 
     def speed_accel_deccel_position_m1_m2(self, accel1, speed1, deccel1, position1, accel2, speed2, deccel2, position2, buffer, address=None):
         """Move M1 & M2 positions from their current positions to the specified new positions and hold the new positions. Accel sets the acceleration value and deccel the decceleration value. QSpeed sets the speed in quadrature pulses the motor will run at after acceleration and before decceleration.
         """
         # :Sends: [Address, 67, AccelM1(4 bytes), SpeedM1(4 Bytes), DeccelM1(4 bytes), PositionM1(4 Bytes), AccelM2(4 bytes), SpeedM2(4 Bytes), DeccelM2(4 bytes), PositionM2(4 Bytes), Buffer]
-        return self._send(pack('>BIIIIIIIIB', Cmd.MIXEDSPEEDACCELDECCELPOS, accel1, speed1, deccel1, position1, accel2, speed2, deccel2, position2, buffer), address=address)
+        return self._command(Cmd.MIXEDSPEEDACCELDECCELPOS, accel1, speed1, deccel1, position1, accel2, speed2, deccel2, position2, buffer, address=address)
 
     def set_m1_default_accel(self, accel, address=None):
         """Set the default acceleration for M1 when using duty cycle commands (`duty_m1()` and `duty_m1_m2()`) or when using Standard Serial, RC and Analog PWM modes.
         """
         # :Sends: [Address, 68, Accel(4 bytes)]
-        return self._send(pack('>BI', Cmd.SETM1DEFAULTACCEL, accel), address=address)
+        return self._command(Cmd.SETM1DEFAULTACCEL, accel, address=address)
 
     def set_m2_default_accel(self, accel, address=None):
         """Set the default acceleration for M2 when using duty cycle commands (`duty_m2()` and `duty_m1_m2()`) or when using Standard Serial, RC and Analog PWM modes.
         """
         # :Sends: [Address, 69, Accel(4 bytes)]
-        return self._send(pack('>BI', Cmd.SETM2DEFAULTACCEL, accel), address=address)
+        return self._command(Cmd.SETM2DEFAULTACCEL, accel, address=address)
 
     def set_pin_functions(self, s3mode, s4mode, s5mode, address=None):
         """Set modes for S3,S4 and S5.
@@ -703,7 +1134,7 @@ class Roboclaw:
         """
         # :Returns: [0xFF]
         # :Sends: [Address, 74, S3mode, S4mode, S5mode]
-        return self._send(pack('>BBBB', Cmd.SETPINFUNCTIONS, s3mode, s4mode, s5mode), address=address)
+        return self._command(Cmd.SETPINFUNCTIONS, s3mode, s4mode, s5mode, address=address)
 
     def read_pin_functions(self, address=None):
         """Read mode settings for S3,S4 and S5. See `set_pin_functions()` for mode descriptions
@@ -711,17 +1142,14 @@ class Roboclaw:
         :Returns: [S3mode, S4mode, S5mode]
         """
         # :Sends: [Address, 75]
-        val = unpack('>BBB', _recv(self._send(pack('>B', Cmd.GETPINFUNCTIONS), address=address, ack=3)))
-        if val:
-            return (1, val[0], val[1], val[2])
-        return (0, 0, 0)
+        return self._query(Cmd.GETPINFUNCTIONS, address=address)
 
     def set_deadband(self, minimum, maximum, address=None):
         """Set RC/Analog mode control deadband percentage in 10ths of a percent. Default value is 25(2.5%). Minimum value is 0(no DeadBand), Maximum value is 250(25%).
         """
         # :Sends: [Address, 76, Reverse, Forward]
         # :Returns: [0xFF]
-        return self._send(pack('>BBB', Cmd.SETDEADBAND, minimum, maximum), address=address)
+        return self._command(Cmd.SETDEADBAND, minimum, maximum, address=address)
 
     def get_deadband(self, address=None):
         """Read DeadBand settings in 10ths of a percent.
@@ -729,10 +1157,7 @@ class Roboclaw:
         :Returns: [Reverse, SForward]
         """
         # :Sends: [Address, 77]
-        val = unpack('>BB', _recv(self._send(pack('>B', Cmd.GETDEADBAND), address=address, ack=2)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETDEADBAND, address=address)
 
     def restore_defaults(self, address=None):
         """Reset Settings to factory defaults.
@@ -741,26 +1166,26 @@ class Roboclaw:
             Baudrate will change if not already set to 38400.  Communications will be lost.
         """
         # :Sends: [Address, 80]
-        return self._send(pack('>B', Cmd.RESTOREDEFAULTS), address=address)
+        return self._command(Cmd.RESTOREDEFAULTS, address=address)
 
     def read_temp(self, address=None):
         """Read the board temperature. Value returned is in 10ths of degrees.
 
         :Returns: [Temperature(2 bytes)]
         """
-        return unpack('>h', _recv(self._send(pack('>B', Cmd.GETTEMP), address=address, ack=2)))
+        return self._query(Cmd.GETTEMP, address=address)
 
     def read_temp2(self, address=None):
         """Read the second board temperature(only on supported units). Value returned is in 10ths of degrees.
 
         :Returns: [Temperature(2 bytes)]
         """
-        return unpack('>h', _recv(self._send(pack('>B', Cmd.GETTEMP2), address=address, ack=2)))
+        return self._query(Cmd.GETTEMP2, address=address)
 
     def read_error(self, address=None):
         """Read the current unit status.
 
-        :Returns: [Status]
+        :Returns: [Status(4 bytes)]
 
         ========================= ===============
         Function                  Status Bit Mask
@@ -780,44 +1205,39 @@ class Roboclaw:
         Temperature2 Warning      0x2000
         ========================= ===============
         """
-        return unpack('>B', _recv(self._send(pack('>B', Cmd.GETERROR), address=address, ack=1)))
+        return self._query(Cmd.GETERROR, address=address)
 
     def read_encoder_modes(self, address=None):
         """Read the encoder pins assigned for both motors.
 
         :Returns: [Enc1Mode, Enc2Mode]
         """
-        val = unpack('>BB', _recv(self._send(pack('>B', Cmd.GETENCODERMODE), address=address, ack=2)))
-        if val:
-            return (1, val[0], val[1])
-        return (0, 0, 0)
+        return self._query(Cmd.GETENCODERMODE, address=address)
 
     def set_m1_encoder_mode(self, mode, address=None):
         """Set the Encoder Pin for motor 1. See `read_encoder_modes()`."""
         # :Sends: [Address, 92, Pin]
-        return self._send(pack('>BB', Cmd.SETM1ENCODERMODE, mode), address=address)
+        return self._command(Cmd.SETM1ENCODERMODE, mode, address=address)
 
     def set_m2_encoder_mode(self, mode, address=None):
         """Set the Encoder Pin for motor 2. See `read_encoder_modes()`."""
         # :Sends: [Address, 93, Pin]
-        return self._send(pack('>BB', Cmd.SETM2ENCODERMODE, mode), address=address)
+        return self._command(Cmd.SETM2ENCODERMODE, mode, address=address)
 
     def write_nvm(self, address=None):
         """Writes all settings to non-volatile memory. Values will be loaded after each power up.
         """
         # :Sends: [Address, 94]
-        return self._send(pack('>BI', Cmd.WRITENVM, 0xE22EAB7A), address=address)
+        return self._command(Cmd.WRITENVM, 0xE22EAB7A, address=address)
 
     def read_nvm(self, address=None):
         """Read all settings from non-volatile memory.
 
-        :Returns: [Enc1Mode, Enc2Mode]
-
         .. warning:: Concerning TTL Serial:
             If baudrate changes or the control mode changes communications will be lost.
         """
         # :Sends: [Address, 95]
-        return unpack('>BB', _recv(self._send(pack('>B', Cmd.READNVM), address=address, ack=2)))
+        return self._command(Cmd.READNVM, address=address)
 
     def set_config(self, config, address=None):
         """Set config bits for standard settings.
@@ -870,7 +1290,7 @@ class Roboclaw:
         """
         # :Sends: [Address, 98, Config(2 bytes)]
         # :Returns: [0xFF]
-        return self._send(pack('>Bh', Cmd.SETCONFIG, config), address=address)
+        return self._command(Cmd.SETCONFIG, config, address=address)
 
     def get_config(self, address=None):
         """Read config bits for standard settings See `set_config()`.
@@ -878,52 +1298,46 @@ class Roboclaw:
         :Returns: [Config(2 bytes)]
         """
         # :Sends: [Address, 99]
-        return unpack('>h', _recv(self._send(pack('>B', Cmd.GETCONFIG), address=address, ack=2)))
+        return self._query(Cmd.GETCONFIG, address=address)
 
     def set_m1_max_current(self, maximum, address=None):
         """Set Motor 1 Maximum Current Limit. Current value is in 10ma units. To calculate multiply current limit by 100.
         """
         # :Sends: [Address, 134, MaxCurrent(4 bytes), 0, 0, 0, 0]
-        return self._send(pack('>BII', Cmd.SETM1MAXCURRENT, maximum, 0), address=address)
+        return self._command(Cmd.SETM1MAXCURRENT, maximum, 0, address=address)
 
     def set_m2_max_current(self, maximum, address=None):
         """Set Motor 2 Maximum Current Limit. Current value is in 10ma units. To calculate multiply current limit by 100.
         """
         # :Sends: [Address, 134, MaxCurrent(4 bytes), 0, 0, 0, 0]
-        return self._send(pack('>BII', Cmd.SETM2MAXCURRENT, maximum, 0), address=address)
+        return self._command(Cmd.SETM2MAXCURRENT, maximum, 0, address=address)
 
     def read_m1_max_current(self, address=None):
         """Read Motor 1 Maximum Current Limit. Current value is in 10ma units. To calculate divide value by 100. MinCurrent is always 0.
 
         :Returns: [MaxCurrent(4 bytes), MinCurrent(4 bytes)]
         """
-        data = unpack('>II', _recv(self._send(pack('>B', Cmd.GETM1MAXCURRENT), address=address, ack=8)))
-        if data:
-            return data
-        return (0, 0)
+        return self._query(Cmd.GETM1MAXCURRENT, address=address)
 
     def read_m2_max_current(self, address=None):
         """Read Motor 2 Maximum Current Limit. Current value is in 10ma units. To calculate divide value by 100. MinCurrent is always 0.
 
         :Returns: [MaxCurrent(4 bytes), MinCurrent(4 bytes)]
         """
-        data = unpack('>II', _recv(self._send(pack('>B', Cmd.GETM2MAXCURRENT), address=address, ack=8)))
-        if data[0]:
-            return data
-        return (0, 0)
+        return self._query(Cmd.GETM2MAXCURRENT, address=address)
 
     def set_pwm_mode(self, mode, address=None):
         """Set PWM Drive mode. Locked Antiphase(0) or Sign Magnitude(1).
         """
         # :Sends: [Address, 148, Mode]
-        return self._send(pack('>BB', Cmd.SETPWMMODE, mode), address=address)
+        return self._command(Cmd.SETPWMMODE, mode, address=address)
 
     def read_pwm_mode(self, address=None):
         """Read PWM Drive mode. See `set_pwm_mode()`.
 
         :Returns: [PWMMode]
         """
-        return unpack('>B', _recv(self._send(pack('>B', Cmd.GETPWMMODE), address=address, ack=1)))
+        return self._query(Cmd.GETPWMMODE, address=address)
 
     def read_eeprom(self, ee_address, address=None):
         """Read a value from the User EEProm memory(256 bytes).
@@ -931,16 +1345,64 @@ class Roboclaw:
         :Returns: [Value(2 bytes)]
         """
         # :Sends: [Address, 252, EEProm Address(byte)]
-        val = unpack('>H', _recv(self._send(pack('>BB', Cmd.READEEPROM, ee_address), address=address, ack=2)))
-        if val:
-            return (1, val[0])
-        return (0, 0)
+        return self._query(Cmd.READEEPROM, ee_address, address=address)
 
     def write_eeprom(self, ee_address, ee_word, address=None):
-        """Get Priority Levels.
+        """Write a value to the User EEProm memory(256 bytes).
         """
         # :Sends: [Address, 253, Address(byte), Value(2 bytes)]
-        val = unpack('>B', _recv(self._send(pack('>BBH', Cmd.WRITEEEPROM, ee_address, ee_word), address=address, ack=1, crc=0)))
-        if val[1] == 0xaa:
-            return True
-        return False
+        return self._command(Cmd.WRITEEEPROM, ee_address, ee_word, address=address)
+
+    def read_snapshot(self, fields=None, address=None, raw=False):
+        """Read several values with a single write of back-to-back queries and a single read of
+        all their replies, instead of one round-trip per value. Every reply is checked against its
+        CRC16 checksum; queries whose reply fails are retried together, after the rest of the
+        garbled burst is flushed. With a `policy`, the retries back off like its other commands
+        and stop at its ``telemetry`` deadline (or the one given to `deadline()`).
+
+        :param fields: The names of the values to read (see `SNAPSHOT_FIELDS`). `None` reads
+            all of them.
+        :param bool raw: Store every value as the `tuple` unpacked from its reply (volts and
+            degrees in tenths) instead of as described in `SNAPSHOT_FIELDS`.
+        :Returns: A `Snapshot`. Check its `~Snapshot.failed` attribute for values that couldn't
+            be read.
+        """
+        assert address is None or address in range(0x80, 0x88)
+        address = self._address if address is None else address
+        pending = plan(SNAPSHOT_FIELDS if fields is None else fields, raw)
+        snapshot = Snapshot(time.monotonic())
+        if self._session:
+            pending = self._snapshot(snapshot, pending, address)
+        else:
+            with self:
+                pending = self._snapshot(snapshot, pending, address)
+        snapshot.failed = tuple(name for name, _, _ in pending)
+        return snapshot
+
+    def _snapshot(self, snapshot, pending, address):
+        """the retries of `read_snapshot()` within a session. Returns the fields that failed"""
+        deadline = delays = None
+        attempts = self._retries
+        if self.policy is not None:
+            deadline = time.monotonic() + (self.policy.telemetry if self._deadline is None else self._deadline)
+            delays = self.policy.delays()
+            attempts = self.policy.retries
+        for attempt in range(attempts):
+            if attempt:
+                self._resync() # drop the rest of a garbled burst
+                if delays is not None:
+                    self._sleep(max(min(next(delays, 0), deadline - time.monotonic()), 0))
+            frames = [self._snapshot_frame(spec.cmd, address) for _, spec, _ in pending]
+            size = sum(spec.reply.size + 2 for _, spec, _ in pending)
+            buf = b''.join(frame for frame, _ in frames)
+            if deadline is None:
+                reply = self._exchange(buf, size)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                reply = self._exchange(buf, size, timeout=remaining)
+            pending = _parse_snapshot(snapshot, pending, frames, reply or b'')
+            if not pending:
+                break
+        return pending
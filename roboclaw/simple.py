@@ -0,0 +1,132 @@
+"""A driver for a Roboclaw in Simple Serial mode, where every command is one byte with no address,
+checksum or ack. It only covers the 7-bit motor commands, but sends each of them as 1 byte
+instead of a 4 byte packet and an ack, so it can command the motors 4-5 times as often at the
+same baud rate."""
+from .roboclaw import Roboclaw
+
+STOP_ALL = 0 #: The byte that shuts both motors down.
+M1_STOP = 64 #: M1's stop byte; 1 is full reverse and 127 full forward.
+M2_STOP = 192 #: M2's stop byte; 128 is full reverse and 255 full forward.
+
+_BYTES = tuple(bytes((value,)) for value in range(256)) # every command byte, allocated once
+
+def _clamp(val):
+    return max(0, min(127, int(val)))
+
+
+class SimpleSerialRoboclaw:
+    """A fire-and-forget driver for one Roboclaw configured for Simple Serial mode (see
+    `Roboclaw.set_config()`). The motor commands take the same values as their `Roboclaw`
+    namesakes, so it can stand in for it wherever only those are used::
+
+        spinner = SimpleSerialRoboclaw(Serial('/dev/ttyS1', 38400)).open()
+        spinner.forward_backward_m1(96)
+
+    Simple Serial has no replies, so the commands return `True` once the byte is written, and
+    every other `Roboclaw` method (reads, settings, buffered moves) raises `AttributeError`:
+    those need a `Roboclaw` in Packet Serial mode. In mixing mode (a `Roboclaw.set_config()` bit)
+    the M1 byte drives both motors forward and backward and the M2 byte turns, which is how the
+    ``*_mixed`` commands are sent.
+
+    :param ~serial.Serial serial_obj: The serial obj associated with the serial port that is connected to the RoboClaw.
+    """
+    def __init__(self, serial_obj):
+        self.serial_obj = serial_obj
+        self.serial_obj.close()
+        self._session = False
+        self.writes = 0 #: command bytes written
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def open(self):
+        """Open the serial port and keep it open until `close()` (see `Roboclaw.open()`).
+
+        :Returns: This `SimpleSerialRoboclaw` object."""
+        if not self._session:
+            self.serial_obj.__enter__()
+            self._session = True
+        return self
+
+    def close(self):
+        """Close the serial port."""
+        if self._session:
+            self._session = False
+            self.serial_obj.__exit__(None, None, None)
+
+    @property
+    def is_open(self):
+        """`True` while a session started with `open()` holds the serial port open."""
+        return self._session
+
+    def __getattr__(self, name):
+        if not name.startswith('_') and hasattr(Roboclaw, name):
+            raise AttributeError('{}() needs a Roboclaw in Packet Serial mode'.format(name))
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    def _write(self, value):
+        self.writes += 1
+        if self._session:
+            self.serial_obj.write(_BYTES[value])
+        else:
+            with self.serial_obj:
+                self.serial_obj.write(_BYTES[value])
+        return True
+
+    def stop(self):
+        """Shut both motors down."""
+        return self._write(STOP_ALL)
+
+    def forward_m1(self, val, address=None): # pylint: disable=unused-argument
+        """Drive M1 forward at ``val`` in range [0, 127] (see `Roboclaw.forward_m1()`).
+        ``address`` is ignored; Simple Serial has no addresses."""
+        return self._write(M1_STOP + _clamp(val) * 63 // 127)
+
+    def backward_m1(self, val, address=None): # pylint: disable=unused-argument
+        """Drive M1 backward at ``val`` in range [0, 127] (see `Roboclaw.backward_m1()`)."""
+        return self._write(M1_STOP - _clamp(val) * 63 // 127)
+
+    def forward_backward_m1(self, val, address=None): # pylint: disable=unused-argument
+        """Drive M1 at ``val`` in range [0, 127]: 0 is full reverse, 64 stop and 127 full
+        forward (see `Roboclaw.forward_backward_m1()`)."""
+        return self._write(max(_clamp(val), 1))
+
+    def forward_m2(self, val, address=None): # pylint: disable=unused-argument
+        """Drive M2 forward at ``val`` in range [0, 127] (see `Roboclaw.forward_m2()`)."""
+        return self._write(M2_STOP + _clamp(val) * 63 // 127)
+
+    def backward_m2(self, val, address=None): # pylint: disable=unused-argument
+        """Drive M2 backward at ``val`` in range [0, 127] (see `Roboclaw.backward_m2()`)."""
+        return self._write(M2_STOP - _clamp(val) * 64 // 127)
+
+    def forward_backward_m2(self, val, address=None): # pylint: disable=unused-argument
+        """Drive M2 at ``val`` in range [0, 127] (see `Roboclaw.forward_backward_m2()`)."""
+        return self._write(128 + _clamp(val))
+
+    def forward_mixed(self, val, address=None):
+        """Drive forward at ``val`` in range [0, 127] in mixing mode."""
+        return self.forward_m1(val, address)
+
+    def backward_mixed(self, val, address=None):
+        """Drive backward at ``val`` in range [0, 127] in mixing mode."""
+        return self.backward_m1(val, address)
+
+    def forward_backward_mixed(self, val, address=None):
+        """Drive at ``val`` in range [0, 127] (64 stops) in mixing mode."""
+        return self.forward_backward_m1(val, address)
+
+    def turn_right_mixed(self, val, address=None):
+        """Turn right at ``val`` in range [0, 127] in mixing mode."""
+        return self.forward_m2(val, address)
+
+    def turn_left_mixed(self, val, address=None):
+        """Turn left at ``val`` in range [0, 127] in mixing mode."""
+        return self.backward_m2(val, address)
+
+    def left_right_mixed(self, val, address=None):
+        """Turn at ``val`` in range [0, 127] (64 goes straight) in mixing mode."""
+        return self.forward_backward_m2(val, address)
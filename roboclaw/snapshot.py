@@ -0,0 +1,67 @@
+"""The readings that `Roboclaw.read_snapshot()` can batch into a single serial round-trip."""
+from .serial_commands import Cmd
+from .codec import COMMANDS
+
+def _tuple(data):
+    return data
+
+def _value(data):
+    return data[0]
+
+def _tenths(data):
+    return data[0] / 10
+
+#: The available snapshot fields mapped to the command that reads them and how the unpacked reply
+#: is stored in the `Snapshot`.
+SNAPSHOT_FIELDS = {
+    'encoder_m1': (Cmd.GETM1ENC, _tuple),     # (count, status)
+    'encoder_m2': (Cmd.GETM2ENC, _tuple),     # (count, status)
+    'speed_m1': (Cmd.GETM1SPEED, _tuple),     # (pulses per second, direction)
+    'speed_m2': (Cmd.GETM2SPEED, _tuple),     # (pulses per second, direction)
+    'currents': (Cmd.GETCURRENTS, _tuple),    # (M1, M2) in 10 mA units
+    'pwms': (Cmd.GETPWMS, _tuple),            # (M1, M2) in range [-32767, 32767]
+    'main_battery': (Cmd.GETMBATT, _tenths),  # volts
+    'logic_battery': (Cmd.GETLBATT, _tenths), # volts
+    'temp': (Cmd.GETTEMP, _tenths),           # degrees Celsius
+    'temp2': (Cmd.GETTEMP2, _tenths),         # degrees Celsius
+    'error': (Cmd.GETERROR, _value),          # status bit mask (see `Roboclaw.read_error()`)
+}
+
+class Snapshot:
+    """The state of one Roboclaw as read by `Roboclaw.read_snapshot()`. Every name in
+    `SNAPSHOT_FIELDS` is an attribute; fields that weren't requested (or whose reply failed its
+    checksum) are `None`.
+
+    :param float timestamp: The `time.monotonic()` seconds at which the queries were sent.
+    """
+    __slots__ = ('timestamp', 'failed') + tuple(SNAPSHOT_FIELDS)
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+        self.failed = () #: The names of the requested fields that got no valid reply.
+        for name in SNAPSHOT_FIELDS:
+            setattr(self, name, None)
+
+    @property
+    def ok(self):
+        """`True` if every requested field got a valid reply."""
+        return not self.failed
+
+    def __repr__(self):
+        values = ', '.join(
+            '{}={!r}'.format(name, getattr(self, name))
+            for name in SNAPSHOT_FIELDS if getattr(self, name) is not None
+        )
+        return 'Snapshot({})'.format(values)
+
+
+def plan(fields, raw=False):
+    """Get ``(name, Command, store)`` for each name in ``fields``, in order. With ``raw``, every
+    field is stored as its unpacked reply `tuple`."""
+    result = []
+    for name in fields:
+        if name not in SNAPSHOT_FIELDS:
+            raise ValueError('Unknown snapshot field: {}'.format(name))
+        cmd, store = SNAPSHOT_FIELDS[name]
+        result.append((name, COMMANDS[cmd], _tuple if raw else store))
+    return result
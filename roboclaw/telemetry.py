@@ -0,0 +1,187 @@
+"""A background sampler that polls a Roboclaw's readings at a fixed rate into preallocated `array`
+ring buffers, so that recent history (like the last second of spinner current) can be looked at
+without polling again."""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+
+def _signed_speed(data):
+    return -data[0] if data[1] else data[0]
+
+_FIRST = itemgetter(0)
+_SECOND = itemgetter(1)
+
+#: The channels a `TelemetrySampler` can record, mapped to the snapshot field that reads them
+#: (see `~roboclaw.snapshot.SNAPSHOT_FIELDS`), how the channel is picked out of the field's
+#: unpacked reply, the `array` type code the raw values are stored as and the factor that
+#: converts a raw value to its unit.
+CHANNELS = {
+    'encoder_m1': ('encoder_m1', _FIRST, 'i', 1),         # counts
+    'encoder_m2': ('encoder_m2', _FIRST, 'i', 1),         # counts
+    'speed_m1': ('speed_m1', _signed_speed, 'i', 1),      # pulses per second
+    'speed_m2': ('speed_m2', _signed_speed, 'i', 1),      # pulses per second
+    'current_m1': ('currents', _FIRST, 'h', 0.01),        # amps
+    'current_m2': ('currents', _SECOND, 'h', 0.01),       # amps
+    'pwm_m1': ('pwms', _FIRST, 'h', 1 / 327.67),          # duty cycle percent
+    'pwm_m2': ('pwms', _SECOND, 'h', 1 / 327.67),         # duty cycle percent
+    'main_battery': ('main_battery', _FIRST, 'h', 0.1),   # volts
+    'logic_battery': ('logic_battery', _FIRST, 'h', 0.1), # volts
+    'temp': ('temp', _FIRST, 'h', 0.1),                   # degrees Celsius
+    'temp2': ('temp2', _FIRST, 'h', 0.1),                 # degrees Celsius
+    'error': ('error', _FIRST, 'L', 1),                   # status bit mask
+}
+
+#: The channels recorded unless others are given.
+DEFAULT_CHANNELS = ('encoder_m1', 'encoder_m2', 'speed_m1', 'speed_m2', 'current_m1',
+                    'current_m2', 'pwm_m1', 'pwm_m2')
+
+
+class SamplerStats:
+    """Counters of the samples taken by a `TelemetrySampler`."""
+    __slots__ = ('samples', 'failures', 'missed')
+
+    def __init__(self):
+        self.samples = 0 #: samples recorded
+        self.failures = 0 #: samples dropped because a reading got no valid reply
+        self.missed = 0 #: ticks skipped because a sample took longer than the period
+
+    def __repr__(self):
+        return 'SamplerStats({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class TelemetrySampler:
+    """Records readings of one Roboclaw with a single `~roboclaw.Roboclaw.read_snapshot()`
+    round-trip per tick. Every channel (and the `time.monotonic()` timestamps) is kept in an
+    `array` of raw values allocated up front, so sampling doesn't grow memory and a window of the
+    latest samples is a `memoryview` into it instead of a copy::
+
+        with Roboclaw(Serial('/dev/ttyS1', 38400)) as rclaw, TelemetrySampler(rclaw) as sampler:
+            ...
+            amps = sampler.scaled('current_m1', seconds=1.0)
+
+    The sampler calls the driver from its own thread. If other threads use the same serial port,
+    give it a `~roboclaw.bus.RoboclawHandle` instead of the `Roboclaw` itself.
+
+    :param ~roboclaw.Roboclaw rclaw: The driver to poll. Open its session first, so the port isn't
+        reopened on every tick.
+    :param channels: The names of the channels to record (see `CHANNELS`). Defaults to
+        `DEFAULT_CHANNELS`.
+    :param float rate: The samples per second. Defaults to 50.
+    :param int capacity: The number of samples to keep; older ones are overwritten. Defaults to 512.
+    :param int address: The Roboclaw to poll. `None` (the default) polls ``rclaw``'s address.
+    """
+    def __init__(self, rclaw, channels=DEFAULT_CHANNELS, rate=50.0, capacity=512, address=None):
+        for name in channels:
+            if name not in CHANNELS:
+                raise ValueError('Unknown telemetry channel: {}'.format(name))
+        self.rclaw = rclaw
+        self.channels = tuple(channels)
+        self.rate = rate
+        self.capacity = capacity
+        self.address = address
+        self.stats = SamplerStats()
+        self._fields = tuple(dict.fromkeys(CHANNELS[name][0] for name in self.channels))
+        # every sample is stored twice, at its slot and ``capacity`` slots later, so that the
+        # latest ``capacity`` samples are always contiguous
+        self._times = array('d', bytes(2 * capacity * array('d').itemsize))
+        self._columns = {}
+        for name in self.channels:
+            typecode = CHANNELS[name][2]
+            self._columns[name] = array(typecode, bytes(2 * capacity * array(typecode).itemsize))
+        self._record = tuple(
+            (CHANNELS[name][0], CHANNELS[name][1], self._columns[name]) for name in self.channels)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling every ``1 / rate`` seconds.
+
+        :Returns: This `TelemetrySampler` object."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='roboclaw-telemetry', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling (the recorded samples are kept)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def sample(self):
+        """Take and record one sample now (the background thread calls this on every tick).
+
+        :Returns: `True` if the sample was recorded, `False` if a reading got no valid reply.
+        """
+        snapshot = self.rclaw.read_snapshot(self._fields, self.address, raw=True)
+        if snapshot.failed:
+            self.stats.failures += 1
+            return False
+        with self._lock:
+            slot = self._count % self.capacity
+            mirror = slot + self.capacity
+            self._times[slot] = self._times[mirror] = snapshot.timestamp
+            for field, pick, column in self._record:
+                column[slot] = column[mirror] = pick(getattr(snapshot, field))
+            self._count += 1
+        self.stats.samples += 1
+        return True
+
+    def window(self, *channels, seconds=None, samples=None):
+        """Get the latest samples of ``channels`` as raw values.
+
+        :param float seconds: Only the samples taken in this many seconds up to now.
+        :param int samples: At most this many samples. Defaults to all of them.
+        :Returns: A `tuple` of a `memoryview` of the timestamps followed by a `memoryview` of
+            each channel, in the order given. The views share the sampler's buffers (wrap one in
+            ``numpy.frombuffer()`` to get an array without copying), so they stay valid until
+            ``capacity`` minus their length further samples have been recorded. Copy them (with
+            ``.tolist()`` or `array`) to keep them for longer.
+        """
+        with self._lock:
+            end = self._count % self.capacity + self.capacity if self._count else 0
+            start = end - min(len(self), self.capacity if samples is None else samples)
+            times = memoryview(self._times)[start:end]
+            if seconds is not None:
+                start += bisect_left(times, time.monotonic() - seconds)
+            return (memoryview(self._times)[start:end],) + tuple(
+                memoryview(self._columns[name])[start:end] for name in channels)
+
+    def scaled(self, channel, seconds=None, samples=None):
+        """Get the latest samples of ``channel`` converted to its unit (see `CHANNELS`), like amps
+        for ``'current_m1'``. See `window()` for ``seconds`` and ``samples``.
+
+        :Returns: An `array` of `float`.
+        """
+        values = self.window(channel, seconds=seconds, samples=samples)[1]
+        return array('d', map(float(CHANNELS[channel][3]).__mul__, values))
+
+    def _run(self):
+        period = 1 / self.rate
+        tick = time.monotonic()
+        while not self._stop.is_set():
+            self.sample()
+            tick += period
+            late = time.monotonic() - tick
+            if late > 0: # skip the ticks that were missed instead of sampling in a burst
+                missed = int(late // period) + 1
+                self.stats.missed += missed
+                tick += missed * period
+            self._stop.wait(tick - time.monotonic())
@@ -3,9 +3,10 @@ import zmq
 import json
 import sys
 import traceback
-from roboclaw import Roboclaw
+from roboclaw.baud import connect
+from roboclaw.link import SupervisedRoboclaw
+from vesc import StatusReceiver, Vesc
 
-from serial import Serial
 from time import sleep, perf_counter
 from math import copysign
 from typing import Tuple
@@ -76,19 +77,6 @@ class RobotController:
 
     ESTOP_GPIO = 7
 
-    # TODO Not tested. Not sure what current unit is.
-    # # Convert a STATUS_1 CAN message to a tuple of (rpm, current, and duty cycle)
-    # @staticmethod
-    # def status_1_can(data: bytes) -> Optional[Tuple[int, float, float]]:
-    #     if len(data) != 8:
-    #         return None
-
-    #     rpm = int.from_bytes(data[0:4], byteorder='big')
-    #     current = int.from_bytes(data[4:6], byteorder='big')
-    #     duty = int.from_bytes(data[6:8], byteorder='big')
-
-    #     return (rpm, float(current) / 10.0, float(duty) / 1000.0)
-
     def __init__(self, remote_ip: str):
         self.ZMQ_HOST = remote_ip
 
@@ -104,9 +92,16 @@ class RobotController:
         self.can = can.Bus(
             bustype="socketcan", channel=self.CAN_ADDRESS, bitrate=self.CAN_BITRATE
         )
+        # One driver per VESC; each reuses its own preallocated frames for every command
+        self.vesc_l = Vesc(self.can, self.CONTROLLER_ID_L)
+        self.vesc_r = Vesc(self.can, self.CONTROLLER_ID_R)
+        # STATUS_1 to STATUS_5 frames of both VESCs, decoded in the background
+        self.feedback = StatusReceiver(self.can, (self.CONTROLLER_ID_L, self.CONTROLLER_ID_R)).start()
 
-        # Spinner roboclaw controller
-        self.rclaw_spinner = Roboclaw(Serial("/dev/ttyS1", 38400))
+        # Spinner roboclaw controller; finds the board and reconnects on its own in the background,
+        # so a missing spinner doesn't stop startup and spin commands fail quietly instead of
+        # raising out of `listen` and killing the robot.
+        self.rclaw_spinner = connect("/dev/ttyS1", driver=SupervisedRoboclaw)
 
         # set estop GPIO to high
         #wiringpi.digitalWrite(self.ESTOP_GPIO, 1)
@@ -143,25 +138,11 @@ class RobotController:
             min(target_wheels[1] - self.prev_wheels[1], delta * self.ramp),
         )
 
-        l_can = (-int(clamp(-1.0, 1.0, self.prev_wheels[0] + target_diff[0]) * 100000)).to_bytes(4, byteorder="big", signed=True)
-        r_can = int(clamp(-1.0, 1.0, self.prev_wheels[1] + target_diff[1]) * 100000).to_bytes(4, byteorder="big", signed=True)
-        #print(l_can, r_can, int.from_bytes(l_can, byteorder="big", signed=True), int.from_bytes(r_can, byteorder="big", signed=True))
-
-        if l_can is not None and r_can is not None:
-            self.can.send(
-                can.Message(
-                    arbitration_id=self.CONTROLLER_ID_L,
-                    data=l_can,
-                    is_extended_id=True,
-                )
-            )
-            self.can.send(
-                can.Message(
-                    arbitration_id=self.CONTROLLER_ID_R,
-                    data=r_can,
-                    is_extended_id=True,
-                )
-            )
+        l_duty = -clamp(-1.0, 1.0, self.prev_wheels[0] + target_diff[0])
+        r_duty = clamp(-1.0, 1.0, self.prev_wheels[1] + target_diff[1])
+
+        self.vesc_l.set_duty(l_duty)
+        self.vesc_r.set_duty(r_duty)
 
     # Command the spinner
     #
@@ -170,7 +151,7 @@ class RobotController:
     # vel:
     #   velociy value from -1.0 to 1.0
     def spin(self, vel: float):
-        self.rclaw_spinner.forward_backward_m1(min(64 + 64 * vel, 127))
+        self.rclaw_spinner.forward_backward_m1(min(64 + int(64 * vel), 127))
 
     def execute(self, cjson: json):
         try:
@@ -248,21 +229,8 @@ class RobotController:
         #wiringpi.digitalWrite(self.ESTOP_GPIO, 0)
 
         # kill CAN motors
-        self.can.send(
-            can.Message(
-                arbitration_id=self.CONTROLLER_ID_L,
-                data=0x00000000,
-                is_extended_id=True,
-            )
-        )
-
-        self.can.send(
-            can.Message(
-                arbitration_id=self.CONTROLLER_ID_R,
-                data=0x00000000,
-                is_extended_id=True,
-            )
-        )
+        self.vesc_l.set_duty(0.0)
+        self.vesc_r.set_duty(0.0)
 
         print("Robot is dead")
         self.dead = True
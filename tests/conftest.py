@@ -0,0 +1,34 @@
+"""Fixtures shared by the regression tests, which talk to a `RoboclawEmulator` on a pseudo-terminal
+instead of a board.
+
+Usage: ``python -m pytest tests``"""
+import os
+import sys
+import time
+
+import pytest
+from serial import Serial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from roboclaw.emulator import RoboclawEmulator  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture
+def emulator():
+    """a running `RoboclawEmulator` at address ``0x80`` that drops bytes sent at the wrong rate"""
+    with RoboclawEmulator(check_baud=True) as emu:
+        yield emu
+
+
+@pytest.fixture
+def port(emulator):
+    """a closed serial port to ``emulator`` at its default rate"""
+    return Serial(emulator.port, 38400, timeout=0.05)
+
+
+def wait_for(condition, seconds=5.0):
+    """poll ``condition`` until it is true or ``seconds`` pass, and return its last result"""
+    until = time.monotonic() + seconds
+    while not condition() and time.monotonic() < until:
+        time.sleep(0.005)
+    return condition()
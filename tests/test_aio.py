@@ -0,0 +1,50 @@
+"""Regression tests of `AsyncRoboclaw`, run on a fresh event loop each."""
+import asyncio
+
+import pytest
+
+from roboclaw.aio import AsyncRoboclaw
+from roboclaw.emulator import DEFAULTS, Faults
+from roboclaw.serial_commands import Cmd
+
+
+def _run(port, coroutine, **kwargs):
+    async def main():
+        async with AsyncRoboclaw(port, **kwargs) as rclaw:
+            return await coroutine(rclaw)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('frame_cache', [64, 0])
+def test_pipelined_commands(emulator, port, frame_cache):
+    async def commands(rclaw):
+        return await asyncio.gather(*[
+            rclaw.read_encoder_m1() if index % 2 else rclaw.forward_backward_m1(64 + index % 5)
+            for index in range(40)
+        ])
+    emulator.faults = Faults(silent=0.05, seed=1)
+    results = _run(port, commands, frame_cache=frame_cache)
+    assert sum(result is False for result in results) <= 1
+    assert all(result in (True, False) for result in results[::2])
+    assert all(result is False or len(result) == 2 for result in results[1::2])
+
+
+def test_exchange_keeps_the_base_signature(port):
+    """`Roboclaw._payload()` and the baud probe call `_exchange()` with a CRC (and a timeout)"""
+    async def reads(rclaw):
+        frame, crc = rclaw._frame(Cmd.GETCONFIG, (), 0x80) # pylint: disable=protected-access
+        checked = await rclaw._exchange(frame, 4, crc) # pylint: disable=protected-access
+        bounded = await rclaw._exchange(frame, 4, crc, 0.05) # pylint: disable=protected-access
+        payload = await rclaw._payload(Cmd.GETCONFIG, (), 0x80) # pylint: disable=protected-access
+        return checked, bounded, payload, await rclaw.get_config(), await rclaw.read_version()
+    checked, bounded, payload, config, version = _run(port, reads)
+    assert checked == bounded == payload == DEFAULTS[Cmd.GETCONFIG][0].to_bytes(2, 'big')
+    assert config == DEFAULTS[Cmd.GETCONFIG]
+    assert version == 'USB Roboclaw 2x15a v4.1.34'
+
+
+def test_exchange_times_out(port):
+    async def silent(rclaw):
+        frame, crc = rclaw._frame(Cmd.GETCONFIG, (), 0x81) # pylint: disable=protected-access
+        return await rclaw._exchange(frame, 4, crc, 0.01) # pylint: disable=protected-access
+    assert _run(port, silent) is False
@@ -0,0 +1,81 @@
+"""Regression tests of `BusArbiter` and its `RoboclawHandle` objects."""
+import threading
+import time
+
+import pytest
+
+from roboclaw.bus import PRIORITY_DRIVE, PRIORITY_TELEMETRY, BusArbiter, priority_of
+from roboclaw.policy import DeadlineExceeded, NoReply, RetryPolicy, RoboclawError
+from roboclaw.serial_commands import Cmd
+
+
+def test_priorities():
+    assert priority_of(Cmd.M1FORWARD) == PRIORITY_DRIVE
+    assert priority_of(Cmd.GETMBATT) == PRIORITY_TELEMETRY
+
+
+def test_handles(port):
+    with BusArbiter(port) as bus:
+        handle = bus.handle(0x80)
+        assert bus.handle(0x80) is handle
+        with pytest.raises(ValueError):
+            bus.handle(0x80, retries=5)
+        assert handle.forward_backward_m1(64) is True
+        assert bus.stats[0x80].transactions == 1
+    assert not port.is_open
+
+
+def test_submit_needs_start(port):
+    with pytest.raises(RuntimeError):
+        BusArbiter(port).submit(b'\x80\x06\x40', None)
+
+
+@pytest.mark.parametrize('policy', [None, RetryPolicy(drive=0.05, telemetry=0.05)])
+@pytest.mark.parametrize('frame_cache', [64, 0])
+def test_threads_share_a_handle(emulator, port, policy, frame_cache):
+    """frames and replies of several threads on one handle don't get mixed up"""
+    failures = []
+    with BusArbiter(port) as bus:
+        handle = bus.handle(0x80, policy=policy)
+        handle._frame_cache = frame_cache # pylint: disable=protected-access
+
+        def work(index):
+            for step in range(30):
+                try:
+                    if step % 3 == 0:
+                        ok = handle.forward_backward_m1((index * 7 + step) % 128) is True
+                    elif step % 3 == 1:
+                        ok = handle.read_main_battery_voltage() == pytest.approx(emulator.main_battery)
+                    else:
+                        ok = handle.read_snapshot(('encoder_m1', 'pwms')).ok
+                except RoboclawError as exc:
+                    ok = exc
+                if ok is not True:
+                    failures.append((index, step, ok))
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert failures == []
+    assert bus.link_stats.crc_errors == 0
+
+
+def test_policy_deadline_holds_through_the_arbiter(port):
+    """a job on the wire is held to the caller's deadline, not the port timeout times the retries"""
+    with BusArbiter(port) as bus:
+        handle = bus.handle(0x81, policy=RetryPolicy(drive=0.005))
+        start = time.monotonic()
+        with pytest.raises((DeadlineExceeded, NoReply)):
+            handle.forward_backward_m1(64)
+        assert time.monotonic() - start < 0.04
+        assert bus.handle(0x80).forward_backward_m1(64) is True
+
+
+def test_expired_job_stays_off_the_wire(port):
+    with BusArbiter(port) as bus:
+        future = bus.submit(b'\x80\x06\x40', None, timeout=0.0)
+        with pytest.raises(DeadlineExceeded):
+            future.result(1)
+    assert 0x80 not in bus.stats
@@ -0,0 +1,82 @@
+"""Regression tests of `Roboclaw` commands and reads, with and without a `RetryPolicy`."""
+import time
+
+import pytest
+from serial import Serial
+
+from roboclaw import Roboclaw
+from roboclaw.emulator import DEFAULTS, Faults
+from roboclaw.policy import DeadlineExceeded, NoReply, RetryPolicy, RoboclawError
+from roboclaw.serial_commands import Cmd
+
+
+@pytest.mark.parametrize('frame_cache', [64, 0])
+def test_commands_and_reads(emulator, port, frame_cache):
+    with Roboclaw(port, frame_cache=frame_cache) as rclaw:
+        assert rclaw.forward_backward_m1(127) is True
+        assert emulator.duty[0] > 0
+        assert rclaw.forward_backward_m1(64) is True
+        assert rclaw.read_main_battery_voltage() == pytest.approx(emulator.main_battery)
+        assert rclaw.read_version() == 'USB Roboclaw 2x15a v4.1.34'
+        assert rclaw.get_config() == DEFAULTS[Cmd.GETCONFIG]
+    assert rclaw.stats.crc_errors == 0
+
+
+def test_session_reopens_per_command(port):
+    rclaw = Roboclaw(port)
+    assert rclaw.forward_backward_m1(64) is True
+    assert not port.is_open
+
+
+def test_other_address_gets_no_reply(port):
+    with Roboclaw(port, address=0x81, retries=1) as rclaw:
+        assert rclaw.forward_backward_m1(64) is False
+        assert rclaw.read_main_battery_voltage() is False
+
+
+@pytest.mark.parametrize('frame_cache', [64, 0])
+def test_policy_retries_corrupt_replies(emulator, port, frame_cache):
+    """a reply that fails its checksum is retried right away, within the deadline"""
+    emulator.faults = Faults(corrupt=0.2, seed=7)
+    policy = RetryPolicy(drive=0.05, config=0.05, telemetry=0.05, retries=8)
+    with Roboclaw(port, frame_cache=frame_cache, policy=policy) as rclaw:
+        for _ in range(20):
+            assert rclaw.read_main_battery_voltage() == pytest.approx(emulator.main_battery)
+            assert rclaw.read_version() == 'USB Roboclaw 2x15a v4.1.34'
+    assert rclaw.stats.crc_errors > 0
+
+
+def test_policy_deadline_on_silent_board(port):
+    """an unanswered drive command gives up at its deadline, not the port timeout"""
+    with Roboclaw(port, address=0x81, policy=RetryPolicy(drive=0.005)) as rclaw:
+        start = time.monotonic()
+        with pytest.raises((DeadlineExceeded, NoReply)):
+            rclaw.forward_backward_m1(64)
+        assert time.monotonic() - start < 0.04
+
+
+def test_policy_leaves_port_settings_alone(port, monkeypatch):
+    """attempts wait on the file descriptor instead of reconfiguring the port for each deadline"""
+    with Roboclaw(port, policy=RetryPolicy()) as rclaw:
+        calls = []
+        reconfigure = port._reconfigure_port # pylint: disable=protected-access
+        monkeypatch.setattr(port, '_reconfigure_port', lambda *args: calls.append(args) or reconfigure(*args))
+        for speed in range(20):
+            assert rclaw.forward_backward_m1(64 + speed) is True
+            assert rclaw.read_encoder_m1() is not False
+        with pytest.raises(RoboclawError):
+            rclaw.read_main_battery_voltage(address=0x81)
+    assert calls == []
+
+
+def test_restore_defaults_forgets_settings(emulator):
+    with Roboclaw(Serial(emulator.port, 38400, timeout=0.05), config_cache=True, policy=RetryPolicy()) as rclaw:
+        assert rclaw.config.refresh()
+        assert rclaw.set_m1_max_current(1000) is True
+        replies = rclaw.stats.replies
+        assert rclaw.restore_defaults() is True
+        assert rclaw.stats.replies == replies # nothing re-read behind the caller's back
+        assert rclaw.config.settings(0x80) == {}
+        assert rclaw.config.loaded(0x80)
+        assert rclaw.read_m1_max_current() == rclaw.read_m1_max_current()
+        assert rclaw.config.hits == 1
@@ -0,0 +1,142 @@
+"""Regression tests of finding the board (`~roboclaw.baud`) and of `SupervisedRoboclaw` keeping the
+link up."""
+import time
+
+import pytest
+from conftest import wait_for
+from serial import Serial
+
+from roboclaw.baud import BaudCache, connect, probe
+from roboclaw.emulator import DEFAULTS, Faults
+from roboclaw.health import HealthMonitor
+from roboclaw.link import LinkState, SupervisedRoboclaw
+from roboclaw.policy import LinkDown, NoReply, RetryPolicy, RoboclawError
+from roboclaw.serial_commands import Cmd
+
+
+def _up(rclaw):
+    return wait_for(lambda: rclaw.state is LinkState.UP)
+
+
+def _brownout(emulator, rclaw):
+    """silence the board until the link goes down, then bring it back at its saved rate"""
+    emulator.faults = Faults(silent=1.0)
+    while rclaw.state is LinkState.UP:
+        try:
+            rclaw.forward_backward_m1(64)
+        except RoboclawError:
+            pass
+    emulator.registers[Cmd.GETCONFIG] = DEFAULTS[Cmd.GETCONFIG]
+    emulator.faults = Faults()
+
+
+def test_probe_finds_the_rate(emulator):
+    rclaw = connect(emulator.port, baudrate=115200, cache=BaudCache(None), rates=(9600, 38400))
+    assert rclaw.serial_obj.baudrate == 38400
+    assert probe(rclaw, (115200, 38400)) == 38400
+    rclaw.close()
+    assert not rclaw.serial_obj.is_open
+
+
+def test_connect_negotiates_and_loads_settings(emulator):
+    cache = BaudCache(None)
+    rclaw = connect(emulator.port, cache=cache, negotiate=True, config_cache=True)
+    try:
+        assert rclaw.serial_obj.baudrate == 460800
+        assert cache.get(emulator.port) == 460800
+        assert rclaw.config.loaded(0x80)
+        assert rclaw.forward_backward_m1(70) is True
+    finally:
+        rclaw.close()
+
+
+def test_connect_raises_without_a_board(emulator):
+    with pytest.raises(NoReply):
+        connect(emulator.port, address=0x81, cache=BaudCache(None), rates=(38400,))
+
+
+def test_supervised_connect_comes_up(emulator):
+    rates = []
+    rclaw = connect(emulator.port, cache=BaudCache(None), driver=SupervisedRoboclaw, config_cache=True,
+                    negotiate=True, on_state=rates.append)
+    try:
+        assert _up(rclaw)
+        assert rclaw.serial_obj.baudrate == 460800
+        assert len(rclaw.config.settings(0x80)) == len(DEFAULTS)
+        assert rates == [LinkState.UP]
+    finally:
+        rclaw.close()
+
+
+def test_supervised_connect_without_a_port():
+    rclaw = connect('/dev/no-such-port', cache=BaudCache(None), driver=SupervisedRoboclaw)
+    try:
+        assert rclaw.state is LinkState.DOWN
+        assert rclaw.forward_backward_m1(64) is False
+        assert rclaw.read_snapshot(('temp',)).failed == ('temp',)
+    finally:
+        rclaw.close()
+
+
+@pytest.mark.parametrize('policy', [None, RetryPolicy(drive=0.005)])
+def test_recovers_from_a_brownout(emulator, policy):
+    """the link comes back at the negotiated rate while the health monitor keeps polling"""
+    rclaw = connect(emulator.port, cache=BaudCache(None), driver=SupervisedRoboclaw, config_cache=True,
+                    negotiate=True, policy=policy)
+    try:
+        assert _up(rclaw)
+        monitor = HealthMonitor(rclaw)
+        _brownout(emulator, rclaw)
+        assert rclaw.state is LinkState.DOWN
+        until = time.monotonic() + 5
+        while rclaw.state is LinkState.DOWN and time.monotonic() < until:
+            try: # races the reconnection thread for the port, but only ever raises LinkDown
+                monitor.poll()
+            except LinkDown:
+                assert policy is not None
+        assert rclaw.state is LinkState.UP
+        assert rclaw.outages == 1
+        assert rclaw.serial_obj.baudrate == 460800
+        assert rclaw.forward_backward_m1(70) is True
+    finally:
+        rclaw.close()
+
+
+def test_snapshot_while_down(emulator):
+    rclaw = SupervisedRoboclaw(Serial(emulator.port, 38400, timeout=0.01), failures=1, policy=RetryPolicy()).open()
+    try:
+        emulator.faults = Faults(silent=1.0) # and the reconnection thread never finds it
+        with pytest.raises(RoboclawError):
+            rclaw.forward_backward_m1(64)
+        assert rclaw.state is LinkState.DOWN
+        with pytest.raises(LinkDown):
+            rclaw.read_snapshot()
+    finally:
+        rclaw.close()
+
+
+def test_reconnect_after_restore_defaults(emulator):
+    """a reset empties the config cache, which is then loaded again instead of put back"""
+    rclaw = connect(emulator.port, cache=BaudCache(None), driver=SupervisedRoboclaw, config_cache=True,
+                    policy=RetryPolicy())
+    try:
+        assert _up(rclaw)
+        assert rclaw.restore_defaults() is True
+        assert rclaw.config.settings(0x80) == {}
+        _brownout(emulator, rclaw)
+        assert _up(rclaw)
+        assert not isinstance(rclaw.error, RuntimeError)
+        assert len(rclaw.config.settings(0x80)) == len(DEFAULTS)
+    finally:
+        rclaw.close()
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning') # the RuntimeError
+def test_reconnect_needs_loaded_settings(emulator):
+    rclaw = SupervisedRoboclaw(Serial(emulator.port, 38400, timeout=0.01), failures=1, config_cache=True).open()
+    try:
+        _brownout(emulator, rclaw)
+        assert not wait_for(lambda: rclaw.state is LinkState.UP, 0.3)
+        assert isinstance(rclaw.error, RuntimeError)
+    finally:
+        rclaw.close()
@@ -0,0 +1,54 @@
+"""Regression tests of `Roboclaw.read_snapshot()`, which batches its reads into one round-trip."""
+import pytest
+
+from roboclaw import Roboclaw
+from roboclaw.emulator import Faults
+from roboclaw.policy import RetryPolicy
+from roboclaw.snapshot import SNAPSHOT_FIELDS
+
+
+@pytest.mark.parametrize('policy', [None, RetryPolicy(telemetry=0.05)])
+def test_every_field(emulator, port, policy):
+    emulator.encoders[0] = 1234
+    with Roboclaw(port, policy=policy) as rclaw:
+        snapshot = rclaw.read_snapshot()
+    assert snapshot.ok
+    assert all(getattr(snapshot, name) is not None for name in SNAPSHOT_FIELDS)
+    assert snapshot.encoder_m1[0] == 1234
+    assert snapshot.main_battery == pytest.approx(emulator.main_battery)
+    assert snapshot.temp == pytest.approx(emulator.temp)
+
+
+def test_requested_fields_only(port):
+    with Roboclaw(port) as rclaw:
+        snapshot = rclaw.read_snapshot(('pwms', 'error'), raw=True)
+    assert snapshot.ok
+    assert snapshot.pwms == (0, 0)
+    assert snapshot.error == (0,)
+    assert snapshot.encoder_m1 is None
+
+
+def test_unknown_field(port):
+    with pytest.raises(ValueError):
+        Roboclaw(port).read_snapshot(('rpm',))
+
+
+def test_opens_its_own_session(port):
+    assert Roboclaw(port).read_snapshot(('temp',)).ok
+    assert not port.is_open
+
+
+@pytest.mark.parametrize('policy', [None, RetryPolicy(telemetry=0.2, retries=6)])
+def test_retries_failed_fields(emulator, port, policy):
+    emulator.faults = Faults(drop=0.05, corrupt=0.05, seed=3)
+    with Roboclaw(port, retries=6, policy=policy) as rclaw:
+        snapshots = [rclaw.read_snapshot() for _ in range(20)]
+    assert sum(len(snapshot.failed) for snapshot in snapshots) <= 2
+    assert rclaw.stats.resyncs > 0
+
+
+def test_silent_board_fails_every_field(port):
+    with Roboclaw(port, address=0x81, retries=1) as rclaw:
+        snapshot = rclaw.read_snapshot(('encoder_m1', 'temp'))
+    assert snapshot.failed == ('encoder_m1', 'temp')
+    assert snapshot.encoder_m1 is None
@@ -0,0 +1,6 @@
+"""module management for the VESC package"""
+from .vesc import Vesc
+from .packets import Packet
+from .codec import COMMANDS, STATUS_FRAMES, arbitration_id
+from .status import MotorStatus, StatusReceiver
+__all__ = ['Vesc', 'Packet', 'COMMANDS', 'STATUS_FRAMES', 'arbitration_id', 'MotorStatus', 'StatusReceiver']
@@ -0,0 +1,95 @@
+"""A declarative table describing how every VESC CAN command is encoded (and how the status
+frames that VESCs broadcast are decoded). Each entry precompiles its `~struct.Struct` format once
+at import time so that the `~vesc.Vesc` driver only packs scaled integers into preallocated frames
+on the actuation path."""
+from struct import Struct
+from .packets import Packet
+
+# pylint: disable=invalid-name
+
+DUTY_SCALE = 100000.0 #: Duty cycle fractions are sent in 1/100000ths.
+CURRENT_SCALE = 1000.0 #: Currents are sent in milliamps.
+RELATIVE_SCALE = 100000.0 #: Fractions of the configured current limits are sent in 1/100000ths.
+POSITION_SCALE = 1000000.0 #: Positions are sent in millionths of a degree.
+
+def arbitration_id(packet, controller_id):
+    """Get the extended arbitration ID of a ``packet`` type (see `Packet`) sent to (or from) a
+    ``controller_id`` in range [0, 255]."""
+    return controller_id | packet << 8
+
+
+class Command:
+    """How the payload of one `Packet` type is packed.
+
+    :param int packet: The packet type (one of the `Packet` attributes).
+    :param str args: The `struct` format of the (big-endian) fields of the payload.
+    :param tuple scales: What each argument (in volts, amps, degrees or fractions) is multiplied by
+        before it is truncated into its field.
+    """
+    __slots__ = ('packet', 'payload', 'scales')
+
+    def __init__(self, packet, args, scales):
+        self.packet = packet
+        self.payload = Struct('>' + args) #: packs the scaled fields
+        self.scales = scales
+
+    def pack_into(self, buf, *values):
+        """Pack ``values`` into the start of ``buf`` (at least ``payload.size`` bytes long)."""
+        if len(values) == 1: # the common single-field setpoint, without building a list
+            self.payload.pack_into(buf, 0, int(values[0] * self.scales[0]))
+        else:
+            self.payload.pack_into(buf, 0, *[int(value * scale) for value, scale in zip(values, self.scales)])
+
+
+COMMANDS = {spec.packet: spec for spec in (
+    Command(Packet.SET_DUTY, 'i', (DUTY_SCALE,)),
+    Command(Packet.SET_CURRENT, 'i', (CURRENT_SCALE,)),
+    Command(Packet.SET_CURRENT_BRAKE, 'i', (CURRENT_SCALE,)),
+    Command(Packet.SET_RPM, 'i', (1,)),
+    Command(Packet.SET_POS, 'i', (POSITION_SCALE,)),
+    Command(Packet.SET_CURRENT_REL, 'i', (RELATIVE_SCALE,)),
+    Command(Packet.SET_CURRENT_BRAKE_REL, 'i', (RELATIVE_SCALE,)),
+    Command(Packet.SET_CURRENT_HANDBRAKE, 'i', (CURRENT_SCALE,)),
+    Command(Packet.SET_CURRENT_HANDBRAKE_REL, 'i', (RELATIVE_SCALE,)),
+    Command(Packet.CONF_CURRENT_LIMITS, 'ii', (CURRENT_SCALE, CURRENT_SCALE)),
+    Command(Packet.CONF_STORE_CURRENT_LIMITS, 'ii', (CURRENT_SCALE, CURRENT_SCALE)),
+    Command(Packet.CONF_CURRENT_LIMITS_IN, 'ii', (CURRENT_SCALE, CURRENT_SCALE)),
+    Command(Packet.CONF_STORE_CURRENT_LIMITS_IN, 'ii', (CURRENT_SCALE, CURRENT_SCALE)),
+    Command(Packet.CONF_FOC_ERPMS, 'ii', (1000.0, 1000.0)),
+    Command(Packet.CONF_STORE_FOC_ERPMS, 'ii', (1000.0, 1000.0)),
+    Command(Packet.CONF_BATTERY_CUT, 'ii', (1000.0, 1000.0)),
+    Command(Packet.CONF_STORE_BATTERY_CUT, 'ii', (1000.0, 1000.0)),
+)}
+
+
+class StatusFrame:
+    """How the payload of one status `Packet` type that a VESC broadcasts is decoded.
+
+    :param int packet: The packet type (`Packet.STATUS` to `Packet.STATUS_5`).
+    :param str fields: The `struct` format of the (big-endian) fields of the payload.
+    :param tuple names: The name of each field's value.
+    :param tuple scales: What each field is divided by to get volts, amps, degrees Celsius or
+        fractions (`None` for a count that is kept as an `int`).
+    """
+    __slots__ = ('packet', 'payload', 'names', 'scales')
+
+    def __init__(self, packet, fields, names, scales):
+        self.packet = packet
+        self.payload = Struct('>' + fields) #: unpacks the fields
+        self.names = names
+        self.scales = scales
+
+    def decode(self, data):
+        """Get the scaled values of a frame's ``data``."""
+        return tuple(value if scale is None else value / scale
+                     for value, scale in zip(self.payload.unpack_from(data), self.scales))
+
+
+STATUS_FRAMES = {spec.packet: spec for spec in (
+    StatusFrame(Packet.STATUS, 'ihh', ('erpm', 'current', 'duty'), (None, 10.0, 1000.0)),
+    StatusFrame(Packet.STATUS_2, 'ii', ('amp_hours', 'amp_hours_charged'), (10000.0, 10000.0)),
+    StatusFrame(Packet.STATUS_3, 'ii', ('watt_hours', 'watt_hours_charged'), (10000.0, 10000.0)),
+    StatusFrame(Packet.STATUS_4, 'hhhh', ('temp_fet', 'temp_motor', 'current_in', 'pid_pos'),
+                (10.0, 10.0, 10.0, 50.0)),
+    StatusFrame(Packet.STATUS_5, 'ih', ('tachometer', 'v_in'), (None, 10.0)), # then 2 reserved bytes
+)}
@@ -0,0 +1,39 @@
+"""VESC CAN Packet Enums"""
+# pylint: disable=bad-whitespace
+class Packet:
+    """the domain of key/value pairs used for the CAN packet types of the VESC firmware
+    (``CAN_PACKET_ID`` in its ``datatypes.h``). The packet type is the second byte of a frame's
+    extended arbitration ID (see `~vesc.codec.arbitration_id()`); the first is the controller ID.
+    """
+    SET_DUTY                     = 0    #: The `~vesc.Vesc.set_duty` packet type
+    SET_CURRENT                  = 1    #: The `~vesc.Vesc.set_current` packet type
+    SET_CURRENT_BRAKE            = 2    #: The `~vesc.Vesc.set_brake_current` packet type
+    SET_RPM                      = 3    #: The `~vesc.Vesc.set_rpm` packet type
+    SET_POS                      = 4    #: The `~vesc.Vesc.set_position` packet type
+    FILL_RX_BUFFER               = 5
+    FILL_RX_BUFFER_LONG          = 6
+    PROCESS_RX_BUFFER            = 7
+    PROCESS_SHORT_BUFFER         = 8
+    STATUS                       = 9    #: The ERPM, current and duty cycle status frame
+    SET_CURRENT_REL              = 10   #: The `~vesc.Vesc.set_relative_current` packet type
+    SET_CURRENT_BRAKE_REL        = 11   #: The `~vesc.Vesc.set_relative_brake_current` packet type
+    SET_CURRENT_HANDBRAKE        = 12   #: The `~vesc.Vesc.set_handbrake_current` packet type
+    SET_CURRENT_HANDBRAKE_REL    = 13   #: The `~vesc.Vesc.set_relative_handbrake_current` packet type
+    STATUS_2                     = 14   #: The amp hours status frame
+    STATUS_3                     = 15   #: The watt hours status frame
+    STATUS_4                     = 16   #: The temperatures, input current and PID position status frame
+    PING                         = 17
+    PONG                         = 18
+    DETECT_APPLY_ALL_FOC         = 19
+    DETECT_APPLY_ALL_FOC_RES     = 20
+    CONF_CURRENT_LIMITS          = 21   #: The `~vesc.Vesc.set_current_limits` packet type
+    CONF_STORE_CURRENT_LIMITS    = 22   #: The `~vesc.Vesc.set_current_limits` packet type that is also saved
+    CONF_CURRENT_LIMITS_IN       = 23   #: The `~vesc.Vesc.set_input_current_limits` packet type
+    CONF_STORE_CURRENT_LIMITS_IN = 24   #: The `~vesc.Vesc.set_input_current_limits` packet type that is also saved
+    CONF_FOC_ERPMS               = 25   #: The `~vesc.Vesc.set_foc_erpms` packet type
+    CONF_STORE_FOC_ERPMS         = 26   #: The `~vesc.Vesc.set_foc_erpms` packet type that is also saved
+    STATUS_5                     = 27   #: The tachometer and input voltage status frame
+    POLL_TS5700N8501_STATUS      = 28
+    CONF_BATTERY_CUT             = 29   #: The `~vesc.Vesc.set_battery_cut` packet type
+    CONF_STORE_BATTERY_CUT       = 30   #: The `~vesc.Vesc.set_battery_cut` packet type that is also saved
+    SHUTDOWN                     = 31
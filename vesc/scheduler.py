@@ -0,0 +1,189 @@
+"""A send scheduler that paces the setpoint frames of several VESCs to what the CAN bus can carry:
+the time each frame takes on the wire follows from the bitrate and the frame's size, so the
+scheduler knows how often a full round of setpoints fits within its share of the bus. It can also
+hand the rounds to python-can cyclic tasks, which the SocketCAN broadcast manager sends from the
+kernel."""
+import time
+
+def frame_bits(size, extended=True):
+    """Get the bits that a data frame with ``size`` bytes takes on the wire at worst: its fields,
+    the stuff bits (one per four bits from the start of frame to the end of the CRC) and the
+    interframe space."""
+    stuffed = (54 if extended else 34) + 8 * size # start of frame through CRC
+    return stuffed + (stuffed - 1) // 4 + 13 # CRC and ACK delimiters, ACK slot, end of frame, interframe space
+
+_STATUS_BITS = frame_bits(8) # a VESC status frame
+
+
+class SendScheduler:
+    """Sends a round of preallocated setpoint ``messages`` (see `~vesc.Vesc.prepare()`) as often
+    as ``max_load`` of the bus allows, less the traffic that ``receiver`` measured::
+
+        scheduler = SendScheduler(bus, 500000, [left.message(Packet.SET_DUTY), right.message(Packet.SET_DUTY)])
+        ...
+        if scheduler.due(stop):
+            left.prepare(Packet.SET_DUTY, l_duty)
+            right.prepare(Packet.SET_DUTY, r_duty)
+            scheduler.send(stop)
+
+    A round that stops the motors (``stop``) goes out straight away, ahead of the budget, unless
+    the previous round was already a stop.
+
+    With ``refresh``, `start()` gives each message a cyclic task (see
+    `~can.BusABC.send_periodic()`) that resends it every ``refresh`` seconds (or every `period`, if
+    that is longer) on its own, from the kernel on SocketCAN. `due()` is then always `True` and
+    `send()` only pushes the payloads that changed to their tasks (see
+    `~can.ModifiableCyclicTaskABC.modify_data()`), which take effect at the next resend; a stop is
+    also sent right away. `send()` also measures `utilisation` (counting the resends) once a
+    ``window`` has passed, and re-arms the tasks when the bus allows another interval than they
+    run at or half their ``duration`` has gone by. The tasks end on their own ``duration`` seconds
+    after they were last armed, so the motors don't keep their last setpoint while the control
+    loop stalls, or when `stop()` ends them.
+
+    :param ~can.BusABC bus: The python-can bus to send on.
+    :param int bitrate: The bus's bitrate in bits per second.
+    :param messages: The `~can.Message` objects of one round, sent in order.
+    :param float max_load: The fraction of the bus that the rounds (and the received traffic) may
+        take. Defaults to 0.7, leaving room for other nodes and retransmissions.
+    :param ~vesc.StatusReceiver receiver: Counts the status frames on the bus, whose share of the
+        bus is left out of the budget. Defaults to none.
+    :param float window: The seconds over which `utilisation` is measured. Defaults to 1.0.
+    :param float refresh: Opts into cyclic tasks that resend the messages every this many
+        seconds. `None` (the default) sends every round from `send()`.
+    :param float duration: The seconds the cyclic tasks keep resending after they were last armed.
+        `None` (the default) resends until `stop()`.
+    """
+    def __init__(self, bus, bitrate, messages, max_load=0.7, receiver=None, window=1.0, refresh=None,
+                 duration=None):
+        self.bus = bus
+        self.bitrate = bitrate
+        self.messages = tuple(messages)
+        self.max_load = max_load
+        self.receiver = receiver
+        self.window = window
+        self.refresh = refresh
+        self.duration = duration
+        self.round_bits = sum(frame_bits(len(message.data), message.is_extended_id) for message in self.messages) #: the bits of one round
+        self.utilisation = 0.0 #: the fraction of the bus that sent rounds and received status frames took over the last ``window``
+        self.rounds = 0 #: rounds sent
+        self.stops = 0 #: stop rounds sent ahead of the budget
+        self.updates = 0 #: payload changes pushed to the cyclic tasks
+        self.interval = None #: the seconds between the resends of the cyclic tasks while they run
+        self.rearms = 0 #: times the cyclic tasks were armed again
+        self._tasks = None
+        self._armed = 0.0 # when the cyclic tasks were last armed
+        self._payloads = None # the payload of each cyclic task
+        self._next = 0.0
+        self._stopped = False
+        self._other = 0.0 # bits per second of received traffic in the last window
+        self._started = time.monotonic()
+        self._bits = 0
+        self._received = self._frames()
+
+    @property
+    def period(self):
+        """The seconds between rounds that keep the bus within ``max_load``."""
+        budget = self.bitrate * self.max_load
+        return self.round_bits / max(budget - self._other, budget * 0.1)
+
+    def start(self):
+        """Start the cyclic tasks (only with ``refresh``).
+
+        :Returns: This `SendScheduler` object."""
+        if self.refresh is not None and self._tasks is None:
+            self._payloads = [bytes(message.data) for message in self.messages]
+            self._arm(time.monotonic())
+        return self
+
+    def stop(self):
+        """Stop the cyclic tasks, so the messages are no longer resent."""
+        if self._tasks is not None:
+            for task in self._tasks:
+                task.stop()
+            self._tasks = None
+            self.interval = None
+
+    @property
+    def running(self):
+        """`True` while the cyclic tasks run (between `start()` and `stop()`)."""
+        return self._tasks is not None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def due(self, stop=False):
+        """`True` if a round may be sent now (see `send()` for ``stop``)."""
+        now = time.monotonic()
+        if now - self._started >= self.window:
+            self._measure(now)
+        return self._tasks is not None or now >= self._next or (stop and not self._stopped)
+
+    def send(self, stop=False):
+        """Send a round of the messages as they are now (or update the cyclic tasks).
+
+        :param bool stop: `True` if the round stops the motors.
+        """
+        now = time.monotonic()
+        if self._tasks is not None:
+            if now - self._started >= self.window:
+                self._measure(now)
+            self._update(stop)
+            interval = max(self.refresh, self.period)
+            if abs(interval - self.interval) > 0.1 * self.interval or (
+                    self.duration is not None and now - self._armed >= self.duration / 2):
+                self.rearms += 1
+                self._arm(now)
+            return
+        for message in self.messages:
+            self.bus.send(message)
+        if now < self._next:
+            self.stops += 1
+        self.rounds += 1
+        self._bits += self.round_bits
+        self._stopped = stop
+        self._next = now + self.period
+
+    def _update(self, stop):
+        """push the changed payloads to their cyclic tasks, and send a new stop right away"""
+        urgent = stop and not self._stopped
+        for index, message in enumerate(self.messages):
+            if message.data != self._payloads[index]:
+                self._tasks[index].modify_data(message)
+                self._payloads[index] = bytes(message.data)
+                self.updates += 1
+            if urgent:
+                self.bus.send(message)
+        if urgent:
+            self.stops += 1
+            self._bits += self.round_bits
+        self._stopped = stop
+
+    def _arm(self, now):
+        """(re)create the cyclic tasks at the interval that the bus allows now, for another
+        ``duration``"""
+        if self._tasks is not None:
+            for task in self._tasks:
+                task.stop()
+        self.interval = max(self.refresh, self.period)
+        self._tasks = [self.bus.send_periodic(message, self.interval, self.duration) for message in self.messages]
+        self._armed = now
+
+    def _frames(self):
+        return 0 if self.receiver is None else self.receiver.frames
+
+    def _measure(self, now):
+        """update `utilisation` and the received traffic from the window that just ended"""
+        elapsed = now - self._started
+        frames = self._frames()
+        other = (frames - self._received) * _STATUS_BITS
+        self._received = frames
+        if self.interval is not None:
+            self._bits += self.round_bits * elapsed / self.interval
+        self._other = other / elapsed
+        self.utilisation = (self._bits + other) / (self.bitrate * elapsed)
+        self._started = now
+        self._bits = 0
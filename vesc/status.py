@@ -0,0 +1,115 @@
+"""A receiver for the status frames that VESCs broadcast (enable them with the "CAN Status
+Message Mode" of VESC Tool). A python-can `~can.Notifier` thread decodes them as they arrive into
+a table of the latest values of each controller, which the control loop reads without waiting on
+the bus."""
+import time
+import can
+from .codec import STATUS_FRAMES, arbitration_id
+
+#: The names of every value in a status frame, in the order of `STATUS_FRAMES`.
+FIELDS = tuple(name for spec in STATUS_FRAMES.values() for name in spec.names)
+
+
+class MotorStatus:
+    """The latest values reported by one VESC, each `None` until its status frame arrives.
+    Currents are in amps, temperatures in degrees Celsius, voltages in volts and duty cycles in
+    range [-1.0, 1.0]."""
+    __slots__ = FIELDS + ('timestamps',)
+
+    def __init__(self):
+        for name in FIELDS:
+            setattr(self, name, None)
+        self.timestamps = {} #: The `time.monotonic()` seconds at which each status `~vesc.Packet` type arrived.
+
+    def __repr__(self):
+        return 'MotorStatus({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in FIELDS))
+
+
+class StatusReceiver:
+    """Decodes the status frames of the VESCs with ``controller_ids`` on a python-can ``bus``::
+
+        feedback = StatusReceiver(bus, (0, 1)).start()
+        ...
+        left = feedback.status(0)
+        if left.erpm is not None:
+            ...
+
+    The receiving thread replaces a controller's entry for a status frame with a new
+    ``(timestamp, values)`` `tuple` in a single assignment, so readers always see a whole frame
+    and neither side takes a lock.
+
+    :param ~can.BusABC bus: The python-can bus the VESCs are on.
+    :param controller_ids: The controller IDs to keep the status of.
+    :param bool filters: Install `filters()` on ``bus`` (replacing its filters), so that the
+        kernel drops every other frame before it wakes Python up. Defaults to `True`.
+    """
+    def __init__(self, bus, controller_ids, filters=True):
+        self.bus = bus
+        self.controller_ids = tuple(controller_ids)
+        # every key is there from the start, so the receiving thread never resizes a table
+        self._tables = {controller_id: dict.fromkeys(STATUS_FRAMES) for controller_id in self.controller_ids}
+        self.frames = 0 #: status frames decoded
+        self.ignored = 0 #: other frames that got through the filters
+        self._notifier = None
+        if filters:
+            bus.set_filters(self.filters())
+
+    def filters(self):
+        """Get the python-can filters that only let the status frames of ``controller_ids``
+        through."""
+        return [
+            {'can_id': arbitration_id(packet, controller_id), 'can_mask': 0x1FFFFFFF, 'extended': True}
+            for controller_id in self.controller_ids for packet in STATUS_FRAMES
+        ]
+
+    def start(self):
+        """Start receiving from a `~can.Notifier` thread.
+
+        :Returns: This `StatusReceiver` object."""
+        if self._notifier is None:
+            self._notifier = can.Notifier(self.bus, [self.receive], timeout=0.1)
+        return self
+
+    def stop(self):
+        """Stop the receiving thread."""
+        if self._notifier is not None:
+            self._notifier.stop()
+            self._notifier = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def receive(self, message):
+        """Decode a received `~can.Message` (called by the `~can.Notifier`)."""
+        table = self._tables.get(message.arbitration_id & 0xFF)
+        spec = STATUS_FRAMES.get(message.arbitration_id >> 8)
+        if table is None or spec is None or not message.is_extended_id or len(message.data) < spec.payload.size:
+            self.ignored += 1
+            return
+        table[spec.packet] = (time.monotonic(), spec.decode(message.data))
+        self.frames += 1
+
+    def latest(self, controller_id, packet):
+        """Get the ``(timestamp, values)`` of the last status frame of a ``packet`` type (see
+        `STATUS_FRAMES` for the values) from ``controller_id``, or `None`."""
+        return self._tables[controller_id][packet]
+
+    def status(self, controller_id):
+        """Get the latest values of every status frame from ``controller_id``.
+
+        :Returns: A `MotorStatus`.
+        """
+        result = MotorStatus()
+        for packet, entry in self._tables[controller_id].items():
+            if entry is None:
+                continue
+            timestamp, values = entry
+            result.timestamps[packet] = timestamp
+            for name, value in zip(STATUS_FRAMES[packet].names, values):
+                setattr(result, name, value)
+        return result
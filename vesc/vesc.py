@@ -0,0 +1,113 @@
+"""vesc driver module contains the VESC driver class that controls a VESC motor controller over
+a python-can bus"""
+import can
+from .codec import COMMANDS, arbitration_id
+from .packets import Packet
+
+class Vesc:
+    """A driver for one VESC on a CAN bus.
+
+    :param ~can.BusABC bus: The python-can bus the VESC is on.
+    :param int controller_id: The VESC's controller ID in range [0, 255] (set in VESC Tool).
+
+    Every command has its own `~can.Message`, made once here, whose payload is packed in place
+    and sent again, so commanding the motor doesn't build new frames::
+
+        left = Vesc(can.Bus(interface='socketcan', channel='can0'), 0)
+        left.set_duty(0.1)
+    """
+    def __init__(self, bus, controller_id):
+        if controller_id not in range(256):
+            raise ValueError('Unsupported controller ID: {}'.format(controller_id))
+        self.bus = bus
+        self.controller_id = controller_id
+        self._messages = {
+            packet: can.Message(
+                arbitration_id=arbitration_id(packet, controller_id),
+                data=bytearray(spec.payload.size),
+                is_extended_id=True,
+            )
+            for packet, spec in COMMANDS.items()
+        }
+
+    def message(self, packet):
+        """Get the preallocated `~can.Message` of a ``packet`` type (one of `COMMANDS`), holding
+        the payload it was last sent with."""
+        return self._messages[packet]
+
+    def prepare(self, packet, *values):
+        """Pack ``values`` (in the units of the matching ``set_*`` method) into the preallocated
+        message of a ``packet`` type without sending it, for a scheduler to send.
+
+        :Returns: The `~can.Message`.
+        """
+        message = self._messages[packet]
+        COMMANDS[packet].pack_into(message.data, *values)
+        return message
+
+    def _send(self, packet, *values):
+        """pack ``values`` into the ``packet`` type's message and send it"""
+        self.bus.send(self.prepare(packet, *values))
+
+    def set_duty(self, duty):
+        """Drive the motor at a ``duty`` cycle in range [-1.0, 1.0]."""
+        self._send(Packet.SET_DUTY, duty)
+
+    def set_current(self, current):
+        """Drive the motor with a ``current`` in amps (negative to reverse). ``0`` lets it coast."""
+        self._send(Packet.SET_CURRENT, current)
+
+    def set_brake_current(self, current):
+        """Brake the motor with a ``current`` in amps."""
+        self._send(Packet.SET_CURRENT_BRAKE, current)
+
+    def set_rpm(self, erpm):
+        """Run the motor's speed controller at ``erpm`` electrical revolutions per minute (the
+        mechanical RPM times the motor's pole pairs)."""
+        self._send(Packet.SET_RPM, erpm)
+
+    def set_position(self, degrees):
+        """Move the motor's position controller to ``degrees``."""
+        self._send(Packet.SET_POS, degrees)
+
+    def set_relative_current(self, fraction):
+        """Drive the motor with a ``fraction`` in range [-1.0, 1.0] of its configured current
+        limits."""
+        self._send(Packet.SET_CURRENT_REL, fraction)
+
+    def set_relative_brake_current(self, fraction):
+        """Brake the motor with a ``fraction`` in range [0.0, 1.0] of its configured braking
+        current limit."""
+        self._send(Packet.SET_CURRENT_BRAKE_REL, fraction)
+
+    def set_handbrake_current(self, current):
+        """Hold the motor still with a ``current`` in amps (open loop, for when it is stopped)."""
+        self._send(Packet.SET_CURRENT_HANDBRAKE, current)
+
+    def set_relative_handbrake_current(self, fraction):
+        """Hold the motor still with a ``fraction`` in range [0.0, 1.0] of its configured current
+        limit."""
+        self._send(Packet.SET_CURRENT_HANDBRAKE_REL, fraction)
+
+    def set_current_limits(self, minimum, maximum, store=False):
+        """Set the motor current limits in amps (``minimum`` is negative, for braking).
+
+        :param bool store: Also save them to the VESC's configuration so they survive a power
+            cycle. Defaults to `False`.
+        """
+        self._send(Packet.CONF_STORE_CURRENT_LIMITS if store else Packet.CONF_CURRENT_LIMITS, minimum, maximum)
+
+    def set_input_current_limits(self, minimum, maximum, store=False):
+        """Set the battery current limits in amps (``minimum`` is negative, for regenerative
+        braking). See `set_current_limits()` for ``store``."""
+        self._send(Packet.CONF_STORE_CURRENT_LIMITS_IN if store else Packet.CONF_CURRENT_LIMITS_IN, minimum, maximum)
+
+    def set_foc_erpms(self, openloop, sensorless, store=False):
+        """Set the ERPM below which FOC runs open loop and the ERPM above which it runs sensorless.
+        See `set_current_limits()` for ``store``."""
+        self._send(Packet.CONF_STORE_FOC_ERPMS if store else Packet.CONF_FOC_ERPMS, openloop, sensorless)
+
+    def set_battery_cut(self, start, end, store=False):
+        """Set the battery voltages at which the current starts being limited and at which it is
+        cut off. See `set_current_limits()` for ``store``."""
+        self._send(Packet.CONF_STORE_BATTERY_CUT if store else Packet.CONF_BATTERY_CUT, start, end)